@@ -0,0 +1,44 @@
+"""Measure per-call overhead of the custom SDK with telemetry disabled.
+
+Usage (with the package installed, e.g. ``pip install -e .``):
+    python benchmarks/bench_disabled.py
+"""
+
+import timeit
+
+import contextcompany as tcc
+
+
+def instrumented_call() -> None:
+    r = tcc.run(session_id="session").prompt("user prompt")
+    s = r.step().prompt("step prompt").response("step response").model("gpt-4o")
+    s.tokens(prompt_uncached=10, completion=20).end()
+    r.tool_call("search").args({"q": "x"}).result("ok").end()
+    r.response("done").end()
+
+
+def enabled_construction() -> None:
+    # Sending is excluded: this is the allocation/bookkeeping cost alone.
+    r = tcc.run(session_id="session").prompt("user prompt")
+    s = r.step().prompt("step prompt").response("step response").model("gpt-4o")
+    s.tokens(prompt_uncached=10, completion=20)
+    r.tool_call("search").args({"q": "x"}).result("ok")
+    r.response("done")
+
+
+def main() -> None:
+    number = 100_000
+
+    tcc.configure(enabled=True)
+    enabled = min(timeit.repeat(enabled_construction, number=number // 10, repeat=5)) / (number // 10)
+
+    tcc.configure(enabled=False)
+    disabled = min(timeit.repeat(instrumented_call, number=number, repeat=5)) / number
+
+    print(f"enabled (no network): {enabled * 1e9:10.0f} ns/call")
+    print(f"disabled:             {disabled * 1e9:10.0f} ns/call")
+    print(f"speedup:              {enabled / disabled:10.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,8 +3,21 @@
 from .run import run
 from .step import step
 from .tool_call import tool_call
-from .feedback import submit_feedback
-from .config import get_api_key, get_url
+from .feedback import submit_feedback, submit_feedback_batch, enqueue_feedback, flush_feedback
+from .config import configure, get_api_key, get_url
+from .tenant import use_tenant
 
 __version__ = "1.9.1"
-__all__ = ["run", "step", "tool_call", "submit_feedback", "get_api_key", "get_url"]
+__all__ = [
+    "run",
+    "step",
+    "tool_call",
+    "submit_feedback",
+    "submit_feedback_batch",
+    "enqueue_feedback",
+    "flush_feedback",
+    "configure",
+    "get_api_key",
+    "get_url",
+    "use_tenant",
+]
@@ -0,0 +1,60 @@
+"""Command line entry point: ``python -m contextcompany <command>``."""
+
+import argparse
+import sys
+from typing import List, Optional
+
+
+def _import_command(args: argparse.Namespace) -> int:
+    from .bulk import import_file
+
+    def _progress(records: int) -> None:
+        print(f"[TCC] Imported {records} records", file=sys.stderr)
+
+    result = import_file(
+        args.path,
+        api_key=args.api_key,
+        tcc_url=args.url,
+        batch_size=args.batch_size,
+        max_workers=args.workers,
+        checkpoint_path=args.checkpoint,
+        on_progress=_progress if args.progress else None,
+        compress=args.gzip,
+    )
+    for line, message in result.errors:
+        print(f"[TCC] Rejected line {line}: {message}", file=sys.stderr)
+    if result.rejected > len(result.errors):
+        print(f"[TCC] ... and {result.rejected - len(result.errors)} more rejected lines", file=sys.stderr)
+    print(
+        f"[TCC] Imported {result.imported}, skipped {result.skipped}, "
+        f"failed {result.failed}, rejected {result.rejected}"
+    )
+    return 1 if result.failed or result.rejected else 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m contextcompany")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    import_parser = commands.add_parser(
+        "import",
+        help="Backfill historical runs, steps and tool calls from a JSONL file",
+    )
+    import_parser.add_argument("path", help="JSONL file (optionally .gz), one record per line")
+    import_parser.add_argument("--api-key", help="TCC API key (defaults to TCC_API_KEY)")
+    import_parser.add_argument("--url", help="Override the ingestion endpoint (default: <base>/v1/custom)")
+    import_parser.add_argument("--batch-size", type=int, default=500, help="Records per request (default: 500)")
+    import_parser.add_argument("--workers", type=int, default=4, help="Concurrent requests (default: 4)")
+    import_parser.add_argument("--checkpoint", help="Checkpoint file used to resume an interrupted import")
+    import_parser.add_argument("--progress", action="store_true", help="Print progress after each batch")
+    import_parser.add_argument(
+        "--gzip", action="store_true", help="gzip request bodies (the endpoint must accept Content-Encoding: gzip)"
+    )
+    import_parser.set_defaults(handler=_import_command)
+
+    args = parser.parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
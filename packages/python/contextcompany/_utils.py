@@ -5,6 +5,11 @@ from typing import Any, Dict, Optional
 
 import requests
 
+try:
+    import orjson
+except ImportError:  # optional: faster encoding of large message lists
+    orjson = None
+
 _SENTINEL = object()
 
 
@@ -20,8 +25,21 @@ def _debug(*args: Any) -> None:
     print("[TCC Debug]", *parts)
 
 
+def _json_dumps(value: Any) -> str:
+    """Compact JSON using orjson when installed, falling back to the stdlib."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(value, default=str).decode("utf-8")
+        except TypeError:
+            pass  # e.g. non-string dict keys, which the stdlib coerces
+    return json.dumps(value, separators=(",", ":"), default=str)
+
+
 def _now_iso() -> str:
-    dt = datetime.now(timezone.utc)
+    return _format_iso(datetime.now(timezone.utc))
+
+
+def _format_iso(dt: datetime) -> str:
     return dt.strftime("%Y-%m-%dT%H:%M:%S.") + f"{dt.microsecond // 1000:03d}Z"
 
 
@@ -30,7 +48,32 @@ def _send_payload(
     label: str,
     api_key: Optional[str] = None,
     tcc_url: Optional[str] = None,
+    tenant_id: Optional[str] = None,
+    enabled: Optional[bool] = None,
+) -> None:
+    from .config import _config, is_enabled
+
+    if not is_enabled(enabled):
+        return
+
+    transport = _config.get("transport")
+    if transport is not None:
+        try:
+            transport.send(payload, label, api_key=api_key, tcc_url=tcc_url, tenant_id=tenant_id)
+        except Exception as e:
+            print(f"[TCC] Failed to send {label}: {e}")
+        return
+
+    _post_payload(payload, label, api_key=api_key, tcc_url=tcc_url)
+
+
+def _post_payload(
+    payload: Dict[str, Any],
+    label: str,
+    api_key: Optional[str] = None,
+    tcc_url: Optional[str] = None,
 ) -> None:
+    """Send one payload to ``/v1/custom`` over HTTP."""
     from .config import get_api_key, get_url
 
     _debug(f"Sending {label}...")
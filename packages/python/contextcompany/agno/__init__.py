@@ -16,22 +16,33 @@ Usage:
     response = agent.run("What is the weather in SF?")
 """
 
-from typing import Optional
+from typing import Mapping, Optional
 
 from opentelemetry import trace
 from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import SpanExporter
 from opentelemetry.sdk.resources import Resource
-from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
 
-from ..otel import RunIdSpanProcessor, TraceBatchSpanProcessor
+from ..otel import (
+    AttributeLimits,
+    RunIdSpanProcessor,
+    TailSampler,
+    TraceBatchSpanProcessor,
+    create_otlp_exporter,
+    create_tenant_exporter,
+)
 from ..config import get_api_key, get_url
 from .._utils import _debug
-from .exporter import MetadataFixingExporter
+from .exporter import MetadataFixingExporter, extract_user_ids
 
 
 def instrument_agno(
     api_key: Optional[str] = None,
     tcc_url: Optional[str] = None,
+    attribute_limits: Optional[AttributeLimits] = None,
+    sampler: Optional[TailSampler] = None,
+    tenant_api_keys: Optional[Mapping[str, str]] = None,
+    exporter: Optional[SpanExporter] = None,
 ) -> TracerProvider:
     """Instrument the Agno framework for automatic observability.
 
@@ -45,6 +56,17 @@ def instrument_agno(
         api_key: TCC API key. Falls back to the ``TCC_API_KEY`` env var.
         tcc_url: Override the TCC endpoint URL. Falls back to ``TCC_URL``
                  env var, then auto-selects prod/dev based on the key prefix.
+        attribute_limits: Truncate oversized attributes (e.g. ``input.value``)
+                 before spans are buffered, e.g. ``AttributeLimits(32768)``.
+        sampler: Tail-sample completed traces, e.g.
+                 ``TailSampler(sample_rate=0.1, min_duration_ms=5000)``.
+                 Exports every trace when omitted.
+        tenant_api_keys: Map tenant ids to TCC API keys to serve many
+                 tenants from one process. Spans started inside
+                 ``use_tenant(tenant_id)`` are sent with that tenant's key;
+                 ``api_key`` becomes optional and covers untagged spans.
+        exporter: Export spans here instead of to TCC, e.g.
+                 ``FileSpanExporter(FileSink(path))`` on hosts without egress.
 
     Returns:
         The configured ``TracerProvider``.
@@ -58,22 +80,31 @@ def instrument_agno(
             "Install it with:  pip install contextcompany[agno]"
         )
 
-    resolved_api_key = get_api_key(api_key)
-    resolved_endpoint = tcc_url or get_url("/v1/traces", api_key=resolved_api_key)
-
     _debug("Initializing Agno instrumentation")
-    _debug(f"Endpoint: {resolved_endpoint}")
+
+    if exporter is not None:
+        base_exporter = exporter
+    elif tenant_api_keys is not None:
+        _debug(f"Routing spans for {len(tenant_api_keys)} tenants")
+        base_exporter = create_tenant_exporter(tenant_api_keys, api_key=api_key, tcc_url=tcc_url)
+    else:
+        resolved_api_key = get_api_key(api_key)
+        resolved_endpoint = tcc_url or get_url("/v1/traces", api_key=resolved_api_key)
+        _debug(f"Endpoint: {resolved_endpoint}")
+        base_exporter = create_otlp_exporter(resolved_endpoint, resolved_api_key)
 
     provider = TracerProvider(resource=Resource(attributes={}))
-    provider.add_span_processor(RunIdSpanProcessor())
+    provider.add_span_processor(RunIdSpanProcessor(resolver=extract_user_ids))
 
-    base_exporter = OTLPSpanExporter(
-        endpoint=resolved_endpoint,
-        headers={"Authorization": f"Bearer {resolved_api_key}"},
-    )
     fixing_exporter = MetadataFixingExporter(base_exporter)
     provider.add_span_processor(
-        TraceBatchSpanProcessor(exporter=fixing_exporter, timeout_seconds=600)
+        TraceBatchSpanProcessor(
+            exporter=fixing_exporter,
+            timeout_seconds=600,
+            attribute_limits=attribute_limits,
+            sampler=sampler,
+            extractor=extract_user_ids,
+        )
     )
 
     trace.set_tracer_provider(provider)
@@ -1,15 +1,65 @@
 """Exporter wrapper that extracts TCC metadata from OpenInference span attributes."""
 
 import json
-from typing import Sequence
+from functools import lru_cache
+from typing import Any, Dict, Mapping, Optional, Tuple
 
-from opentelemetry.sdk.trace import ReadableSpan
-from opentelemetry.sdk.trace.export import SpanExporter, SpanExportResult
-from .._utils import _debug
-from ..otel.span_copy import copy_span_with_attributes
+from opentelemetry.sdk.trace.export import SpanExporter
+from ..otel.enrichment import EnrichingExporter
+from ..otel.id_cache import TraceIdCache
 
 
-class MetadataFixingExporter(SpanExporter):
+def extract_user_ids(attributes: Mapping[str, Any]) -> Dict[str, str]:
+    """Return the user's ``tcc.runId`` / ``tcc.sessionId`` from OpenInference root span attributes."""
+    # Extract TCC fields from OpenInference metadata JSON
+    user_run_id = None
+    user_session_id = None
+
+    metadata_raw = attributes.get("metadata")
+    if metadata_raw and isinstance(metadata_raw, str) and "tcc." in metadata_raw:
+        user_run_id, user_session_id = _parse_metadata_ids(metadata_raw)
+
+    # Also check session.id (first-class OpenInference attribute)
+    if not user_session_id:
+        user_session_id = attributes.get("session.id")
+
+    ids: Dict[str, str] = {}
+    if user_run_id:
+        ids["tcc.runId"] = user_run_id
+    if user_session_id:
+        ids["tcc.sessionId"] = user_session_id
+    return ids
+
+
+# Metadata strings longer than this are parsed on every call instead of being
+# cached, which bounds the cache to about 1024 * 4 KiB however large users'
+# metadata gets.
+MAX_CACHED_METADATA_CHARS = 4096
+
+
+def _parse_metadata_ids(metadata_raw: str) -> Tuple[Optional[str], Optional[str]]:
+    # Agno attaches the same metadata blob to many spans and traces of a
+    # session, so parse each distinct (small) string once.
+    if len(metadata_raw) > MAX_CACHED_METADATA_CHARS:
+        return _parse_metadata(metadata_raw)
+    return _parse_metadata_cached(metadata_raw)
+
+
+def _parse_metadata(metadata_raw: str) -> Tuple[Optional[str], Optional[str]]:
+    try:
+        metadata = json.loads(metadata_raw)
+        return (
+            metadata.get("tcc.runId") or metadata.get("tcc.run_id"),
+            metadata.get("tcc.sessionId") or metadata.get("tcc.session_id"),
+        )
+    except (json.JSONDecodeError, AttributeError):
+        return None, None
+
+
+_parse_metadata_cached = lru_cache(maxsize=1024)(_parse_metadata)
+
+
+class MetadataFixingExporter(EnrichingExporter):
     """Promotes tcc.runId / tcc.sessionId from OpenInference metadata to top-level attributes.
 
     OpenInference stores user metadata as a JSON string in the ``metadata``
@@ -18,71 +68,11 @@ class MetadataFixingExporter(SpanExporter):
     values and overwrites the auto-generated ``tcc.runId`` (and sets
     ``tcc.sessionId``) on every span in the trace so the TCC backend can
     read them directly.
+
+    ``instrument_agno`` resolves these ids when the root span starts, so
+    spans normally pass through unchanged; this exporter only rewrites
+    spans whose ids were not known at start time.
     """
 
-    def __init__(self, wrapped_exporter: SpanExporter):
-        self.wrapped_exporter = wrapped_exporter
-
-    def export(self, spans: Sequence[ReadableSpan]) -> SpanExportResult:
-        # Group spans by trace
-        traces: dict[int, list[ReadableSpan]] = {}
-        attribute_updates: dict[int, dict[str, str]] = {}
-        for span in spans:
-            trace_id = span.context.trace_id
-            if trace_id not in traces:
-                traces[trace_id] = []
-            traces[trace_id].append(span)
-
-        for trace_id, trace_spans in traces.items():
-            root_span = next((s for s in trace_spans if not s.parent), None)
-            if not root_span:
-                continue
-
-            attrs = root_span.attributes or {}
-
-            # Extract TCC fields from OpenInference metadata JSON
-            user_run_id = None
-            user_session_id = None
-
-            metadata_raw = attrs.get("metadata")
-            if metadata_raw and isinstance(metadata_raw, str):
-                try:
-                    metadata = json.loads(metadata_raw)
-                    user_run_id = metadata.get("tcc.runId") or metadata.get("tcc.run_id")
-                    user_session_id = metadata.get("tcc.sessionId") or metadata.get("tcc.session_id")
-                except (json.JSONDecodeError, AttributeError):
-                    pass
-
-            # Also check session.id (first-class OpenInference attribute)
-            if not user_session_id:
-                user_session_id = attrs.get("session.id")
-
-            # Apply to all spans in the trace
-            if user_run_id or user_session_id:
-                for span in trace_spans:
-                    updates = attribute_updates.setdefault(id(span), {})
-                    if user_run_id:
-                        updates["tcc.runId"] = user_run_id
-                    if user_session_id:
-                        updates["tcc.sessionId"] = user_session_id
-
-                if user_run_id:
-                    _debug(f"Fixed runId for trace {trace_id}: {user_run_id}")
-                if user_session_id:
-                    _debug(f"Fixed sessionId for trace {trace_id}: {user_session_id}")
-
-        export_spans = [
-            copy_span_with_attributes(span, attribute_updates[id(span)])
-            if id(span) in attribute_updates
-            else span
-            for span in spans
-        ]
-
-        _debug(f"Exporting {len(export_spans)} spans")
-        return self.wrapped_exporter.export(export_spans)
-
-    def shutdown(self) -> None:
-        return self.wrapped_exporter.shutdown()
-
-    def force_flush(self, timeout_millis: int = 30000) -> bool:
-        return self.wrapped_exporter.force_flush(timeout_millis)
+    def __init__(self, wrapped_exporter: SpanExporter, id_cache: Optional[TraceIdCache] = None):
+        super().__init__(wrapped_exporter, extract_user_ids, id_cache=id_cache)
@@ -0,0 +1,407 @@
+"""Bulk backfill of historical runs, steps and tool calls.
+
+Records use the same shape the custom SDK sends (``type`` is ``"run"``,
+``"step"`` or ``"tool_call"``) but carry their own ``start_time`` and
+``end_time``. They are uploaded to ``/v1/custom`` as ``{"type": "batch",
+"items": [...]}`` requests (the batch format the TypeScript SDK's ``sendRun``
+uses) by a bounded pool of worker threads, and an optional checkpoint file
+lets an interrupted import resume where it stopped. Malformed or incomplete
+records are reported with their line number and skipped.
+
+Usage::
+
+    from contextcompany import bulk
+
+    result = bulk.import_file("agent-logs.jsonl", checkpoint_path="agent-logs.ckpt")
+    print(result.imported, result.failed, result.errors)
+
+or from the command line::
+
+    python -m contextcompany import agent-logs.jsonl --checkpoint agent-logs.ckpt
+"""
+
+import gzip
+import json
+import os
+import time
+import uuid
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+import requests
+
+from ._utils import _debug, _format_iso
+from .config import get_api_key, get_url, is_enabled
+from .redaction import redact_status_message
+
+RECORD_TYPES = ("run", "step", "tool_call")
+
+_ID_FIELDS = {"run": "run_id", "step": "step_id", "tool_call": "tool_call_id"}
+
+MAX_RETRIES = 2
+INITIAL_BACKOFF_SECONDS = 1.0
+
+# Rejected records beyond this many are counted but not listed individually.
+MAX_REPORTED_ERRORS = 100
+
+Timestamp = Union[str, int, float, datetime]
+
+
+@dataclass
+class ImportResult:
+    """Outcome of a bulk import.
+
+    Attributes:
+        imported: Records acknowledged by the backend in this call.
+        skipped:  Records skipped because the checkpoint already covered them.
+        failed:   Records in batches that could not be delivered.
+        rejected: Records that were malformed or incomplete and not sent.
+        errors:   ``(line, message)`` for the first rejected records; ``line``
+                  is the 1-based line in the file (or position in the
+                  iterable for :func:`import_records`).
+    """
+
+    imported: int = 0
+    skipped: int = 0
+    failed: int = 0
+    rejected: int = 0
+    errors: List[Tuple[int, str]] = field(default_factory=list)
+
+    def reject(self, line: int, message: str) -> None:
+        self.rejected += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append((line, message))
+
+
+class _InvalidLine:
+    """Placeholder yielded for a line that is not a JSON object."""
+
+    __slots__ = ("message",)
+
+    def __init__(self, message: str):
+        self.message = message
+
+
+def to_iso(value: Timestamp) -> str:
+    """Normalize a timestamp to the SDK's ISO-8601 millisecond UTC format.
+
+    Accepts ``datetime`` objects (naive values are treated as UTC), epoch
+    seconds or milliseconds, and ISO-8601 strings.
+    """
+    if isinstance(value, datetime):
+        dt = value
+    elif isinstance(value, (int, float)):
+        seconds = value / 1000 if value > 1e11 else value
+        dt = datetime.fromtimestamp(seconds, tz=timezone.utc)
+    elif isinstance(value, str):
+        text = value.strip()
+        if text.endswith("Z") or text.endswith("z"):
+            text = text[:-1] + "+00:00"
+        try:
+            dt = datetime.fromisoformat(text)
+        except ValueError:
+            raise ValueError(f"[TCC] Invalid timestamp: {value!r}")
+    else:
+        raise ValueError(f"[TCC] Invalid timestamp: {value!r}")
+
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return _format_iso(dt.astimezone(timezone.utc))
+
+
+def normalize_record(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Validate a historical record and return the payload to upload.
+
+    Missing ids are derived deterministically from the record contents so
+    re-importing the same file after a crash does not create duplicates.
+    """
+    record_type = record.get("type")
+    if record_type not in RECORD_TYPES:
+        raise ValueError(f"[TCC] Invalid record type {record_type!r}; expected one of {RECORD_TYPES}")
+
+    for field in ("start_time", "end_time"):
+        if record.get(field) is None:
+            raise ValueError(f"[TCC] Cannot import {record_type}: {field} is required")
+
+    payload = dict(record)
+    payload["start_time"] = to_iso(record["start_time"])
+    payload["end_time"] = to_iso(record["end_time"])
+    payload.setdefault("status_code", 0)
+
+    id_field = _ID_FIELDS[record_type]
+    if not payload.get(id_field):
+        digest = json.dumps(record, sort_keys=True, default=str)
+        payload[id_field] = str(uuid.uuid5(uuid.NAMESPACE_OID, digest))
+    if record_type != "run" and not payload.get("run_id"):
+        raise ValueError(f"[TCC] Cannot import {record_type}: run_id is required")
+    if record_type == "tool_call":
+        payload.setdefault("tool_name", "unknown")
+
+    if isinstance(payload.get("status_message"), str):
+        payload["status_message"] = redact_status_message(payload["status_message"])
+
+    return payload
+
+
+def iter_jsonl(path: str, skip: int = 0) -> Iterator[Dict[str, Any]]:
+    """Stream records from a JSONL file (optionally ``.gz``) one line at a time.
+
+    Blank lines are ignored. The first ``skip`` records are passed over
+    without being parsed. Raises ``ValueError`` on a line that is not a JSON
+    object; :func:`import_file` reports and skips such lines instead.
+    """
+    for line_number, record in _numbered_jsonl(path, skip):
+        if isinstance(record, _InvalidLine):
+            raise ValueError(f"[TCC] Line {line_number}: {record.message}")
+        yield record
+
+
+def _numbered_jsonl(path: str, skip: int = 0) -> Iterator[Tuple[int, Any]]:
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8") as f:  # type: ignore[operator]
+        for line_number, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            if skip:
+                skip -= 1
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                yield line_number, _InvalidLine(f"invalid JSON: {e}")
+                continue
+            if not isinstance(record, dict):
+                yield line_number, _InvalidLine("expected a JSON object")
+                continue
+            yield line_number, record
+
+
+def _read_checkpoint(path: str) -> int:
+    try:
+        with open(path, encoding="utf-8") as f:
+            return int(json.load(f).get("records", 0))
+    except FileNotFoundError:
+        return 0
+
+
+def _write_checkpoint(path: str, records: int) -> None:
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"records": records}, f)
+    os.replace(tmp_path, path)
+
+
+def _post_batch(
+    session: requests.Session,
+    endpoint: str,
+    api_key: str,
+    batch: List[Dict[str, Any]],
+    compress: bool,
+) -> bool:
+    body = json.dumps({"type": "batch", "items": batch}, default=str).encode("utf-8")
+    headers = {
+        "Content-Type": "application/json",
+        "Authorization": f"Bearer {api_key}",
+    }
+    if compress:
+        body = gzip.compress(body, compresslevel=6)
+        headers["Content-Encoding"] = "gzip"
+
+    last_error = ""
+    for attempt in range(MAX_RETRIES + 1):
+        if attempt:
+            time.sleep(INITIAL_BACKOFF_SECONDS * 2 ** (attempt - 1))
+        try:
+            resp = session.post(endpoint, data=body, headers=headers, timeout=30)
+        except requests.exceptions.RequestException as e:
+            last_error = str(e)
+            continue
+
+        if resp.ok:
+            return True
+        last_error = f"{resp.status_code} {resp.text}"
+        if resp.status_code != 429 and resp.status_code < 500:
+            break
+
+    print(f"[TCC] Failed to import batch of {len(batch)} records: {last_error}")
+    return False
+
+
+def _batches(
+    records: Iterable[Tuple[int, Any]],
+    batch_size: int,
+    transform: Optional[Callable[[Dict[str, Any]], Optional[Dict[str, Any]]]],
+    result: ImportResult,
+) -> Iterator[Tuple[int, List[Dict[str, Any]]]]:
+    """Yield ``(records consumed, payloads)`` tuples from ``(line, record)`` pairs.
+
+    The consumed count includes records dropped by ``transform`` or rejected
+    (recorded on ``result``) so the checkpoint always refers to positions in
+    the source.
+    """
+    batch: List[Dict[str, Any]] = []
+    consumed = 0
+    for line_number, record in records:
+        consumed += 1
+        if isinstance(record, _InvalidLine):
+            result.reject(line_number, record.message)
+            continue
+        if transform is not None:
+            record = transform(record)
+            if record is None:
+                continue
+        try:
+            payload = normalize_record(record)
+        except (ValueError, TypeError, AttributeError) as e:
+            result.reject(line_number, str(e).replace("[TCC] ", ""))
+            continue
+        batch.append(payload)
+        if len(batch) >= batch_size:
+            yield consumed, batch
+            batch, consumed = [], 0
+    if batch or consumed:
+        yield consumed, batch
+
+
+def import_records(
+    records: Iterable[Dict[str, Any]],
+    api_key: Optional[str] = None,
+    tcc_url: Optional[str] = None,
+    batch_size: int = 500,
+    max_workers: int = 4,
+    transform: Optional[Callable[[Dict[str, Any]], Optional[Dict[str, Any]]]] = None,
+    on_progress: Optional[Callable[[int], None]] = None,
+    compress: bool = False,
+    _start_offset: int = 0,
+    _checkpoint_path: Optional[str] = None,
+    _numbered: bool = False,
+) -> ImportResult:
+    """Upload historical records in batches.
+
+    Args:
+        records:     Iterable of record dicts; consumed lazily.
+        api_key:     TCC API key. Falls back to the ``TCC_API_KEY`` env var.
+        tcc_url:     Override the ingestion endpoint (``/v1/custom``, the
+                     same endpoint as a run's ``tcc_url``).
+        batch_size:  Maximum records per request.
+        max_workers: Maximum concurrent requests. At most twice this many
+                     batches are held in memory at once.
+        transform:   Optional mapping from a source record to a TCC record.
+                     Return ``None`` to drop a record.
+        on_progress: Called with the number of records durably imported so far.
+        compress:    gzip request bodies. Only enable this for an ingestion
+                     endpoint that accepts ``Content-Encoding: gzip``.
+    """
+    result = ImportResult()
+    if not is_enabled():
+        print("[TCC] Telemetry is disabled; nothing was imported")
+        return result
+
+    # (line, record) pairs; import_file passes file line numbers.
+    numbered = records if _numbered else enumerate(records, start=_start_offset + 1)
+
+    api_key = get_api_key(api_key)
+    endpoint = tcc_url or get_url("/v1/custom", api_key=api_key)
+    _debug(f"Importing to {endpoint} (batch_size={batch_size}, max_workers={max_workers})")
+
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=max_workers)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+
+    # Batches can finish out of order; the checkpoint only advances over a
+    # contiguous prefix of acknowledged batches.
+    pending: Dict[Future, int] = {}
+    batch_sizes: Dict[int, Tuple[int, int]] = {}
+    done_batches: Dict[int, Tuple[bool, int, int]] = {}
+    next_to_commit = 0
+    committed = _start_offset
+    failed = False
+
+    def _drain(block_until: int) -> None:
+        nonlocal next_to_commit, committed, failed
+        while len(pending) > block_until:
+            finished, _ = wait(list(pending), return_when=FIRST_COMPLETED)
+            for future in finished:
+                seq = pending.pop(future)
+                try:
+                    ok = future.result()
+                except Exception as e:
+                    print(f"[TCC] Failed to import batch {seq}: {e!r}")
+                    ok = False
+                done_batches[seq] = (ok, *batch_sizes.pop(seq))
+        while next_to_commit in done_batches:
+            ok, consumed, size = done_batches.pop(next_to_commit)
+            next_to_commit += 1
+            if ok:
+                result.imported += size
+            else:
+                result.failed += size
+                failed = True
+            if failed:
+                continue
+            committed += consumed
+            if _checkpoint_path:
+                _write_checkpoint(_checkpoint_path, committed)
+            if on_progress:
+                on_progress(committed)
+
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="tcc-bulk") as pool:
+            for seq, (consumed, batch) in enumerate(_batches(numbered, batch_size, transform, result)):
+                if failed:
+                    break
+                batch_sizes[seq] = (consumed, len(batch))
+                if batch:
+                    future = pool.submit(_post_batch, session, endpoint, api_key, batch, compress)
+                else:
+                    future = Future()
+                    future.set_result(True)
+                pending[future] = seq
+                _drain(block_until=max_workers * 2 - 1)
+            _drain(block_until=0)
+    finally:
+        session.close()
+
+    return result
+
+
+def import_file(
+    path: str,
+    api_key: Optional[str] = None,
+    tcc_url: Optional[str] = None,
+    batch_size: int = 500,
+    max_workers: int = 4,
+    checkpoint_path: Optional[str] = None,
+    transform: Optional[Callable[[Dict[str, Any]], Optional[Dict[str, Any]]]] = None,
+    on_progress: Optional[Callable[[int], None]] = None,
+    compress: bool = False,
+) -> ImportResult:
+    """Stream a JSONL (or ``.jsonl.gz``) file into TCC.
+
+    When ``checkpoint_path`` is given, the number of source records imported
+    so far is stored there after every acknowledged batch, and a later call
+    with the same checkpoint skips them. Rejected lines are reported on the
+    result with their line numbers and count as processed.
+    """
+    start = _read_checkpoint(checkpoint_path) if checkpoint_path else 0
+    if start:
+        _debug(f"Resuming {path} after {start} records")
+
+    result = import_records(
+        _numbered_jsonl(path, skip=start),
+        api_key=api_key,
+        tcc_url=tcc_url,
+        batch_size=batch_size,
+        max_workers=max_workers,
+        transform=transform,
+        on_progress=on_progress,
+        compress=compress,
+        _start_offset=start,
+        _checkpoint_path=checkpoint_path,
+        _numbered=True,
+    )
+    result.skipped = start
+    return result
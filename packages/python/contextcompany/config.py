@@ -1,11 +1,56 @@
 import os
-from typing import Optional
+from typing import Any, Dict, Mapping, Optional
 from urllib.parse import urlparse
 
 PROD_BASE = "https://api.thecontext.company"
 DEV_BASE = "https://dev.thecontext.company"
 ALLOWED_REMOTE_ORIGINS = {PROD_BASE, DEV_BASE}
 
+_config: Dict[str, Any] = {}
+
+
+def configure(
+    enabled: Optional[bool] = None,
+    tenant_api_keys: Optional[Mapping[str, str]] = None,
+    transport: Optional[Any] = None,
+) -> None:
+    """Set global SDK options.
+
+    Subsequent calls are merged into the existing configuration, so only the
+    options passed explicitly are changed.
+
+    Args:
+        enabled: Turn telemetry on or off for the whole process. When ``False``,
+                 ``run()``/``step()``/``tool_call()`` return shared no-op
+                 builders and nothing is sent. Overrides ``TCC_ENABLED``.
+        tenant_api_keys: Map tenant ids to their TCC API keys, merged into
+                 any previously registered tenants. Work inside
+                 ``use_tenant(tenant_id)`` is sent with that tenant's key.
+        transport: Deliver custom SDK events through this object's
+                 ``send(payload, label, api_key, tcc_url, tenant_id)`` instead of one
+                 HTTP request each, e.g. the OpenTelemetry pipeline from
+                 ``contextcompany.otel.use_otel_transport``. Pass ``"http"``
+                 to restore direct requests.
+    """
+    if enabled is not None:
+        _config["enabled"] = enabled
+    if tenant_api_keys is not None:
+        _config["tenant_api_keys"] = {**_config.get("tenant_api_keys", {}), **tenant_api_keys}
+    if transport == "http":
+        _config.pop("transport", None)
+    elif transport is not None:
+        _config["transport"] = transport
+
+
+def is_enabled(override: Optional[bool] = None) -> bool:
+    """Whether telemetry is on; ``override`` (a per-run ``enabled=``) wins when set."""
+    if override is not None:
+        return override
+    enabled = _config.get("enabled")
+    if enabled is not None:
+        return enabled
+    return os.getenv("TCC_ENABLED", "").lower() not in ("0", "false")
+
 
 def get_api_key(api_key: Optional[str] = None) -> str:
     key = api_key or os.getenv("TCC_API_KEY")
@@ -1,51 +1,86 @@
+import atexit
 import os
-from typing import Optional, Literal
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Literal, Tuple
 import requests
 
+from .tenant import resolve_api_key
 
-def submit_feedback(
-    run_id: str,
-    score: Optional[Literal["thumbs_up", "thumbs_down"]] = None,
-    text: Optional[str] = None,
-    api_key: Optional[str] = None,
-    tcc_url: Optional[str] = None,
-) -> bool:
-    # Validate inputs
+MAX_TEXT_LENGTH = 2000
+MAX_BATCH_SIZE = 100
+
+
+def _validate(score: Optional[str], text: Optional[str]) -> None:
     if not score and not text:
         raise ValueError(
             "[TCC] Cannot submit feedback: at least one of 'score' or 'text' must be provided"
         )
 
-    if text and len(text) > 2000:
+    if text and len(text) > MAX_TEXT_LENGTH:
         raise ValueError(
-            f"[TCC] Cannot submit feedback: text length ({len(text)}) exceeds maximum of 2000 characters"
+            f"[TCC] Cannot submit feedback: text length ({len(text)}) exceeds maximum of {MAX_TEXT_LENGTH} characters"
         )
 
-    # Get API key
-    from .config import get_url
-    api_key = api_key or os.getenv("TCC_API_KEY")
+
+def _build_item(run_id: str, score: Optional[str], text: Optional[str]) -> Dict[str, Any]:
+    item: Dict[str, Any] = {"runId": run_id}
+    if score:
+        item["score"] = score
+    if text:
+        item["text"] = text
+    return item
+
+
+def _coalesce(items: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Merge items for the same run; later scores/texts win, first-seen order is kept."""
+    merged: Dict[str, Dict[str, Any]] = {}
+    for item in items:
+        existing = merged.get(item["runId"])
+        if existing is None:
+            merged[item["runId"]] = dict(item)
+        else:
+            existing.update(item)
+    return list(merged.values())
+
+
+def _resolve_api_key(api_key: Optional[str]) -> Optional[str]:
+    api_key = resolve_api_key(api_key) or os.getenv("TCC_API_KEY")
     if not api_key:
         print("[TCC] Cannot submit feedback: TCC_API_KEY environment variable is not set")
-        return False
+    return api_key
 
-    # Get endpoint
-    feedback_url = (
-        tcc_url
-        or os.getenv("TCC_FEEDBACK_URL")
-        or get_url("/v1/feedback", api_key=api_key)
-    )
 
-    # Prepare request
-    payload: dict = {"runId": run_id}
-    if score:
-        payload["score"] = score
-    if text:
-        payload["text"] = text
+def _feedback_url(api_key: str, tcc_url: Optional[str]) -> str:
+    """The single-item feedback endpoint; ``tcc_url`` means the same everywhere."""
+    from .config import get_url
+
+    return tcc_url or os.getenv("TCC_FEEDBACK_URL") or get_url("/v1/feedback", api_key=api_key)
 
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+
+def _get_session() -> requests.Session:
+    """Keep-alive session shared by batched and background feedback delivery."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = requests.Session()
+        return _session
+
+
+def _post_item(
+    url: str,
+    api_key: str,
+    item: Dict[str, Any],
+    post: Optional[Callable[..., requests.Response]] = None,
+) -> bool:
     try:
-        response = requests.post(
-            feedback_url,
-            json=payload,
+        response = (post or requests.post)(
+            url,
+            json=item,
             headers={
                 "Content-Type": "application/json",
                 "Authorization": f"Bearer {api_key}",
@@ -64,3 +99,195 @@ def submit_feedback(
     except requests.exceptions.RequestException as e:
         print(f"[TCC] Failed to submit feedback: {e}")
         return False
+
+
+def _post_items(url: str, api_key: str, items: List[Dict[str, Any]]) -> int:
+    """Send coalesced items one request each over the shared connection.
+
+    The feedback API has no batch endpoint, so batching here means fewer
+    items (after coalescing) and connection reuse, not fewer requests per item.
+    """
+    post = _get_session().post
+    return sum(1 for item in items if _post_item(url, api_key, item, post))
+
+
+def submit_feedback(
+    run_id: str,
+    score: Optional[Literal["thumbs_up", "thumbs_down"]] = None,
+    text: Optional[str] = None,
+    api_key: Optional[str] = None,
+    tcc_url: Optional[str] = None,
+    enabled: Optional[bool] = None,
+) -> bool:
+    from .config import is_enabled
+
+    if not is_enabled(enabled):
+        return False
+
+    # Validate inputs
+    _validate(score, text)
+
+    # Get API key
+    api_key = _resolve_api_key(api_key)
+    if not api_key:
+        return False
+
+    return _post_item(_feedback_url(api_key, tcc_url), api_key, _build_item(run_id, score, text))
+
+
+def submit_feedback_batch(
+    items: Iterable[Mapping[str, Any]],
+    api_key: Optional[str] = None,
+    tcc_url: Optional[str] = None,
+    batch_size: int = MAX_BATCH_SIZE,
+) -> int:
+    """Submit many feedback items, merging repeated feedback per run.
+
+    Each item is a mapping with ``run_id`` and at least one of ``score`` or
+    ``text``. Items for the same run within each ``batch_size`` chunk are
+    merged, later values winning, and the merged items are posted to the
+    feedback endpoint over one keep-alive connection. Returns the number of
+    items the backend accepted.
+    """
+    from .config import is_enabled
+
+    if not is_enabled():
+        return 0
+
+    api_key = _resolve_api_key(api_key)
+    if not api_key:
+        return 0
+    url = _feedback_url(api_key, tcc_url)
+
+    accepted = 0
+    chunk: List[Dict[str, Any]] = []
+
+    def _send() -> int:
+        return _post_items(url, api_key, _coalesce(chunk))
+
+    for entry in items:
+        score, text = entry.get("score"), entry.get("text")
+        _validate(score, text)
+        chunk.append(_build_item(entry["run_id"], score, text))
+        if len(chunk) >= batch_size:
+            accepted += _send()
+            chunk = []
+    if chunk:
+        accepted += _send()
+
+    return accepted
+
+
+class _FeedbackQueue:
+    """Background delivery queue that coalesces feedback per run.
+
+    Items wait up to ``window_seconds`` (or until ``max_items`` are pending)
+    so bursts of feedback for the same run collapse into one item, then go
+    out from a single daemon thread over a keep-alive connection.
+    """
+
+    def __init__(self, window_seconds: float = 1.0, max_items: int = MAX_BATCH_SIZE):
+        self.window_seconds = window_seconds
+        self.max_items = max_items
+        self._cond = threading.Condition()
+        self._pending: Dict[Tuple[str, str], Dict[str, Dict[str, Any]]] = {}
+        self._pending_count = 0
+        self._deadline: Optional[float] = None
+        self._flush_requested = False
+        self._sending = False
+        self._thread: Optional[threading.Thread] = None
+
+    def put(self, url: str, api_key: str, item: Dict[str, Any]) -> None:
+        with self._cond:
+            bucket = self._pending.setdefault((url, api_key), {})
+            existing = bucket.get(item["runId"])
+            if existing is None:
+                bucket[item["runId"]] = item
+                self._pending_count += 1
+            else:
+                existing.update(item)
+
+            if self._deadline is None:
+                # First pending item: wake the worker, which may be waiting
+                # without a timeout, so it starts this item's window.
+                self._deadline = time.monotonic() + self.window_seconds
+                self._cond.notify_all()
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="tcc-feedback", daemon=True)
+                self._thread.start()
+                atexit.register(self.flush, 5.0)
+            if self._pending_count >= self.max_items:
+                self._cond.notify_all()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        with self._cond:
+            if not self._pending and not self._sending:
+                return True
+            self._flush_requested = True
+            self._cond.notify_all()
+            return self._cond.wait_for(lambda: not self._pending and not self._sending, timeout)
+
+    def _ready(self) -> bool:
+        if not self._pending:
+            return False
+        if self._flush_requested or self._pending_count >= self.max_items:
+            return True
+        return self._deadline is not None and time.monotonic() >= self._deadline
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._ready():
+                    timeout = None
+                    if self._pending and self._deadline is not None:
+                        timeout = max(0.0, self._deadline - time.monotonic())
+                    self._cond.wait(timeout)
+                pending, self._pending = self._pending, {}
+                self._pending_count = 0
+                self._deadline = None
+                self._flush_requested = False
+                self._sending = True
+
+            try:
+                for (url, api_key), bucket in pending.items():
+                    _post_items(url, api_key, list(bucket.values()))
+            finally:
+                with self._cond:
+                    self._sending = False
+                    self._cond.notify_all()
+
+
+_queue = _FeedbackQueue()
+
+
+def enqueue_feedback(
+    run_id: str,
+    score: Optional[Literal["thumbs_up", "thumbs_down"]] = None,
+    text: Optional[str] = None,
+    api_key: Optional[str] = None,
+    tcc_url: Optional[str] = None,
+    enabled: Optional[bool] = None,
+) -> bool:
+    """Queue feedback for background delivery and return immediately.
+
+    Repeated feedback for the same run within the coalescing window is merged
+    before sending. Returns ``False`` if the item could not be queued.
+    """
+    from .config import is_enabled
+
+    if not is_enabled(enabled):
+        return False
+
+    _validate(score, text)
+
+    api_key = _resolve_api_key(api_key)
+    if not api_key:
+        return False
+
+    _queue.put(_feedback_url(api_key, tcc_url), api_key, _build_item(run_id, score, text))
+    return True
+
+
+def flush_feedback(timeout: Optional[float] = None) -> bool:
+    """Block until queued feedback has been sent. Returns ``False`` on timeout."""
+    return _queue.flush(timeout)
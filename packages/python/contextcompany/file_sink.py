@@ -0,0 +1,294 @@
+"""Write telemetry to local newline-delimited JSON segment files.
+
+For environments without egress: records are appended to size-capped
+segment files that a separate uploader can ship later::
+
+    from contextcompany import configure
+    from contextcompany.file_sink import FileSink
+
+    configure(transport=FileSink("/var/lib/tcc"))
+
+Segments are written as ``<prefix>-<utc time>-<sink id>-<seq>.jsonl[.gz].part``
+(the sink id is random, so sinks sharing a directory never collide) and
+renamed without the ``.part`` suffix once complete, so anything without the
+suffix is safe to upload and delete. Open segments hold an advisory
+``flock``; any ``.part`` segment nobody holds a lock on was left by a sink
+that died and is completed when a sink starts or rotates in the directory.
+Platforms without ``fcntl`` leave such segments in place.
+"""
+
+import atexit
+import gzip
+import json
+import os
+import threading
+import time
+import uuid
+import zlib
+from datetime import datetime, timezone
+from typing import Any, BinaryIO, Dict, List, Optional
+
+from ._utils import _debug
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None  # type: ignore[assignment]
+
+PART_SUFFIX = ".part"
+_RECOVERING = ".recovering"
+
+
+class FileSink:
+    """Buffered, rotating JSONL writer usable as a custom SDK transport.
+
+    ``write()`` only serializes and appends to an in-memory buffer; the buffer
+    is written once it reaches ``buffer_bytes`` or every ``flush_interval``
+    seconds by a background thread, which also fsyncs every
+    ``fsync_interval`` seconds. Segments rotate at ``max_segment_bytes``
+    (uncompressed) or, with ``max_segment_age``, once they have been open
+    that many seconds (even when idle), so quiet hosts still hand over
+    segments for upload. With ``max_segments``, the oldest complete segments
+    are deleted so disk usage stays capped.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        prefix: str = "tcc",
+        max_segment_bytes: int = 64 * 1024 * 1024,
+        max_segments: Optional[int] = None,
+        compress: bool = False,
+        buffer_bytes: int = 1024 * 1024,
+        flush_interval: float = 1.0,
+        fsync_interval: float = 5.0,
+        max_segment_age: Optional[float] = None,
+    ):
+        self.directory = directory
+        self.prefix = prefix
+        self.max_segment_bytes = max_segment_bytes
+        self.max_segments = max_segments
+        self.compress = compress
+        self.buffer_bytes = buffer_bytes
+        self.flush_interval = flush_interval
+        self.fsync_interval = fsync_interval
+        self.max_segment_age = max_segment_age
+        self._id = uuid.uuid4().hex[:8]
+        os.makedirs(directory, exist_ok=True)
+        self._recover()
+
+        self._lock = threading.Lock()
+        self._buffer: List[bytes] = []
+        self._buffered = 0
+        self._io_lock = threading.Lock()
+        self._raw: Optional[BinaryIO] = None
+        self._stream: Optional[BinaryIO] = None
+        self._path: Optional[str] = None
+        self._segment_bytes = 0
+        self._segment_opened = 0.0
+        self._seq = 0
+        self._last_fsync = time.monotonic()
+        self._closed = False
+        self._wakeup = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="tcc-file-sink", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def write(self, record: Dict[str, Any]) -> None:
+        line = json.dumps(record, separators=(",", ":"), default=str).encode("utf-8") + b"\n"
+        with self._lock:
+            if self._closed:
+                return
+            self._buffer.append(line)
+            self._buffered += len(line)
+            full = self._buffered >= self.buffer_bytes
+        if full:
+            # Disk I/O stays on the background thread.
+            self._wakeup.set()
+
+    def send(
+        self,
+        payload: Dict[str, Any],
+        label: str,
+        api_key: Optional[str] = None,
+        tcc_url: Optional[str] = None,
+        tenant_id: Optional[str] = None,
+    ) -> None:
+        """Custom SDK transport hook; see ``configure(transport=...)``."""
+        self.write(payload)
+
+    def flush(self, fsync: bool = False) -> None:
+        with self._lock:
+            lines, self._buffer, self._buffered = self._buffer, [], 0
+
+        with self._io_lock:
+            for line in lines:
+                if self._stream is None or self._segment_full():
+                    self._rotate()
+                self._stream.write(line)
+                self._segment_bytes += len(line)
+            if self._stream is not None:
+                self._stream.flush()
+                if fsync or time.monotonic() - self._last_fsync >= self.fsync_interval:
+                    os.fsync(self._raw.fileno())
+                    self._last_fsync = time.monotonic()
+                if self._segment_expired():
+                    self._finish_segment()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        self._wakeup.set()
+        self._thread.join(timeout=5)
+        self.flush(fsync=True)
+        with self._io_lock:
+            self._finish_segment()
+
+    def _run(self) -> None:
+        while not self._closed:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            if self._closed:
+                return
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"[TCC] Failed to write to {self.directory}: {e}")
+
+    def _rotate(self) -> None:
+        """Close the current segment and open the next. Callers must hold ``self._io_lock``."""
+        self._finish_segment()
+
+        self._seq += 1
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S")
+        ext = ".jsonl.gz" if self.compress else ".jsonl"
+        name = f"{self.prefix}-{stamp}-{self._id}-{self._seq:06d}{ext}"
+        self._path = os.path.join(self.directory, name)
+        self._raw = open(self._path + PART_SUFFIX, "wb")
+        _try_lock(self._raw)
+        self._stream = gzip.GzipFile(fileobj=self._raw, mode="wb") if self.compress else self._raw
+        self._segment_bytes = 0
+        self._segment_opened = time.monotonic()
+        _debug(f"Writing segment {self._path}")
+
+    def _segment_full(self) -> bool:
+        return self._segment_bytes >= self.max_segment_bytes or self._segment_expired()
+
+    def _segment_expired(self) -> bool:
+        return (
+            self._stream is not None
+            and self.max_segment_age is not None
+            and time.monotonic() - self._segment_opened >= self.max_segment_age
+        )
+
+    def _finish_segment(self) -> None:
+        if self._stream is None:
+            return
+        if self._stream is not self._raw:
+            self._stream.close()
+        self._raw.flush()
+        os.fsync(self._raw.fileno())
+        self._raw.close()
+        os.replace(self._path + PART_SUFFIX, self._path)
+        self._stream = self._raw = None
+        self._recover()
+
+    def _prune(self) -> None:
+        if self.max_segments is None:
+            return
+        segments = sorted(
+            name
+            for name in os.listdir(self.directory)
+            if name.startswith(f"{self.prefix}-") and not name.endswith(PART_SUFFIX)
+        )
+        for name in segments[: max(0, len(segments) - self.max_segments)]:
+            os.remove(os.path.join(self.directory, name))
+
+    def _recover(self) -> None:
+        """Complete ``.part`` segments no running sink holds a lock on, then prune."""
+        if fcntl is not None:
+            for name in sorted(os.listdir(self.directory)):
+                if name.startswith(f"{self.prefix}-") and name.endswith(PART_SUFFIX):
+                    self._recover_part(os.path.join(self.directory, name))
+        self._prune()
+
+    def _recover_part(self, part: str) -> None:
+        try:
+            f = open(part, "rb")
+        except FileNotFoundError:
+            return  # completed by another sink meanwhile
+        with f:
+            if not _try_lock(f):
+                return  # still being written
+            try:
+                if os.fstat(f.fileno()).st_ino != os.stat(part).st_ino:
+                    return
+            except FileNotFoundError:
+                return
+            if part.endswith(_RECOVERING + PART_SUFFIX):
+                # An earlier recovery was interrupted; its source is still there.
+                os.remove(part)
+                return
+            try:
+                _recover_segment(part)
+                _debug(f"Recovered segment {part}")
+            except Exception as e:
+                print(f"[TCC] Failed to recover {part}: {e}")
+
+
+def _try_lock(f: BinaryIO) -> bool:
+    """Take a non-blocking exclusive ``flock`` on ``f``, held until it is closed."""
+    if fcntl is None:
+        return True
+    try:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        return False
+    return True
+
+
+def _recover_segment(part: str) -> None:
+    """Keep every complete line of ``part`` and publish it without the suffix."""
+    path = part[: -len(PART_SUFFIX)]
+    if not path.endswith(".gz"):
+        with open(part, "r+b") as f:
+            f.truncate(_last_line_end(f))
+            os.fsync(f.fileno())
+        os.replace(part, path)
+        return
+
+    # The gzip trailer is missing: re-compress whatever decompresses cleanly.
+    temp = path + _RECOVERING + PART_SUFFIX
+    decompressor = zlib.decompressobj(zlib.MAX_WBITS | 16)
+    pending = b""
+    with open(part, "rb") as source, open(temp, "wb") as raw:
+        _try_lock(raw)
+        with gzip.GzipFile(fileobj=raw, mode="wb") as target:
+            for chunk in iter(lambda: source.read(1024 * 1024), b""):
+                try:
+                    data = pending + decompressor.decompress(chunk)
+                except zlib.error:
+                    break
+                end = data.rfind(b"\n") + 1
+                target.write(data[:end])
+                pending = data[end:]
+                if decompressor.eof:
+                    break
+        raw.flush()
+        os.fsync(raw.fileno())
+    os.replace(temp, path)
+    os.remove(part)
+
+
+def _last_line_end(f: BinaryIO) -> int:
+    pos = f.seek(0, os.SEEK_END)
+    while pos > 0:
+        start = max(0, pos - 65536)
+        f.seek(start)
+        newline = f.read(pos - start).rfind(b"\n")
+        if newline != -1:
+            return start + newline + 1
+        pos = start
+    return 0
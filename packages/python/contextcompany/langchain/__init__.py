@@ -1,11 +1,13 @@
 """LangChain instrumentation for The Context Company."""
 
-from typing import Optional
+from typing import Mapping, Optional
 
 from opentelemetry.instrumentation.langchain import LangchainInstrumentor
 from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import SpanExporter
 
 from .base import setup_instrumentation
+from ..otel import AttributeLimits, TailSampler, create_tenant_exporter
 from ..config import get_api_key, get_url
 from .._utils import _debug
 
@@ -13,16 +15,29 @@ from .._utils import _debug
 def instrument_langchain(
     api_key: Optional[str] = None,
     tcc_url: Optional[str] = None,
+    attribute_limits: Optional[AttributeLimits] = None,
+    sampler: Optional[TailSampler] = None,
+    tenant_api_keys: Optional[Mapping[str, str]] = None,
+    exporter: Optional[SpanExporter] = None,
 ) -> TracerProvider:
-    resolved_api_key = get_api_key(api_key)
-    resolved_endpoint = tcc_url or get_url("/v1/traces", api_key=resolved_api_key)
-
     _debug("Initializing LangChain instrumentation")
-    _debug(f"Endpoint: {resolved_endpoint}")
+
+    resolved_api_key = None
+    resolved_endpoint = None
+    if exporter is None and tenant_api_keys is not None:
+        _debug(f"Routing spans for {len(tenant_api_keys)} tenants")
+        exporter = create_tenant_exporter(tenant_api_keys, api_key=api_key, tcc_url=tcc_url)
+    elif exporter is None:
+        resolved_api_key = get_api_key(api_key)
+        resolved_endpoint = tcc_url or get_url("/v1/traces", api_key=resolved_api_key)
+        _debug(f"Endpoint: {resolved_endpoint}")
 
     provider = setup_instrumentation(
         api_key=resolved_api_key,
         endpoint=resolved_endpoint,
+        attribute_limits=attribute_limits,
+        sampler=sampler,
+        exporter=exporter,
     )
 
     LangchainInstrumentor().instrument()
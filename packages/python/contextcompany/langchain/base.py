@@ -4,8 +4,10 @@ from opentelemetry import trace
 from opentelemetry.sdk.trace import TracerProvider
 from opentelemetry.sdk.resources import Resource
 from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
-from ..otel import RunIdSpanProcessor, TraceBatchSpanProcessor
-from .exporter import RunIdFixingExporter
+from opentelemetry.sdk.trace.export import SpanExporter
+from ..otel import AttributeLimits, RunIdSpanProcessor, TailSampler, TraceBatchSpanProcessor
+from ..otel import exporter as otel_exporter
+from .exporter import RunIdFixingExporter, extract_context_user_ids, extract_user_ids
 from .._utils import _debug
 
 
@@ -15,24 +17,30 @@ def create_tracer_provider(resource_attributes: Optional[dict] = None) -> Tracer
 
 
 def create_otlp_exporter(endpoint: str, api_key: str, headers: Optional[dict] = None) -> OTLPSpanExporter:
-    exporter_headers = {"Authorization": f"Bearer {api_key}"}
-    if headers:
-        exporter_headers.update(headers)
-    return OTLPSpanExporter(endpoint=endpoint, headers=exporter_headers)
+    return otel_exporter.create_otlp_exporter(endpoint, api_key, headers=headers)
 
 
 def setup_instrumentation(
-    api_key: str,
-    endpoint: str,
+    api_key: Optional[str],
+    endpoint: Optional[str],
     resource_attributes: Optional[dict] = None,
+    attribute_limits: Optional[AttributeLimits] = None,
+    sampler: Optional[TailSampler] = None,
+    exporter: Optional[SpanExporter] = None,
 ) -> TracerProvider:
     _debug("Creating tracer provider")
     provider = create_tracer_provider(resource_attributes)
-    provider.add_span_processor(RunIdSpanProcessor())
+    provider.add_span_processor(RunIdSpanProcessor(resolver=extract_user_ids, context_resolver=extract_context_user_ids))
 
-    base_exporter = create_otlp_exporter(endpoint, api_key)
+    base_exporter = exporter or create_otlp_exporter(endpoint, api_key)
     fixing_exporter = RunIdFixingExporter(base_exporter)
-    batch_processor = TraceBatchSpanProcessor(exporter=fixing_exporter, timeout_seconds=600)
+    batch_processor = TraceBatchSpanProcessor(
+        exporter=fixing_exporter,
+        timeout_seconds=600,
+        attribute_limits=attribute_limits,
+        sampler=sampler,
+        extractor=extract_user_ids,
+    )
 
     provider.add_span_processor(batch_processor)
     trace.set_tracer_provider(provider)
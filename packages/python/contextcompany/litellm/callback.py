@@ -14,43 +14,71 @@ Usage:
     )
 """
 
-import json
-import atexit
-
 from litellm.integrations.custom_logger import CustomLogger
 from opentelemetry import trace
 from opentelemetry.sdk.trace import TracerProvider
 from opentelemetry.sdk.trace.export import BatchSpanProcessor
 from opentelemetry.sdk.resources import Resource, SERVICE_NAME
-from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+
+from .._utils import _json_dumps
+from ..otel.deferred import defer_attributes
+from ..otel.shared_provider import acquire_tracer_provider, release_tracer_provider
+
 
 class TCCCallback(CustomLogger):
     """Exports each LLM call to TCC as an OTEL span with metadata.tcc.runId."""
 
-    def __init__(self, api_key=None, endpoint=None, service_name="litellm"):
+    def __init__(self, api_key=None, endpoint=None, service_name="litellm", attribute_limits=None, exporter=None):
         from ..config import get_api_key, get_url
 
-        api_key = get_api_key(api_key)
-        endpoint = endpoint or get_url("/v1/otel-steps", api_key=api_key)
-
-        exporter = OTLPSpanExporter(
-            endpoint=endpoint,
-            headers={"Authorization": f"Bearer {api_key}"},
-        )
-        self.provider = TracerProvider(
-            resource=Resource(attributes={SERVICE_NAME: service_name}),
+        if exporter is None:
+            api_key = get_api_key(api_key)
+            endpoint = endpoint or get_url("/v1/otel-steps", api_key=api_key)
+        self.attribute_limits = attribute_limits
+
+        # Callbacks with the same settings share one provider, processor and
+        # exporter, so creating one per router, tenant or request is cheap.
+        # Limits compare by value; custom exporters by identity.
+        self._provider_key = (endpoint, api_key, service_name, attribute_limits, exporter)
+        self.provider = acquire_tracer_provider(
+            self._provider_key,
+            lambda: _create_provider(endpoint, api_key, service_name, attribute_limits, exporter),
         )
-        self.provider.add_span_processor(BatchSpanProcessor(exporter))
         self.tracer = self.provider.get_tracer("contextcompany.litellm")
-        atexit.register(self.provider.shutdown)
+        self._closed = False
+
+    def force_flush(self, timeout_millis=30000):
+        """Export spans recorded so far (by every callback sharing this pipeline)."""
+        return self.provider.force_flush(timeout_millis)
+
+    def close(self):
+        """Release this callback's reference to the shared pipeline.
+
+        The pipeline is flushed and shut down once every callback using it has
+        been closed; otherwise it is shut down at interpreter exit.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        release_tracer_provider(self._provider_key)
 
     def _get_metadata(self, kwargs):
         return kwargs.get("litellm_params", {}).get("metadata", {}) or {}
 
     def log_success_event(self, kwargs, response_obj, start_time, end_time):
+        self._record_success(kwargs, response_obj, start_time, end_time)
+
+    def log_failure_event(self, kwargs, response_obj, start_time, end_time):
+        self._record_failure(kwargs, response_obj, start_time, end_time)
+
+    async def async_log_success_event(self, kwargs, response_obj, start_time, end_time):
+        self._record_success(kwargs, response_obj, start_time, end_time)
+
+    async def async_log_failure_event(self, kwargs, response_obj, start_time, end_time):
+        self._record_failure(kwargs, response_obj, start_time, end_time)
+
+    def _start_span(self, kwargs, start_time):
         metadata = self._get_metadata(kwargs)
-        usage = getattr(response_obj, "usage", None)
-        choices = getattr(response_obj, "choices", [])
 
         span = self.tracer.start_span(
             name="litellm_request",
@@ -62,8 +90,16 @@ class TCCCallback(CustomLogger):
         if run_id:
             span.set_attribute("metadata.tcc.runId", run_id)
 
-        # Model
         span.set_attribute("gen_ai.request.model", kwargs.get("model", ""))
+        return span
+
+    def _record_success(self, kwargs, response_obj, start_time, end_time):
+        usage = getattr(response_obj, "usage", None)
+        choices = getattr(response_obj, "choices", [])
+
+        span = self._start_span(kwargs, start_time)
+
+        # Model
         span.set_attribute("gen_ai.response.model", getattr(response_obj, "model", ""))
 
         # Tokens
@@ -71,41 +107,70 @@ class TCCCallback(CustomLogger):
             span.set_attribute("gen_ai.usage.input_tokens", getattr(usage, "prompt_tokens", 0))
             span.set_attribute("gen_ai.usage.output_tokens", getattr(usage, "completion_tokens", 0))
 
-        # Messages
+        # Messages: only shallow snapshots are taken here (callers commonly
+        # append to the same list for the next turn, and response objects are
+        # mutable); encoding happens on the batch processor's worker thread,
+        # off the request path.
         messages = kwargs.get("messages")
-        if messages:
-            span.set_attribute("gen_ai.input.messages", json.dumps(messages))
-
-        if choices:
-            msg = getattr(choices[0], "message", None)
-            if msg:
-                out = {"role": getattr(msg, "role", "assistant")}
-                if getattr(msg, "content", None):
-                    out["content"] = msg.content
-                if getattr(msg, "tool_calls", None):
-                    out["tool_calls"] = [
-                        {"id": tc.id, "function": {"name": tc.function.name, "arguments": tc.function.arguments}}
-                        for tc in msg.tool_calls
-                    ]
-                span.set_attribute("gen_ai.output.messages", json.dumps([out]))
-
-            span.set_attribute("gen_ai.response.finish_reasons",
-                               json.dumps([getattr(choices[0], "finish_reason", "stop")]))
+        snapshot = list(messages) if messages else None
+        choice = choices[0] if choices else None
+        output = _output_message(choice) if choice is not None else None
+        finish_reason = getattr(choice, "finish_reason", "stop") if choice is not None else None
+        limits = self.attribute_limits
+        defer_attributes(
+            span, lambda: _message_attributes(snapshot, output, finish_reason, limits)
+        )
 
         span.end(end_time=int(end_time.timestamp() * 1e9))
 
-    def log_failure_event(self, kwargs, response_obj, start_time, end_time):
-        metadata = self._get_metadata(kwargs)
+    def _record_failure(self, kwargs, response_obj, start_time, end_time):
+        span = self._start_span(kwargs, start_time)
+        span.set_status(trace.StatusCode.ERROR, str(response_obj))
+        span.end(end_time=int(end_time.timestamp() * 1e9))
 
-        span = self.tracer.start_span(
-            name="litellm_request",
-            start_time=int(start_time.timestamp() * 1e9),
-        )
 
-        run_id = metadata.get("tcc.runId") or metadata.get("tcc.run_id")
-        if run_id:
-            span.set_attribute("metadata.tcc.runId", run_id)
+def _create_provider(endpoint, api_key, service_name, attribute_limits, exporter):
+    from ..otel import AttributeLimitingExporter, DeferredAttributesExporter, create_otlp_exporter
 
-        span.set_attribute("gen_ai.request.model", kwargs.get("model", ""))
-        span.set_status(trace.StatusCode.ERROR, str(response_obj))
-        span.end(end_time=int(end_time.timestamp() * 1e9))
+    if exporter is None:
+        exporter = create_otlp_exporter(endpoint, api_key)
+    if attribute_limits is not None:
+        exporter = AttributeLimitingExporter(exporter, attribute_limits)
+    provider = TracerProvider(
+        resource=Resource(attributes={SERVICE_NAME: service_name}),
+    )
+    provider.add_span_processor(BatchSpanProcessor(DeferredAttributesExporter(exporter)))
+    return provider
+
+
+def _output_message(choice):
+    """Plain-dict copy of a choice's message (role, content, tool calls), or ``None``."""
+    msg = getattr(choice, "message", None)
+    if not msg:
+        return None
+    out = {"role": getattr(msg, "role", "assistant")}
+    if getattr(msg, "content", None):
+        out["content"] = msg.content
+    if getattr(msg, "tool_calls", None):
+        out["tool_calls"] = [
+            {"id": tc.id, "function": {"name": tc.function.name, "arguments": tc.function.arguments}}
+            for tc in msg.tool_calls
+        ]
+    return out
+
+
+def _message_attributes(messages, output, finish_reason, limits=None):
+    """Input/output message attributes for a completion, JSON-encoded.
+
+    With ``limits``, message text is cut before encoding so the encoded
+    value fits the attribute budget and stays valid JSON.
+    """
+    encode = limits.encode_messages if limits is not None else _json_dumps
+    attributes = {}
+    if messages:
+        attributes["gen_ai.input.messages"] = encode(messages)
+    if output is not None:
+        attributes["gen_ai.output.messages"] = encode([output])
+    if finish_reason is not None:
+        attributes["gen_ai.response.finish_reasons"] = _json_dumps([finish_reason])
+    return attributes
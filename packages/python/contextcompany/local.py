@@ -0,0 +1,394 @@
+"""Store telemetry in a local SQLite database and query it.
+
+For analysing traces without the dashboard::
+
+    from contextcompany import configure
+    from contextcompany.local import SQLiteSink, latency_by_model
+
+    configure(transport=SQLiteSink("tcc.db"))
+    ...
+    latency_by_model("tcc.db")
+    # [{"model": "gpt-4o", "count": 12, "p50_ms": 840.0, "p95_ms": 2210.5}]
+
+The sink stores the payloads the custom SDK builds (runs, steps and tool
+calls) and, through :class:`~contextcompany.otel.SQLiteSpanExporter`,
+OpenTelemetry spans, so framework integrations land in the same database.
+"""
+
+import atexit
+import json
+import queue
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from ._utils import _debug
+from .step import _percentile
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    session_id TEXT,
+    start_time TEXT,
+    end_time TEXT,
+    duration_ms REAL,
+    status_code INTEGER,
+    payload TEXT
+);
+CREATE TABLE IF NOT EXISTS steps (
+    step_id TEXT PRIMARY KEY,
+    run_id TEXT,
+    model TEXT,
+    start_time TEXT,
+    end_time TEXT,
+    duration_ms REAL,
+    status_code INTEGER,
+    input_tokens INTEGER,
+    output_tokens INTEGER,
+    cost REAL,
+    payload TEXT
+);
+CREATE TABLE IF NOT EXISTS tool_calls (
+    tool_call_id TEXT PRIMARY KEY,
+    run_id TEXT,
+    tool_name TEXT,
+    start_time TEXT,
+    end_time TEXT,
+    duration_ms REAL,
+    status_code INTEGER,
+    payload TEXT
+);
+CREATE TABLE IF NOT EXISTS spans (
+    trace_id TEXT,
+    span_id TEXT,
+    parent_span_id TEXT,
+    name TEXT,
+    run_id TEXT,
+    session_id TEXT,
+    model TEXT,
+    start_time TEXT,
+    end_time TEXT,
+    duration_ms REAL,
+    status_code TEXT,
+    input_tokens INTEGER,
+    output_tokens INTEGER,
+    attributes TEXT,
+    PRIMARY KEY (trace_id, span_id)
+);
+CREATE INDEX IF NOT EXISTS runs_session_id ON runs (session_id);
+CREATE INDEX IF NOT EXISTS runs_start_time ON runs (start_time);
+CREATE INDEX IF NOT EXISTS steps_run_id ON steps (run_id);
+CREATE INDEX IF NOT EXISTS steps_model ON steps (model);
+CREATE INDEX IF NOT EXISTS steps_start_time ON steps (start_time);
+CREATE INDEX IF NOT EXISTS tool_calls_run_id ON tool_calls (run_id);
+CREATE INDEX IF NOT EXISTS tool_calls_start_time ON tool_calls (start_time);
+CREATE INDEX IF NOT EXISTS spans_run_id ON spans (run_id);
+CREATE INDEX IF NOT EXISTS spans_session_id ON spans (session_id);
+CREATE INDEX IF NOT EXISTS spans_model ON spans (model);
+CREATE INDEX IF NOT EXISTS spans_start_time ON spans (start_time);
+"""
+
+_INSERTS = {
+    "run": "INSERT OR REPLACE INTO runs VALUES (?, ?, ?, ?, ?, ?, ?)",
+    "step": "INSERT OR REPLACE INTO steps VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+    "tool_call": "INSERT OR REPLACE INTO tool_calls VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+    "span": "INSERT OR REPLACE INTO spans VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+}
+
+_STOP = object()
+
+
+def _duration_ms(start: Optional[str], end: Optional[str]) -> Optional[float]:
+    if not start or not end:
+        return None
+    delta = datetime.fromisoformat(end.replace("Z", "+00:00")) - datetime.fromisoformat(start.replace("Z", "+00:00"))
+    return delta.total_seconds() * 1000
+
+
+def _ns_to_iso(value: Optional[int]) -> Optional[str]:
+    if value is None:
+        return None
+    stamp = datetime.fromtimestamp(value / 1e9, tz=timezone.utc)
+    return stamp.strftime("%Y-%m-%dT%H:%M:%S.") + f"{stamp.microsecond // 1000:03d}Z"
+
+
+def _row(record: Dict[str, Any]) -> Tuple[Any, ...]:
+    """Column values for a record, in the order of its table's columns."""
+    kind = record["type"]
+    start, end = record.get("start_time"), record.get("end_time")
+    if kind == "span":
+        attributes = record.get("attributes") or {}
+        start, end = record.get("start_time_unix_nano"), record.get("end_time_unix_nano")
+        return (
+            record["trace_id"],
+            record["span_id"],
+            record.get("parent_span_id"),
+            record.get("name"),
+            attributes.get("tcc.runId"),
+            attributes.get("tcc.sessionId") or attributes.get("session.id"),
+            record.get("model"),
+            _ns_to_iso(start),
+            _ns_to_iso(end),
+            (end - start) / 1e6 if start is not None and end is not None else None,
+            record.get("status_code"),
+            record.get("input_tokens"),
+            record.get("output_tokens"),
+            json.dumps(attributes, default=str),
+        )
+
+    payload = json.dumps(record, default=str)
+    duration = _duration_ms(start, end)
+    if kind == "run":
+        return (record["run_id"], record.get("session_id"), start, end, duration, record.get("status_code"), payload)
+    if kind == "step":
+        input_tokens = None
+        if record.get("prompt_uncached_tokens") is not None or record.get("prompt_cached_tokens") is not None:
+            input_tokens = (record.get("prompt_uncached_tokens") or 0) + (record.get("prompt_cached_tokens") or 0)
+        return (
+            record["step_id"],
+            record["run_id"],
+            record.get("model_used") or record.get("model_requested"),
+            start,
+            end,
+            duration,
+            record.get("status_code"),
+            input_tokens,
+            record.get("completion_tokens"),
+            record.get("real_total_cost"),
+            payload,
+        )
+    return (
+        record["tool_call_id"],
+        record["run_id"],
+        record.get("tool_name"),
+        start,
+        end,
+        duration,
+        record.get("status_code"),
+        payload,
+    )
+
+
+class SQLiteSink:
+    """SQLite writer usable as a custom SDK transport.
+
+    ``write()`` only enqueues; a background thread owns the connection and
+    inserts whatever has queued up (up to ``batch_size`` records) in one
+    transaction. The database is opened in WAL mode, so the query functions
+    in this module can read it while the sink is writing. When the queue is
+    full, records are dropped rather than blocking the caller; records that
+    cannot be stored (missing ids, unbindable values) are skipped and logged
+    without losing the rest of their batch.
+    """
+
+    def __init__(self, path: str, batch_size: int = 500, max_queue_size: int = 100000):
+        self.path = path
+        self.batch_size = batch_size
+        self._queue: "queue.Queue[Any]" = queue.Queue(max_queue_size)
+        self._closed = False
+        self._dropped = 0
+
+        # Create the schema up front so queries work before the first write.
+        connection = self._connect()
+        connection.close()
+
+        self._thread = threading.Thread(target=self._run, name="tcc-sqlite-sink", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def write(self, record: Dict[str, Any]) -> None:
+        if self._closed:
+            return
+        if record.get("type") not in _INSERTS:
+            _debug(f"Skipping {record.get('type')} record for {self.path}")
+            return
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            self._dropped += 1
+            if self._dropped == 1:
+                print(f"[TCC] SQLite queue full, dropping records for {self.path}")
+
+    def send(
+        self,
+        payload: Dict[str, Any],
+        label: str,
+        api_key: Optional[str] = None,
+        tcc_url: Optional[str] = None,
+        tenant_id: Optional[str] = None,
+    ) -> None:
+        """Custom SDK transport hook; see ``configure(transport=...)``."""
+        self.write(payload)
+
+    def flush(self, timeout: float = 30.0) -> bool:
+        """Wait until every queued record has been committed.
+
+        Returns ``False`` if that did not happen within ``timeout`` seconds
+        or the writer thread is no longer running.
+        """
+        deadline = time.monotonic() + timeout
+        with self._queue.all_tasks_done:
+            while self._queue.unfinished_tasks:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not self._thread.is_alive():
+                    return False
+                self._queue.all_tasks_done.wait(min(remaining, 0.1))
+        return True
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_STOP)
+        self._thread.join(timeout=5)
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.path)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.executescript(_SCHEMA)
+        return connection
+
+    def _run(self) -> None:
+        connection = self._connect()
+        try:
+            while True:
+                batch = [self._queue.get()]
+                while len(batch) < self.batch_size:
+                    try:
+                        batch.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+
+                stop = any(record is _STOP for record in batch)
+                try:
+                    self._insert(connection, [record for record in batch if record is not _STOP])
+                except Exception as e:
+                    print(f"[TCC] Failed to write to {self.path}: {e}")
+                for _ in batch:
+                    self._queue.task_done()
+                if stop:
+                    return
+        finally:
+            connection.close()
+
+    def _insert(self, connection: sqlite3.Connection, records: List[Dict[str, Any]]) -> None:
+        rows: Dict[str, List[Tuple[Any, ...]]] = defaultdict(list)
+        for record in records:
+            try:
+                rows[record["type"]].append(_row(record))
+            except Exception as e:
+                self._skip(record, e)
+        try:
+            with connection:
+                for kind, values in rows.items():
+                    connection.executemany(_INSERTS[kind], values)
+        except sqlite3.Error:
+            # Find the offending rows one by one instead of losing the batch.
+            for kind, values in rows.items():
+                for values_row in values:
+                    try:
+                        with connection:
+                            connection.execute(_INSERTS[kind], values_row)
+                    except sqlite3.Error as e:
+                        self._skip({"type": kind, "id": values_row[0]}, e)
+        _debug(f"Wrote {sum(len(values) for values in rows.values())} records to {self.path}")
+
+    def _skip(self, record: Dict[str, Any], error: Exception) -> None:
+        print(f"[TCC] Skipping invalid {record.get('type')} record for {self.path}: {error!r}")
+
+
+def _query(path: str, sql: str, params: Tuple[Any, ...] = ()) -> List[sqlite3.Row]:
+    connection = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    connection.row_factory = sqlite3.Row
+    try:
+        return connection.execute(sql, params).fetchall()
+    finally:
+        connection.close()
+
+
+def latency_by_model(path: str, since: Optional[str] = None) -> List[Dict[str, Any]]:
+    """p50/p95 latency of LLM steps and spans per model, slowest p95 first.
+
+    Args:
+        path: Database written by :class:`SQLiteSink`.
+        since: Only include calls started at or after this ISO 8601 time.
+    """
+    rows = _query(
+        path,
+        "SELECT model, duration_ms FROM steps WHERE model IS NOT NULL AND start_time >= ? "
+        "UNION ALL "
+        "SELECT model, duration_ms FROM spans WHERE model IS NOT NULL AND start_time >= ?",
+        (since or "", since or ""),
+    )
+    durations: Dict[str, List[float]] = defaultdict(list)
+    for row in rows:
+        if row["duration_ms"] is not None:
+            durations[row["model"]].append(row["duration_ms"])
+
+    results = []
+    for model, values in durations.items():
+        values.sort()
+        results.append({
+            "model": model,
+            "count": len(values),
+            "p50_ms": _percentile(values, 50),
+            "p95_ms": _percentile(values, 95),
+        })
+    return sorted(results, key=lambda result: result["p95_ms"], reverse=True)
+
+
+def tokens_by_session(path: str, since: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Input and output token totals per session, largest total first.
+
+    Steps are attributed to sessions through their run; spans through their
+    ``tcc.sessionId`` (or ``session.id``) attribute.
+
+    Args:
+        path: Database written by :class:`SQLiteSink`.
+        since: Only include calls started at or after this ISO 8601 time.
+    """
+    rows = _query(
+        path,
+        "SELECT session_id, COUNT(DISTINCT run_id) AS runs, SUM(input_tokens) AS input_tokens, "
+        "SUM(output_tokens) AS output_tokens FROM ("
+        "  SELECT runs.session_id, steps.run_id, steps.input_tokens, steps.output_tokens"
+        "  FROM steps JOIN runs ON runs.run_id = steps.run_id"
+        "  WHERE runs.session_id IS NOT NULL AND steps.start_time >= ?"
+        "  UNION ALL"
+        "  SELECT session_id, run_id, input_tokens, output_tokens FROM spans"
+        "  WHERE session_id IS NOT NULL AND start_time >= ?"
+        ") GROUP BY session_id",
+        (since or "", since or ""),
+    )
+    results = [
+        {
+            "session_id": row["session_id"],
+            "runs": row["runs"],
+            "input_tokens": row["input_tokens"] or 0,
+            "output_tokens": row["output_tokens"] or 0,
+            "total_tokens": (row["input_tokens"] or 0) + (row["output_tokens"] or 0),
+        }
+        for row in rows
+    ]
+    return sorted(results, key=lambda result: result["total_tokens"], reverse=True)
+
+
+def slowest_tool_calls(path: str, limit: int = 10, since: Optional[str] = None) -> List[Dict[str, Any]]:
+    """The ``limit`` slowest tool calls recorded by the custom SDK.
+
+    Args:
+        path: Database written by :class:`SQLiteSink`.
+        limit: Maximum number of tool calls to return.
+        since: Only include calls started at or after this ISO 8601 time.
+    """
+    rows = _query(
+        path,
+        "SELECT tool_call_id, run_id, tool_name, start_time, duration_ms, status_code FROM tool_calls "
+        "WHERE duration_ms IS NOT NULL AND start_time >= ? ORDER BY duration_ms DESC LIMIT ?",
+        (since or "", limit),
+    )
+    return [dict(row) for row in rows]
@@ -1,9 +1,40 @@
 """Generic OpenTelemetry utilities for The Context Company."""
 
+from .attribute_limits import AttributeLimitingExporter, AttributeLimits
 from .batch_processor import TraceBatchSpanProcessor
-from .span_processor import RunIdSpanProcessor
+from .deferred import DeferredAttributesExporter, defer_attributes
+from .enrichment import EnrichingExporter
+from .custom_transport import OTelTransport, use_otel_transport
+from .export_queue import QueuedSpanExporter
+from .exporter import create_otlp_exporter
+from .file_exporter import FileSpanExporter
+from .id_cache import TraceIdCache
+from .sampling import TailSampler
+from .shared_provider import acquire_tracer_provider, release_tracer_provider
+from .sqlite_exporter import SQLiteSpanExporter
+from .tenant_routing import TenantRoutingExporter, create_tenant_exporter
+from .span_processor import RunIdSpanProcessor, get_run_id, set_run_id
 
 __all__ = [
     "TraceBatchSpanProcessor",
+    "AttributeLimits",
+    "AttributeLimitingExporter",
+    "EnrichingExporter",
+    "DeferredAttributesExporter",
+    "defer_attributes",
+    "QueuedSpanExporter",
+    "create_otlp_exporter",
+    "FileSpanExporter",
+    "SQLiteSpanExporter",
+    "TraceIdCache",
+    "TailSampler",
+    "acquire_tracer_provider",
+    "release_tracer_provider",
+    "TenantRoutingExporter",
+    "create_tenant_exporter",
+    "OTelTransport",
+    "use_otel_transport",
     "RunIdSpanProcessor",
+    "get_run_id",
+    "set_run_id",
 ]
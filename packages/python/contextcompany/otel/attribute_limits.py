@@ -0,0 +1,243 @@
+"""Byte budgets for large span attributes such as prompt/completion messages."""
+
+import hashlib
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+
+from opentelemetry.sdk.trace import ReadableSpan
+from opentelemetry.sdk.trace.export import SpanExporter, SpanExportResult
+
+from .._utils import _json_dumps
+from .span_size import _value_size
+
+TRUNCATION_MARKER = "...[truncated]"
+
+# Passes of encode_messages() shrinking the text budget by the measured JSON
+# overhead before it falls back to cutting all message text.
+_ENCODE_ATTEMPTS = 4
+
+
+@dataclass(frozen=True)
+class AttributeLimits:
+    """Truncates string attributes to per-attribute and per-span budgets.
+
+    Values longer than ``max_attribute_bytes`` are cut; if the span's
+    attributes still exceed ``max_span_bytes``, the largest remaining strings
+    are cut further until it fits. Truncated values end with
+    :data:`TRUNCATION_MARKER` and, with ``hash_truncated``, the original's
+    SHA-256 and length are recorded as ``<key>.sha256`` / ``<key>.length`` so
+    the full value can still be matched against an offloaded copy.
+
+    Sizes are UTF-8 encoded bytes; truncation never splits a character.
+    ``max_span_bytes`` covers keys, values, the truncation markers and the
+    recorded hash/length attributes.
+
+    Instances are immutable and compare by value, so equal limits can share
+    one export pipeline.
+    """
+
+    max_attribute_bytes: Optional[int] = 32768
+    max_span_bytes: Optional[int] = None
+    hash_truncated: bool = True
+
+    def limit_attributes(self, attributes: Optional[Mapping[str, Any]]) -> Optional[Dict[str, Any]]:
+        """Return a limited copy of ``attributes``, or ``None`` if already within budget."""
+        if not attributes:
+            return None
+
+        limited: Optional[Dict[str, Any]] = None
+        if self.max_attribute_bytes is not None:
+            for key, value in attributes.items():
+                if isinstance(value, str) and _exceeds(value, self.max_attribute_bytes):
+                    if limited is None:
+                        limited = dict(attributes)
+                    self._truncate(limited, key, value, self.max_attribute_bytes)
+
+        if self.max_span_bytes is not None:
+            current = limited if limited is not None else attributes
+            if _attributes_bytes(current) > self.max_span_bytes:
+                if limited is None:
+                    limited = dict(attributes)
+                self._fit_span_budget(limited, attributes)
+
+        return limited
+
+    def limit_messages(self, messages: Sequence[Any], budget: Optional[int] = None) -> List[Any]:
+        """Shallow copy of a chat message list with its text cut to ``budget`` characters.
+
+        The budget (``max_attribute_bytes`` by default) is shared by the
+        messages in order: once spent, later messages keep their role but
+        their text is replaced by :data:`TRUNCATION_MARKER`. Only dict
+        messages are cut: string ``content``, ``{"text": ...}`` content parts
+        and tool call ``arguments``. Use :meth:`encode_messages` to produce an
+        attribute value, which also accounts for the encoding overhead.
+        """
+        if budget is None:
+            budget = self.max_attribute_bytes
+        if budget is None:
+            return list(messages)
+
+        limited: List[Any] = []
+        for message in messages:
+            if not isinstance(message, dict):
+                limited.append(message)
+                continue
+            content = message.get("content")
+            if isinstance(content, str):
+                text, budget = _cut(content, budget)
+                if text is not content:
+                    message = {**message, "content": text}
+            elif isinstance(content, list):
+                parts = []
+                for part in content:
+                    if isinstance(part, dict) and isinstance(part.get("text"), str):
+                        text, budget = _cut(part["text"], budget)
+                        if text is not part["text"]:
+                            part = {**part, "text": text}
+                    parts.append(part)
+                message = {**message, "content": parts}
+            tool_calls = message.get("tool_calls")
+            if isinstance(tool_calls, list):
+                calls = []
+                for call in tool_calls:
+                    function = call.get("function") if isinstance(call, dict) else None
+                    if isinstance(function, dict) and isinstance(function.get("arguments"), str):
+                        text, budget = _cut(function["arguments"], budget)
+                        if text is not function["arguments"]:
+                            call = {**call, "function": {**function, "arguments": text}}
+                    calls.append(call)
+                message = {**message, "tool_calls": calls}
+            limited.append(message)
+        return limited
+
+    def encode_messages(
+        self, messages: Sequence[Any], encode: Callable[[Any], str] = _json_dumps
+    ) -> str:
+        """Encode a chat message list into one attribute within ``max_attribute_bytes``.
+
+        Text is cut before encoding, and the text budget is reduced by the
+        measured overhead of the encoding (keys, quoting, escapes), so the
+        result stays valid JSON that :meth:`limit_attributes` leaves alone.
+        Only when the messages without any text still exceed the budget is
+        the encoded value cut like any other attribute.
+        """
+        if self.max_attribute_bytes is None:
+            return encode(list(messages))
+
+        budget = self.max_attribute_bytes
+        for _ in range(_ENCODE_ATTEMPTS):
+            encoded = encode(self.limit_messages(messages, budget))
+            excess = _utf8_len(encoded) - self.max_attribute_bytes
+            if excess <= 0 or budget == 0:
+                return encoded
+            budget = max(0, budget - excess)
+        return encode(self.limit_messages(messages, 0))
+
+    def apply(self, span: ReadableSpan) -> ReadableSpan:
+        """Return ``span`` itself if within budget, else a copy with limited attributes.
+
+        The copy does not reference the original attribute values, so the
+        large strings can be freed while the span stays buffered.
+        """
+        limited = self.limit_attributes(span.attributes)
+        if limited is None:
+            return span
+
+        return ReadableSpan(
+            name=span.name,
+            context=span.context,
+            parent=span.parent,
+            resource=span.resource,
+            attributes=limited,
+            events=span.events,
+            links=span.links,
+            kind=span.kind,
+            status=span.status,
+            start_time=span.start_time,
+            end_time=span.end_time,
+            instrumentation_scope=span.instrumentation_scope,
+        )
+
+    def _fit_span_budget(self, limited: Dict[str, Any], original: Mapping[str, Any]) -> None:
+        sizes = {key: _utf8_len(value) for key, value in limited.items() if isinstance(value, str)}
+        candidates = sorted(
+            (key for key, value in original.items() if isinstance(value, str)),
+            key=lambda key: sizes[key],
+            reverse=True,
+        )
+        for key in candidates:
+            excess = _attributes_bytes(limited) - self.max_span_bytes
+            if excess <= 0:
+                return
+            # Cutting a value for the first time also adds the marker and the
+            # hash/length attributes, which must fit in the same budget.
+            added = _MARKER_BYTES + self._hash_bytes(key) if limited[key] is original[key] else 0
+            kept = sizes[key] - (0 if added else _MARKER_BYTES)
+            if kept <= 0 or sizes[key] <= added:
+                continue
+            self._truncate(limited, key, original[key], max(0, kept - excess - added))
+
+    def _hash_bytes(self, key: str) -> int:
+        if not self.hash_truncated:
+            return 0
+        return _utf8_len(f"{key}.sha256") + 64 + _utf8_len(f"{key}.length") + 8
+
+    def _truncate(self, limited: Dict[str, Any], key: str, original: str, keep: int) -> None:
+        """Cut ``original`` to at most ``keep`` UTF-8 bytes, plus the marker."""
+        prefix = original.encode("utf-8", "replace")[:keep].decode("utf-8", "ignore")
+        limited[key] = prefix + TRUNCATION_MARKER
+        if self.hash_truncated:
+            limited[f"{key}.sha256"] = hashlib.sha256(original.encode("utf-8", "replace")).hexdigest()
+            limited[f"{key}.length"] = len(original)
+
+
+_MARKER_BYTES = len(TRUNCATION_MARKER.encode("utf-8"))
+
+
+def _utf8_len(value: str) -> int:
+    return len(value.encode("utf-8", "replace"))
+
+
+def _exceeds(value: str, limit: int) -> bool:
+    # A character encodes to 1-4 bytes, so only values in between need encoding.
+    if len(value) > limit:
+        return True
+    if len(value) * 4 <= limit:
+        return False
+    return _utf8_len(value) > limit
+
+
+def _attributes_bytes(attributes: Mapping[str, Any]) -> int:
+    return sum(
+        _utf8_len(key) + (_utf8_len(value) if isinstance(value, str) else _value_size(value))
+        for key, value in attributes.items()
+    )
+
+
+def _cut(text: str, budget: int) -> Tuple[str, int]:
+    """``text`` cut to ``budget`` characters, and the budget left afterwards."""
+    if len(text) <= budget:
+        return text, budget - len(text)
+    return text[: max(0, budget)] + TRUNCATION_MARKER, 0
+
+
+class AttributeLimitingExporter(SpanExporter):
+    """Applies :class:`AttributeLimits` to every span before export.
+
+    Use this where spans are not buffered by ``TraceBatchSpanProcessor``
+    (which applies limits itself before buffering) to keep export request
+    sizes bounded.
+    """
+
+    def __init__(self, wrapped_exporter: SpanExporter, limits: AttributeLimits):
+        self.wrapped_exporter = wrapped_exporter
+        self.limits = limits
+
+    def export(self, spans: Sequence[ReadableSpan]) -> SpanExportResult:
+        return self.wrapped_exporter.export([self.limits.apply(span) for span in spans])
+
+    def shutdown(self) -> None:
+        return self.wrapped_exporter.shutdown()
+
+    def force_flush(self, timeout_millis: int = 30000) -> bool:
+        return self.wrapped_exporter.force_flush(timeout_millis)
@@ -1,87 +1,353 @@
-from typing import Dict, List, Optional
+from typing import Any, Callable, Dict, List, Mapping, Optional, Set, Tuple
 from opentelemetry.sdk.trace import SpanProcessor, ReadableSpan
 from opentelemetry.sdk.trace.export import SpanExporter
 from opentelemetry.trace import Span
 from opentelemetry.context import Context
 from .._utils import _debug
+from .attribute_limits import AttributeLimits
+from .export_queue import QueuedSpanExporter
+from .roots import is_local_root
+from .sampling import TailSampler
+from .span_size import estimate_span_size
+import heapq
 import threading
+import time
 
 
 class TraceBatchSpanProcessor(SpanProcessor):
-    """Batches spans by trace_id and exports when root span ends."""
+    """Batches spans by trace_id and exports when the local root span ends.
 
-    def __init__(self, exporter: SpanExporter, timeout_seconds: int = 600):
+    A span is a local root when it has no parent, its parent is remote (the
+    service was called with a propagated ``traceparent``), or its parent was
+    never started in this process. This is decided in ``on_start``; spans
+    that bypass ``on_start`` fall back to the parent check alone.
+
+    Traces that see no span activity (a span starting or ending) for
+    ``timeout_seconds`` are exported by a single background reaper thread,
+    which also forgets spans that never ended. It keeps a min-heap of expiry
+    deadlines that is updated lazily: activity only bumps the trace's
+    last-activity deadline, and stale heap entries are re-queued when popped.
+
+    Completed batches are handed to a bounded :class:`QueuedSpanExporter`, so
+    the thread that ends a span never performs network I/O and the lock is
+    only held for bookkeeping. Traces completed within
+    ``export_linger_seconds`` of each other share one export call, up to
+    ``max_export_batch_size`` spans / ``max_export_batch_bytes``.
+
+    Buffered memory is bounded. Once a trace holds ``max_spans_per_trace``
+    spans (or ``max_bytes_per_trace`` estimated bytes), its ended spans -
+    completed subtrees - are exported as a partial chunk while the rest of
+    the trace keeps running. When the whole processor exceeds
+    ``max_buffered_spans`` / ``max_buffered_bytes``, the oldest traces are
+    flushed the same way. Exporters that implement
+    ``track_trace_root(span)`` are handed the still-running root before its
+    trace is partially exported or expired, so they can enrich those spans.
+
+    With ``attribute_limits``, oversized attribute values (prompt and
+    completion messages) are truncated as each span ends, before it is
+    buffered, so neither buffered memory nor export requests grow with them.
+
+    With ``sampler``, each trace is passed to :class:`TailSampler` when it
+    completes (root ended or idle timeout) and dropped traces are discarded
+    right away. ``extractor`` (the integration's user id extractor) lets the
+    sampler keep traces with user-provided run ids. When a trace has several
+    local roots, the decision made when the first one ends applies to the
+    rest of the trace. Traces that already had chunks exported early are
+    always kept so they arrive whole; traces flushed by ``force_flush`` or
+    ``shutdown`` are not sampled.
+    """
+
+    def __init__(
+        self,
+        exporter: SpanExporter,
+        timeout_seconds: int = 600,
+        max_export_queue_size: int = 256,
+        export_workers: int = 1,
+        export_linger_seconds: float = 0.1,
+        max_export_batch_size: int = 512,
+        max_export_batch_bytes: Optional[int] = None,
+        max_spans_per_trace: int = 2048,
+        max_bytes_per_trace: Optional[int] = None,
+        max_buffered_spans: int = 65536,
+        max_buffered_bytes: Optional[int] = None,
+        attribute_limits: Optional[AttributeLimits] = None,
+        sampler: Optional[TailSampler] = None,
+        extractor: Optional[Callable[[Mapping[str, Any]], Dict[str, str]]] = None,
+    ):
         self.exporter = exporter
+        self.attribute_limits = attribute_limits
+        self.sampler = sampler
+        self._extractor = extractor if extractor is not None else getattr(exporter, "extractor", None)
+        self._exported_early: Set[int] = set()
+        self._dropped: Set[int] = set()
+        self._track_trace_root = getattr(exporter, "track_trace_root", None)
+        self._export_queue = QueuedSpanExporter(
+            exporter,
+            max_queue_size=max_export_queue_size,
+            num_workers=export_workers,
+            linger_seconds=export_linger_seconds,
+            max_export_batch_size=max_export_batch_size,
+            max_export_batch_bytes=max_export_batch_bytes,
+        )
         self.timeout_seconds = timeout_seconds
         self.batches: Dict[int, List[ReadableSpan]] = {}
-        self.batch_timers: Dict[int, threading.Timer] = {}
+        self.deadlines: Dict[int, float] = {}
+        self.max_spans_per_trace = max_spans_per_trace
+        self.max_bytes_per_trace = max_bytes_per_trace
+        self.max_buffered_spans = max_buffered_spans
+        self.max_buffered_bytes = max_buffered_bytes
+        self._measure_bytes = max_bytes_per_trace is not None or max_buffered_bytes is not None
+        self._trace_bytes: Dict[int, int] = {}
+        self._buffered_spans = 0
+        self._buffered_bytes = 0
+        self._started: Dict[int, Set[int]] = {}
+        self._local_roots: Dict[int, Dict[int, Span]] = {}
+        self._expiry_heap: List[Tuple[float, int]] = []
         self.lock = threading.Lock()
+        self._reaper_wakeup = threading.Condition(self.lock)
+        self._reaper: Optional[threading.Thread] = None
         self.shutdown_flag = False
 
     def on_start(self, span: Span, parent_context: Optional[Context] = None) -> None:
-        pass
+        trace_id = span.context.trace_id
+        span_id = span.context.span_id
+        parent = span.parent
+        deadline = time.monotonic() + self.timeout_seconds
+
+        with self.lock:
+            # Starting a span counts as activity, so traces whose spans never
+            # end are still expired by the reaper instead of leaking.
+            self._touch(trace_id, deadline)
+            started = self._started.get(trace_id)
+            if started is None:
+                started = self._started[trace_id] = set()
+            if parent is None or parent.is_remote or parent.span_id not in started:
+                self._local_roots.setdefault(trace_id, {})[span_id] = span
+            started.add(span_id)
 
     def on_end(self, span: ReadableSpan) -> None:
         if self.shutdown_flag:
             return
 
+        if self.attribute_limits is not None:
+            span = self.attribute_limits.apply(span)
+
         trace_id = span.context.trace_id
-        is_root_span = not span.parent
+        span_id = span.context.span_id
+        deadline = time.monotonic() + self.timeout_seconds
+        span_bytes = estimate_span_size(span) if self._measure_bytes else 0
 
+        completed = None
+        partial: List[List[ReadableSpan]] = []
         with self.lock:
-            if trace_id not in self.batches:
-                self.batches[trace_id] = []
-            self.batches[trace_id].append(span)
+            self._touch(trace_id, deadline)
+            batch = self.batches.get(trace_id)
+            if batch is None:
+                batch = self.batches[trace_id] = [span]
+            else:
+                batch.append(span)
+            self._buffered_spans += 1
+            if span_bytes:
+                self._buffered_bytes += span_bytes
+                self._trace_bytes[trace_id] = self._trace_bytes.get(trace_id, 0) + span_bytes
 
-            if trace_id in self.batch_timers:
-                self.batch_timers[trace_id].cancel()
+            local_roots = self._local_roots.get(trace_id)
+            if trace_id in self._started:
+                is_root_span = local_roots is not None and local_roots.pop(span_id, None) is not None
+            else:
+                is_root_span = is_local_root(span)
 
-            timer = threading.Timer(self.timeout_seconds, self._timeout_export, args=(trace_id,))
-            timer.daemon = True
-            timer.start()
-            self.batch_timers[trace_id] = timer
+            if is_root_span and local_roots:
+                # Another local root of this trace is still running (e.g. two
+                # requests from the same upstream trace); keep its bookkeeping.
+                completed = self._sample(trace_id, self._detach(trace_id))
+                if completed:
+                    self._exported_early.add(trace_id)
+                elif self.sampler is not None:
+                    self._dropped.add(trace_id)
+            elif is_root_span:
+                completed = self._take_batch(trace_id)
+            elif len(batch) >= self.max_spans_per_trace or (
+                self.max_bytes_per_trace is not None
+                and self._trace_bytes.get(trace_id, 0) >= self.max_bytes_per_trace
+            ):
+                partial.append(self._take_partial(trace_id))
 
-            if is_root_span:
-                _debug(f"Root span ended, exporting batch for trace {trace_id} ({len(self.batches.get(trace_id, []))} spans)")
-                self._export_batch(trace_id)
+            if self._over_global_budget():
+                partial.extend(self._evict_oldest())
 
-    def _export_batch(self, trace_id: int) -> None:
-        batch = self.batches.get(trace_id)
-        if not batch:
-            return
+        if completed:
+            _debug(f"Root span ended, exporting batch for trace {trace_id} ({len(completed)} spans)")
+            self._export_queue.export(completed)
+        for chunk in partial:
+            self._export_queue.export(chunk)
+
+    def _over_global_budget(self) -> bool:
+        return self._buffered_spans > self.max_buffered_spans or (
+            self.max_buffered_bytes is not None and self._buffered_bytes > self.max_buffered_bytes
+        )
+
+    def _detach(self, trace_id: int) -> List[ReadableSpan]:
+        """Remove a running trace's ended spans, keeping the trace tracked. Callers must hold ``self.lock``."""
+        chunk = self.batches[trace_id]
+        self.batches[trace_id] = []
+        self._release(trace_id, len(chunk))
+        # Ended spans are only needed to recognise late children; keep the
+        # set proportional to the spans still running.
+        started = self._started.get(trace_id)
+        if started:
+            started.difference_update(span.context.span_id for span in chunk)
+        return chunk
 
-        if trace_id in self.batch_timers:
-            self.batch_timers[trace_id].cancel()
-            del self.batch_timers[trace_id]
+    def _take_partial(self, trace_id: int) -> List[ReadableSpan]:
+        """Detach a running trace's ended spans for export. Callers must hold ``self.lock``."""
+        chunk = self._detach(trace_id)
+        if trace_id in self._dropped:
+            return []
+        self._exported_early.add(trace_id)
+        self._track_running_root(trace_id)
+        _debug(f"Trace {trace_id} over buffer budget, exporting {len(chunk)} spans incrementally")
+        return chunk
 
-        del self.batches[trace_id]
+    def _track_running_root(self, trace_id: int) -> None:
+        """Hand a still-running local root to the exporter before its trace is exported without it."""
+        local_roots = self._local_roots.get(trace_id)
+        if local_roots and self._track_trace_root is not None:
+            self._track_trace_root(next(iter(local_roots.values())))
 
-        try:
-            self.exporter.export(batch)
-        except Exception as e:
-            print(f"[TCC] Error exporting batch: {e}")
+    def _evict_oldest(self) -> List[List[ReadableSpan]]:
+        """Partially flush the oldest traces until back under the global budget."""
+        chunks = []
+        for trace_id, batch in list(self.batches.items()):
+            if not self._over_global_budget():
+                break
+            if batch:
+                chunks.append(self._take_partial(trace_id))
+        return chunks
 
-    def _timeout_export(self, trace_id: int) -> None:
+    def _release(self, trace_id: int, span_count: int) -> None:
+        self._buffered_spans -= span_count
+        if self._measure_bytes:
+            self._buffered_bytes -= self._trace_bytes.pop(trace_id, 0)
+
+    def _touch(self, trace_id: int, deadline: float) -> None:
+        """Push back a trace's idle deadline, scheduling it on first activity. Callers must hold ``self.lock``."""
+        is_new = trace_id not in self.deadlines
+        self.deadlines[trace_id] = deadline
+        if is_new:
+            self._schedule_expiry(trace_id, deadline)
+
+    def _schedule_expiry(self, trace_id: int, deadline: float) -> None:
+        # Every trace uses the same timeout, so a new trace never expires
+        # before the ones already queued; the reaper only needs waking when
+        # the heap was empty.
+        heapq.heappush(self._expiry_heap, (deadline, trace_id))
+        if len(self._expiry_heap) == 1:
+            self._reaper_wakeup.notify()
+        elif len(self._expiry_heap) > 2 * len(self.deadlines) + 64:
+            # Drop entries left behind by traces that were already exported.
+            self._expiry_heap = [(d, t) for t, d in self.deadlines.items()]
+            heapq.heapify(self._expiry_heap)
+
+        if self._reaper is None:
+            self._reaper = threading.Thread(target=self._reap_expired, name="tcc-trace-reaper", daemon=True)
+            self._reaper.start()
+
+    def _reap_expired(self) -> None:
+        while True:
+            with self.lock:
+                expired = self._wait_for_expired()
+            if expired is None:
+                return
+            for batch in expired:
+                self._export_queue.export(batch)
+
+    def _wait_for_expired(self) -> Optional[List[List[ReadableSpan]]]:
+        """Block until at least one trace expires; return their batches, or None on shutdown."""
+        while not self.shutdown_flag:
+            if not self._expiry_heap:
+                self._reaper_wakeup.wait()
+                continue
+
+            now = time.monotonic()
+            expired: List[List[ReadableSpan]] = []
+            while self._expiry_heap and self._expiry_heap[0][0] <= now:
+                _, trace_id = heapq.heappop(self._expiry_heap)
+                current = self.deadlines.get(trace_id)
+                if current is None:
+                    continue
+                if current > now:
+                    heapq.heappush(self._expiry_heap, (current, trace_id))
+                    continue
+
+                if self.batches.get(trace_id):
+                    self._track_running_root(trace_id)
+                batch = self._take_batch(trace_id)
+                if batch:
+                    _debug(f"Trace {trace_id} idle for {self.timeout_seconds}s, exporting {len(batch)} spans")
+                    expired.append(batch)
+
+            if expired:
+                return expired
+            if self._expiry_heap:
+                self._reaper_wakeup.wait(self._expiry_heap[0][0] - now)
+        return None
+
+    def _take_batch(self, trace_id: int) -> Optional[List[ReadableSpan]]:
+        """Remove a trace's buffered spans. Callers must hold ``self.lock``."""
+        self.deadlines.pop(trace_id, None)
+        self._started.pop(trace_id, None)
+        self._local_roots.pop(trace_id, None)
+        batch = self.batches.pop(trace_id, None)
+        if batch is not None:
+            self._release(trace_id, len(batch))
+        if trace_id in self._dropped:
+            self._dropped.discard(trace_id)
+            _debug(f"Trace {trace_id} already dropped by tail sampler")
+            return None
+        if trace_id in self._exported_early:
+            self._exported_early.discard(trace_id)
+            return batch
+        return self._sample(trace_id, batch)
+
+    def _sample(self, trace_id: int, batch: Optional[List[ReadableSpan]]) -> Optional[List[ReadableSpan]]:
+        if not batch or self.sampler is None:
+            return batch
+        if self.sampler.should_keep(batch, self._extractor):
+            return batch
+        _debug(f"Trace {trace_id} dropped by tail sampler ({len(batch)} spans)")
+        return None
+
+    def _take_all(self) -> List[List[ReadableSpan]]:
         with self.lock:
-            if trace_id in self.batches:
-                self._export_batch(trace_id)
+            batches = [
+                batch for trace_id, batch in self.batches.items() if batch and trace_id not in self._dropped
+            ]
+            self.batches.clear()
+            self.deadlines.clear()
+            self._expiry_heap.clear()
+            self._trace_bytes.clear()
+            self._started.clear()
+            self._local_roots.clear()
+            self._exported_early.clear()
+            self._dropped.clear()
+            self._buffered_spans = 0
+            self._buffered_bytes = 0
+        return batches
 
     def shutdown(self) -> None:
         self.shutdown_flag = True
 
         with self.lock:
-            for timer in self.batch_timers.values():
-                timer.cancel()
-            self.batch_timers.clear()
+            self._reaper_wakeup.notify_all()
 
-            for trace_id in list(self.batches.keys()):
-                self._export_batch(trace_id)
+        for batch in self._take_all():
+            self._export_queue.export(batch)
 
-        self.exporter.shutdown()
+        self._export_queue.shutdown()
 
     def force_flush(self, timeout_millis: int = 30000) -> bool:
-        with self.lock:
-            for trace_id in list(self.batches.keys()):
-                self._export_batch(trace_id)
+        for batch in self._take_all():
+            self._export_queue.export(batch)
 
-        return self.exporter.force_flush(timeout_millis)
+        return self._export_queue.force_flush(timeout_millis)
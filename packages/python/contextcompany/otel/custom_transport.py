@@ -0,0 +1,264 @@
+"""Record custom SDK runs, steps and tool calls as OpenTelemetry spans.
+
+Usage::
+
+    from contextcompany.otel import use_otel_transport
+
+    use_otel_transport()  # dedicated TraceBatchSpanProcessor exporting to TCC
+
+    r = run()  # exported as spans, batched per trace
+
+or pass an existing ``TraceBatchSpanProcessor`` (with its ``api_key``) to
+share its batching, queues and sampling with other spans.
+
+Each run becomes a root span and its steps and tool calls become children,
+so ``TraceBatchSpanProcessor`` exports a run with everything recorded under
+it in one batch. Spans use the attributes the other integrations send:
+``gen_ai.operation.name`` (``invoke_agent``, ``chat``, ``execute_tool``),
+``gen_ai.input.messages``/``gen_ai.output.messages``, ``gen_ai.usage.*``,
+``gen_ai.tool.*`` and ``tcc.runId``/``tcc.sessionId``. Step cost and
+streaming metrics have no span attribute yet and are only sent over HTTP. Events whose API key the pipeline cannot export with (an
+explicit ``run(api_key=...)`` or a per-call ``tcc_url``) are sent over HTTP
+instead, so they never end up in another account.
+"""
+
+import atexit
+import hashlib
+import os
+import uuid
+from datetime import datetime
+from typing import Any, Dict, Mapping, Optional
+
+from opentelemetry.sdk.resources import Resource
+from opentelemetry.sdk.trace import ReadableSpan, SpanProcessor
+from opentelemetry.sdk.util.instrumentation import InstrumentationScope
+from opentelemetry.trace import SpanContext, SpanKind, Status, StatusCode, TraceFlags
+
+from .._utils import _debug, _json_dumps, _post_payload
+from ..tenant import TENANT_ATTRIBUTE
+
+SCOPE = InstrumentationScope("contextcompany.custom")
+
+_OPERATIONS = {"run": "invoke_agent", "step": "chat", "tool_call": "execute_tool"}
+
+
+def _id_bits(value: str, bits: int) -> int:
+    digest = hashlib.sha256(value.encode("utf-8")).digest()
+    return int.from_bytes(digest[: bits // 8], "big") or 1
+
+
+def _trace_id(run_id: str) -> int:
+    try:
+        return uuid.UUID(run_id).int or 1
+    except ValueError:
+        return _id_bits(run_id, 128)
+
+
+def _iso_to_ns(value: str) -> int:
+    return int(datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp() * 1e9)
+
+
+def _messages(role: str, content: str) -> str:
+    return _json_dumps([{"role": role, "content": content}])
+
+
+def _run_attributes(payload: Dict[str, Any]) -> Dict[str, Any]:
+    attributes: Dict[str, Any] = {}
+    prompt = payload.get("prompt")
+    if prompt:
+        messages = []
+        if prompt.get("system_prompt") is not None:
+            messages.append({"role": "system", "content": prompt["system_prompt"]})
+        messages.append({"role": "user", "content": prompt["user_prompt"]})
+        attributes["gen_ai.input.messages"] = _json_dumps(messages)
+    if payload.get("response") is not None:
+        attributes["gen_ai.output.messages"] = _messages("assistant", payload["response"])
+    if payload.get("conversational") is not None:
+        attributes["tcc.conversational"] = payload["conversational"]
+    if payload.get("metadata"):
+        attributes["metadata"] = _json_dumps(payload["metadata"])
+    return attributes
+
+
+def _step_attributes(payload: Dict[str, Any]) -> Dict[str, Any]:
+    attributes: Dict[str, Any] = {}
+    if payload.get("prompt") is not None:
+        attributes["gen_ai.input.messages"] = _messages("user", payload["prompt"])
+    if payload.get("response") is not None:
+        attributes["gen_ai.output.messages"] = _messages("assistant", payload["response"])
+    if payload.get("model_requested") is not None:
+        attributes["gen_ai.request.model"] = payload["model_requested"]
+    if payload.get("model_used") is not None:
+        attributes["gen_ai.response.model"] = payload["model_used"]
+    if payload.get("finish_reason") is not None:
+        attributes["gen_ai.response.finish_reasons"] = _json_dumps([payload["finish_reason"]])
+    uncached, cached = payload.get("prompt_uncached_tokens"), payload.get("prompt_cached_tokens")
+    if uncached is not None or cached is not None:
+        attributes["gen_ai.usage.input_tokens"] = (uncached or 0) + (cached or 0)
+    if cached is not None:
+        attributes["gen_ai.usage.cache_read.input_tokens"] = cached
+    if payload.get("completion_tokens") is not None:
+        attributes["gen_ai.usage.output_tokens"] = payload["completion_tokens"]
+    if payload.get("tool_definitions") is not None:
+        attributes["gen_ai.tool.definitions"] = payload["tool_definitions"]
+    return attributes
+
+
+def _tool_call_attributes(payload: Dict[str, Any]) -> Dict[str, Any]:
+    attributes: Dict[str, Any] = {
+        "gen_ai.tool.name": payload["tool_name"],
+        "gen_ai.tool.call.id": payload["tool_call_id"],
+    }
+    if payload.get("args") is not None:
+        attributes["gen_ai.tool.call.arguments"] = payload["args"]
+    if payload.get("result") is not None:
+        attributes["gen_ai.tool.call.result"] = payload["result"]
+    return attributes
+
+
+_ATTRIBUTES = {"run": _run_attributes, "step": _step_attributes, "tool_call": _tool_call_attributes}
+
+
+def payload_to_span(
+    payload: Dict[str, Any],
+    resource: Optional[Resource] = None,
+    tenant_id: Optional[str] = None,
+) -> ReadableSpan:
+    """Convert a custom SDK payload (as built by ``_build_payload``) to a completed span.
+
+    ``tenant_id`` is the tenant the run was created for, not the one current
+    when it is sent.
+    """
+    kind = payload["type"]
+    run_id = payload["run_id"]
+    trace_id = _trace_id(run_id)
+    run_span_id = _id_bits(f"run:{run_id}", 64)
+
+    operation = _OPERATIONS[kind]
+    if kind == "run":
+        span_id, parent, name = run_span_id, None, operation
+    else:
+        own_id = payload["step_id"] if kind == "step" else payload["tool_call_id"]
+        span_id = _id_bits(f"{kind}:{own_id}", 64)
+        parent = SpanContext(trace_id, run_span_id, is_remote=False, trace_flags=TraceFlags(TraceFlags.SAMPLED))
+        # Span names follow the gen_ai convention: "{operation} {target}".
+        target = payload.get("tool_name") if kind == "tool_call" else payload.get("model_requested")
+        name = f"{operation} {target}" if target else operation
+
+    attributes: Dict[str, Any] = {"gen_ai.operation.name": operation, "tcc.runId": run_id}
+    if payload.get("session_id") is not None:
+        attributes["tcc.sessionId"] = payload["session_id"]
+    if tenant_id:
+        attributes[TENANT_ATTRIBUTE] = tenant_id
+    attributes.update(_ATTRIBUTES[kind](payload))
+
+    status = Status(StatusCode.UNSET)
+    if payload.get("status_code"):
+        status = Status(StatusCode.ERROR, payload.get("status_message"))
+
+    return ReadableSpan(
+        name=name,
+        context=SpanContext(trace_id, span_id, is_remote=False, trace_flags=TraceFlags(TraceFlags.SAMPLED)),
+        parent=parent,
+        resource=resource,
+        attributes=attributes,
+        kind=SpanKind.INTERNAL,
+        status=status,
+        start_time=_iso_to_ns(payload["start_time"]),
+        end_time=_iso_to_ns(payload["end_time"]),
+        instrumentation_scope=SCOPE,
+    )
+
+
+class OTelTransport:
+    """Sends custom SDK payloads into an OpenTelemetry span processor.
+
+    Install with ``configure(transport=...)`` or :func:`use_otel_transport`;
+    ``_send_payload`` then hands payloads here instead of posting them.
+
+    ``api_key`` is the key the processor's exporter sends with and
+    ``tenant_api_keys`` the tenants it routes (see
+    :class:`~contextcompany.otel.TenantRoutingExporter`). Events created with
+    any other key, or with a per-call ``tcc_url``, are posted directly.
+    """
+
+    def __init__(
+        self,
+        span_processor: SpanProcessor,
+        resource: Optional[Resource] = None,
+        api_key: Optional[str] = None,
+        tenant_api_keys: Optional[Mapping[str, str]] = None,
+    ):
+        self.span_processor = span_processor
+        self.resource = resource or Resource.create({})
+        self.api_key = api_key
+        self.tenant_api_keys = dict(tenant_api_keys or {})
+
+    def send(
+        self,
+        payload: Dict[str, Any],
+        label: str,
+        api_key: Optional[str] = None,
+        tcc_url: Optional[str] = None,
+        tenant_id: Optional[str] = None,
+    ) -> None:
+        if tcc_url is not None or not self._exports_with(api_key, tenant_id):
+            _debug(f"Pipeline cannot export {label} with its API key, sending over HTTP")
+            _post_payload(payload, label, api_key=api_key, tcc_url=tcc_url)
+            return
+        _debug(f"Recording {label} as span")
+        self.span_processor.on_end(payload_to_span(payload, self.resource, tenant_id))
+
+    def _exports_with(self, api_key: Optional[str], tenant_id: Optional[str]) -> bool:
+        if api_key is None or api_key == self.api_key:
+            return True
+        return tenant_id is not None and self.tenant_api_keys.get(tenant_id) == api_key
+
+    def force_flush(self, timeout_millis: int = 30000) -> bool:
+        return self.span_processor.force_flush(timeout_millis)
+
+
+def use_otel_transport(
+    span_processor: Optional[SpanProcessor] = None,
+    resource: Optional[Resource] = None,
+    api_key: Optional[str] = None,
+    tcc_url: Optional[str] = None,
+    tenant_api_keys: Optional[Mapping[str, str]] = None,
+) -> OTelTransport:
+    """Route the custom SDK through an OpenTelemetry pipeline.
+
+    Args:
+        span_processor: Processor to hand custom spans to, e.g. a
+            ``TraceBatchSpanProcessor`` shared with an instrumented provider.
+            When omitted, a dedicated ``TraceBatchSpanProcessor`` exporting
+            to TCC is created.
+        resource: Resource for the custom spans.
+        api_key: TCC API key the pipeline exports with (resolved from
+            ``TCC_API_KEY`` for the dedicated pipeline).
+        tcc_url: Override the traces endpoint for the dedicated pipeline.
+        tenant_api_keys: Tenants the pipeline routes. Defaults to the keys
+            registered with ``configure(tenant_api_keys=...)`` for the
+            dedicated pipeline.
+
+    Returns:
+        The installed :class:`OTelTransport`.
+    """
+    from ..config import _config, configure, get_api_key, get_url
+    from .batch_processor import TraceBatchSpanProcessor
+    from .exporter import create_otlp_exporter
+    from .tenant_routing import create_tenant_exporter
+
+    if span_processor is None:
+        tenant_api_keys = tenant_api_keys if tenant_api_keys is not None else _config.get("tenant_api_keys")
+        if tenant_api_keys:
+            api_key = api_key or os.getenv("TCC_API_KEY")
+            exporter = create_tenant_exporter(tenant_api_keys, api_key=api_key, tcc_url=tcc_url)
+        else:
+            api_key = get_api_key(api_key)
+            exporter = create_otlp_exporter(tcc_url or get_url("/v1/traces", api_key=api_key), api_key)
+        span_processor = TraceBatchSpanProcessor(exporter)
+        atexit.register(span_processor.shutdown)
+
+    transport = OTelTransport(span_processor, resource, api_key=api_key, tenant_api_keys=tenant_api_keys)
+    configure(transport=transport)
+    return transport
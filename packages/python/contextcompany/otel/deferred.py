@@ -0,0 +1,72 @@
+"""Compute expensive span attributes in the exporter instead of on the caller's thread."""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Mapping, Optional, Sequence, Tuple
+
+from opentelemetry.sdk.trace import ReadableSpan, Span
+from opentelemetry.sdk.trace.export import SpanExporter, SpanExportResult
+
+from .span_copy import copy_span_with_attributes
+
+AttributeBuilder = Callable[[], Mapping[str, Any]]
+
+# Processors receive a fresh ReadableSpan from Span.end(), so builders are
+# kept here by (trace_id, span_id) rather than on the span object. Bounded so
+# spans that are never exported (dropped by a full queue) cannot leak.
+MAX_PENDING = 65536
+
+_pending: "OrderedDict[Tuple[int, int], AttributeBuilder]" = OrderedDict()
+_lock = threading.Lock()
+
+
+def defer_attributes(span: Span, build: AttributeBuilder) -> None:
+    """Register ``build`` for a recording span; its result is merged at export time.
+
+    Call before ``span.end()``. ``build`` runs on the exporting thread (the
+    batch processor's worker), so it should only close over values that are
+    not mutated after the call, e.g. a shallow snapshot of the inputs.
+    """
+    context = span.get_span_context()
+    if not span.is_recording() or not context.trace_flags.sampled:
+        return
+    with _lock:
+        _pending[(context.trace_id, context.span_id)] = build
+        if len(_pending) > MAX_PENDING:
+            _pending.popitem(last=False)
+
+
+def _pop_builder(span: ReadableSpan) -> Optional[AttributeBuilder]:
+    with _lock:
+        return _pending.pop((span.context.trace_id, span.context.span_id), None)
+
+
+class DeferredAttributesExporter(SpanExporter):
+    """Runs the builders registered with :func:`defer_attributes` before export.
+
+    Place it directly under the span processor so the builders run on its
+    worker thread; spans without a builder are passed through unchanged.
+    """
+
+    def __init__(self, wrapped_exporter: SpanExporter):
+        self.wrapped_exporter = wrapped_exporter
+
+    def export(self, spans: Sequence[ReadableSpan]) -> SpanExportResult:
+        return self.wrapped_exporter.export([self._resolve(span) for span in spans])
+
+    def _resolve(self, span: ReadableSpan) -> ReadableSpan:
+        build = _pop_builder(span)
+        if build is None:
+            return span
+        try:
+            attributes = build()
+        except Exception as e:
+            print(f"[TCC] Failed to build deferred attributes for span {span.name}: {e}")
+            return span
+        return copy_span_with_attributes(span, attributes) if attributes else span
+
+    def shutdown(self) -> None:
+        return self.wrapped_exporter.shutdown()
+
+    def force_flush(self, timeout_millis: int = 30000) -> bool:
+        return self.wrapped_exporter.force_flush(timeout_millis)
@@ -0,0 +1,91 @@
+"""Export-time enrichment of spans with user-provided ids."""
+
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence
+
+from opentelemetry.sdk.trace import ReadableSpan
+from opentelemetry.sdk.trace.export import SpanExporter, SpanExportResult
+
+from .._utils import _debug
+from .id_cache import TraceIdCache, trace_id_cache
+from .roots import is_local_root
+from .span_copy import copy_span_with_attributes
+
+# Maps a root span's attributes to the attributes every span of its trace
+# should carry, e.g. {"tcc.runId": ..., "tcc.sessionId": ...}.
+Extractor = Callable[[Mapping[str, Any]], Dict[str, str]]
+
+
+class EnrichingExporter(SpanExporter):
+    """Stamps ids extracted from each trace's root span onto all its spans.
+
+    ``extractor`` holds the framework-specific rules; this class does the
+    rest. Roots are indexed by trace while scanning the batch once, and ids
+    resolved for a trace are kept in ``id_cache`` so spans exported in a
+    later call (partial chunks, late children) are enriched too. Spans that
+    already carry the ids - e.g. stamped by ``RunIdSpanProcessor`` at start -
+    are passed through without copying.
+    """
+
+    def __init__(
+        self,
+        wrapped_exporter: SpanExporter,
+        extractor: Extractor,
+        id_cache: Optional[TraceIdCache] = None,
+    ):
+        self.wrapped_exporter = wrapped_exporter
+        self.extractor = extractor
+        self.id_cache = id_cache if id_cache is not None else trace_id_cache
+
+    def track_trace_root(self, span: ReadableSpan) -> None:
+        """Record a still-running root's ids so partially exported chunks of its trace can be fixed."""
+        updates = self.extractor(span.attributes or {})
+        if updates:
+            self.id_cache.put(span.context.trace_id, updates)
+
+    def export(self, spans: Sequence[ReadableSpan]) -> SpanExportResult:
+        roots: Dict[int, Optional[ReadableSpan]] = {}
+        for span in spans:
+            trace_id = span.context.trace_id
+            if roots.get(trace_id) is None:
+                roots[trace_id] = span if is_local_root(span) else None
+
+        updates_by_trace: Dict[int, Dict[str, str]] = {}
+        for trace_id, root_span in roots.items():
+            updates = self._resolve_ids(trace_id, root_span)
+            if updates:
+                updates_by_trace[trace_id] = updates
+
+        export_spans: Sequence[ReadableSpan] = spans
+        if updates_by_trace:
+            enriched: List[ReadableSpan] = []
+            for span in spans:
+                updates = updates_by_trace.get(span.context.trace_id)
+                if updates and _needs_update(span, updates):
+                    span = copy_span_with_attributes(span, updates)
+                enriched.append(span)
+            export_spans = enriched
+
+        _debug(f"Exporting {len(export_spans)} spans")
+        return self.wrapped_exporter.export(export_spans)
+
+    def _resolve_ids(self, trace_id: int, root_span: Optional[ReadableSpan]) -> Optional[Dict[str, str]]:
+        if root_span is None:
+            # Partial chunk or late children: use ids resolved in an earlier export.
+            return self.id_cache.get(trace_id)
+
+        updates = self.extractor(root_span.attributes or {})
+        if updates:
+            _debug(f"Resolved ids for trace {trace_id}: {updates}")
+            self.id_cache.put(trace_id, updates)
+        return updates
+
+    def shutdown(self) -> None:
+        return self.wrapped_exporter.shutdown()
+
+    def force_flush(self, timeout_millis: int = 30000) -> bool:
+        return self.wrapped_exporter.force_flush(timeout_millis)
+
+
+def _needs_update(span: ReadableSpan, updates: Mapping[str, str]) -> bool:
+    attributes = span.attributes or {}
+    return any(attributes.get(key) != value for key, value in updates.items())
@@ -0,0 +1,191 @@
+"""Bounded, thread-backed export queue for span batches."""
+
+import queue
+import threading
+import time
+from typing import Any, List, Optional, Sequence
+
+from opentelemetry.sdk.trace import ReadableSpan
+from opentelemetry.sdk.trace.export import SpanExporter, SpanExportResult
+
+from .._utils import _debug
+from .span_size import estimate_span_size
+
+_STOP = object()
+
+
+class QueuedSpanExporter(SpanExporter):
+    """Hands span batches to dedicated worker threads for export.
+
+    ``export()`` only enqueues and returns immediately, so callers never do
+    network I/O. When the queue already holds ``max_queue_size`` batches,
+    new batches are dropped rather than blocking the caller.
+
+    Workers coalesce queued batches: after taking one, a worker keeps
+    collecting more for up to ``linger_seconds`` and exports them in a single
+    call, as long as the result stays within ``max_export_batch_size`` spans
+    and ``max_export_batch_bytes`` (estimated). Batches are never split unless
+    one batch alone exceeds those caps.
+    """
+
+    def __init__(
+        self,
+        wrapped_exporter: SpanExporter,
+        max_queue_size: int = 256,
+        num_workers: int = 1,
+        name: str = "tcc-export",
+        linger_seconds: float = 0.1,
+        max_export_batch_size: int = 512,
+        max_export_batch_bytes: Optional[int] = None,
+    ):
+        self.wrapped_exporter = wrapped_exporter
+        self.num_workers = num_workers
+        self.name = name
+        self.linger_seconds = linger_seconds
+        self.max_export_batch_size = max_export_batch_size
+        self.max_export_batch_bytes = max_export_batch_bytes
+        self._flush_requested = False
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=max_queue_size)
+        self._idle = threading.Condition()
+        self._pending = 0
+        self._workers: List[threading.Thread] = []
+        self._shutdown = False
+
+    def export(self, spans: Sequence[ReadableSpan]) -> SpanExportResult:
+        if not spans:
+            return SpanExportResult.SUCCESS
+
+        with self._idle:
+            if self._shutdown:
+                return SpanExportResult.FAILURE
+            if not self._workers:
+                self._start_workers()
+            self._pending += 1
+
+        try:
+            self._queue.put_nowait(list(spans))
+        except queue.Full:
+            self._task_done()
+            print(f"[TCC] Export queue full, dropping batch of {len(spans)} spans")
+            return SpanExportResult.FAILURE
+
+        return SpanExportResult.SUCCESS
+
+    def _start_workers(self) -> None:
+        for i in range(self.num_workers):
+            worker = threading.Thread(target=self._work, name=f"{self.name}-{i}", daemon=True)
+            worker.start()
+            self._workers.append(worker)
+
+    def _task_done(self) -> None:
+        with self._idle:
+            self._pending -= 1
+            if not self._pending:
+                self._idle.notify_all()
+
+    def _work(self) -> None:
+        carry: Any = None
+        while True:
+            first = carry if carry is not None else self._queue.get()
+            carry = None
+            if first is _STOP:
+                return
+
+            spans: List[ReadableSpan] = list(first)
+            size = self._batch_size_bytes(spans)
+            taken = 1
+            deadline = time.monotonic() + self.linger_seconds
+
+            while not self._is_full(len(spans), size):
+                try:
+                    if self._flush_requested:
+                        nxt = self._queue.get_nowait()
+                    else:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            break
+                        nxt = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if nxt is _STOP:
+                    carry = nxt
+                    break
+
+                nxt_size = self._batch_size_bytes(nxt)
+                if self._is_full(len(spans) + len(nxt), size + nxt_size, strict=True):
+                    carry = nxt
+                    break
+                spans.extend(nxt)
+                size += nxt_size
+                taken += 1
+
+            try:
+                for chunk in self._split(spans):
+                    self._export(chunk)
+            finally:
+                for _ in range(taken):
+                    self._task_done()
+
+    def _batch_size_bytes(self, spans: Sequence[ReadableSpan]) -> int:
+        if self.max_export_batch_bytes is None:
+            return 0
+        return sum(estimate_span_size(span) for span in spans)
+
+    def _is_full(self, count: int, size: int, strict: bool = False) -> bool:
+        limit_bytes = self.max_export_batch_bytes
+        if strict:
+            return count > self.max_export_batch_size or (limit_bytes is not None and size > limit_bytes)
+        return count >= self.max_export_batch_size or (limit_bytes is not None and size >= limit_bytes)
+
+    def _split(self, spans: List[ReadableSpan]) -> List[List[ReadableSpan]]:
+        """Split a batch only when it alone exceeds the export caps."""
+        if len(spans) <= self.max_export_batch_size and self.max_export_batch_bytes is None:
+            return [spans]
+
+        chunks: List[List[ReadableSpan]] = []
+        chunk: List[ReadableSpan] = []
+        chunk_size = 0
+        for span in spans:
+            span_size = estimate_span_size(span) if self.max_export_batch_bytes is not None else 0
+            if chunk and self._is_full(len(chunk) + 1, chunk_size + span_size, strict=True):
+                chunks.append(chunk)
+                chunk, chunk_size = [], 0
+            chunk.append(span)
+            chunk_size += span_size
+        if chunk:
+            chunks.append(chunk)
+        return chunks
+
+    def _export(self, batch: List[ReadableSpan]) -> None:
+        try:
+            _debug(f"Exporting {len(batch)} spans from {threading.current_thread().name}")
+            self.wrapped_exporter.export(batch)
+        except Exception as e:
+            print(f"[TCC] Error exporting batch: {e}")
+
+    def _wait_idle(self, timeout_seconds: float) -> bool:
+        with self._idle:
+            return self._idle.wait_for(lambda: not self._pending, timeout_seconds)
+
+    def shutdown(self) -> None:
+        self._flush_requested = True
+        self._wait_idle(30)
+        with self._idle:
+            self._shutdown = True
+            workers, self._workers = self._workers, []
+        for _ in workers:
+            self._queue.put(_STOP)
+        for worker in workers:
+            worker.join(timeout=5)
+        self.wrapped_exporter.shutdown()
+
+    def force_flush(self, timeout_millis: int = 30000) -> bool:
+        deadline = time.monotonic() + timeout_millis / 1000
+        self._flush_requested = True
+        try:
+            if not self._wait_idle(timeout_millis / 1000):
+                return False
+        finally:
+            self._flush_requested = False
+        remaining_millis = max(0, int((deadline - time.monotonic()) * 1000))
+        return self.wrapped_exporter.force_flush(remaining_millis)
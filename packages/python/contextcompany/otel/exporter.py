@@ -0,0 +1,78 @@
+"""Shared OTLP/HTTP exporter configuration for all integrations."""
+
+from typing import Mapping, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from opentelemetry.exporter.otlp.proto.http import Compression
+from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+
+DEFAULT_TIMEOUT_SECONDS = 10.0
+DEFAULT_POOL_MAXSIZE = 4
+DEFAULT_CONNECT_RETRIES = 2
+
+
+def create_session(
+    pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
+    connect_retries: int = DEFAULT_CONNECT_RETRIES,
+) -> requests.Session:
+    """Return a keep-alive session sized for concurrent export workers.
+
+    Only connection failures are retried here; the OTLP exporter already
+    retries 429/5xx responses with backoff, so status retries would double up.
+    """
+    retry = Retry(
+        total=connect_retries,
+        connect=connect_retries,
+        read=0,
+        status=0,
+        backoff_factor=0.5,
+        allowed_methods=None,
+    )
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_maxsize, max_retries=retry)
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def create_otlp_exporter(
+    endpoint: str,
+    api_key: str,
+    headers: Optional[Mapping[str, str]] = None,
+    compression: bool = True,
+    timeout: float = DEFAULT_TIMEOUT_SECONDS,
+    session: Optional[requests.Session] = None,
+    pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
+) -> OTLPSpanExporter:
+    """Build the OTLP/HTTP exporter used by every TCC integration.
+
+    Payloads are gzip-compressed by default - spans carry full message
+    histories, which compress several-fold - and sent over a pooled
+    keep-alive session with bounded timeouts.
+
+    Args:
+        endpoint: OTLP traces endpoint.
+        api_key: TCC API key, sent as a bearer token.
+        headers: Extra request headers.
+        compression: Gzip request bodies.
+        timeout: Per-export timeout in seconds, including the exporter's retries.
+        session: Reuse an existing session instead of creating one.
+        pool_maxsize: Connections kept open to the endpoint; match the number
+            of export workers.
+
+    Returns:
+        The configured ``OTLPSpanExporter``.
+    """
+    exporter_headers = {"Authorization": f"Bearer {api_key}"}
+    if headers:
+        exporter_headers.update(headers)
+
+    return OTLPSpanExporter(
+        endpoint=endpoint,
+        headers=exporter_headers,
+        timeout=timeout,
+        compression=Compression.Gzip if compression else Compression.NoCompression,
+        session=session or create_session(pool_maxsize=pool_maxsize),
+    )
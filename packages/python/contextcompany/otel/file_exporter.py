@@ -0,0 +1,65 @@
+"""Span exporter that writes to a local :class:`~contextcompany.file_sink.FileSink`."""
+
+from typing import Any, Dict, Sequence
+
+from opentelemetry.sdk.trace import ReadableSpan
+from opentelemetry.sdk.trace.export import SpanExporter, SpanExportResult
+from opentelemetry.trace import format_span_id, format_trace_id
+
+from ..file_sink import FileSink
+
+
+def span_to_dict(span: ReadableSpan) -> Dict[str, Any]:
+    """Compact JSON-ready form of a span, one line per span in the sink."""
+    record: Dict[str, Any] = {
+        "type": "span",
+        "trace_id": format_trace_id(span.context.trace_id),
+        "span_id": format_span_id(span.context.span_id),
+        "name": span.name,
+        "kind": span.kind.name,
+        "start_time_unix_nano": span.start_time,
+        "end_time_unix_nano": span.end_time,
+        "status_code": span.status.status_code.name,
+        "attributes": dict(span.attributes or {}),
+    }
+    if span.parent is not None:
+        record["parent_span_id"] = format_span_id(span.parent.span_id)
+    if span.status.description:
+        record["status_message"] = span.status.description
+    if span.events:
+        record["events"] = [
+            {"name": event.name, "time_unix_nano": event.timestamp, "attributes": dict(event.attributes or {})}
+            for event in span.events
+        ]
+    if span.resource is not None and span.resource.attributes:
+        record["resource"] = dict(span.resource.attributes)
+    if span.instrumentation_scope is not None:
+        record["scope"] = span.instrumentation_scope.name
+    return record
+
+
+class FileSpanExporter(SpanExporter):
+    """Writes spans as JSON lines to a :class:`FileSink` instead of sending them.
+
+    Use it in place of the OTLP exporter where there is no network egress;
+    the sink's segments can be uploaded later.
+    """
+
+    def __init__(self, sink: FileSink):
+        self.sink = sink
+
+    def export(self, spans: Sequence[ReadableSpan]) -> SpanExportResult:
+        try:
+            for span in spans:
+                self.sink.write(span_to_dict(span))
+        except Exception as e:
+            print(f"[TCC] Failed to write spans to {self.sink.directory}: {e}")
+            return SpanExportResult.FAILURE
+        return SpanExportResult.SUCCESS
+
+    def shutdown(self) -> None:
+        self.sink.close()
+
+    def force_flush(self, timeout_millis: int = 30000) -> bool:
+        self.sink.flush(fsync=True)
+        return True
@@ -0,0 +1,54 @@
+"""Bounded cache of user-provided ids resolved per trace."""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+
+class TraceIdCache:
+    """Maps trace_id to the user's ``tcc.runId`` / ``tcc.sessionId``.
+
+    Fixing exporters record the ids they resolve from a root span here so
+    spans of the same trace exported in a later call (partial chunks, late
+    children) can be enriched without the root. Entries expire after
+    ``ttl_seconds`` and the least recently used are evicted beyond
+    ``max_entries``. Safe to share between exporters and threads.
+    """
+
+    def __init__(self, max_entries: int = 10000, ttl_seconds: float = 600):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[int, Tuple[float, Dict[str, str]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, trace_id: int) -> Optional[Dict[str, str]]:
+        with self._lock:
+            entry = self._entries.get(trace_id)
+            if entry is None:
+                return None
+            expires_at, ids = entry
+            if expires_at <= time.monotonic():
+                del self._entries[trace_id]
+                return None
+            self._entries.move_to_end(trace_id)
+            return ids
+
+    def put(self, trace_id: int, ids: Dict[str, str]) -> None:
+        expires_at = time.monotonic() + self.ttl_seconds
+        with self._lock:
+            self._entries[trace_id] = (expires_at, ids)
+            self._entries.move_to_end(trace_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# Shared by the LangChain and Agno exporters.
+trace_id_cache = TraceIdCache()
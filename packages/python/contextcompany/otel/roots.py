@@ -0,0 +1,16 @@
+"""Root-span detection shared by TCC span processors and exporters."""
+
+from typing import Union
+
+from opentelemetry.sdk.trace import ReadableSpan
+from opentelemetry.trace import Span
+
+
+def is_local_root(span: Union[Span, ReadableSpan]) -> bool:
+    """Return True if ``span`` has no parent or its parent is in another process.
+
+    Services called with a propagated ``traceparent`` start their entry span
+    under a remote parent; for this process that span is the trace root.
+    """
+    parent = getattr(span, "parent", None)
+    return parent is None or parent.is_remote
@@ -0,0 +1,103 @@
+"""Tail-based sampling of completed traces."""
+
+from typing import Any, Callable, Dict, Mapping, Optional, Sequence
+
+from opentelemetry.sdk.trace import ReadableSpan
+from opentelemetry.trace import StatusCode
+
+from .roots import is_local_root
+
+# A policy looks at a completed trace and returns True (keep), False (drop)
+# or None (no opinion, ask the next policy).
+Policy = Callable[[Sequence[ReadableSpan]], Optional[bool]]
+
+_TOTAL_TOKEN_KEYS = ("llm.usage.total_tokens", "llm.token_count.total")
+_INPUT_TOKEN_KEYS = ("gen_ai.usage.input_tokens", "gen_ai.usage.prompt_tokens", "llm.token_count.prompt")
+_OUTPUT_TOKEN_KEYS = ("gen_ai.usage.output_tokens", "gen_ai.usage.completion_tokens", "llm.token_count.completion")
+
+_TRACE_ID_LIMIT = 1 << 64
+
+
+def _first(attributes: Mapping[str, Any], keys: Sequence[str]) -> int:
+    for key in keys:
+        value = attributes.get(key)
+        if isinstance(value, (int, float)):
+            return int(value)
+    return 0
+
+
+def trace_tokens(spans: Sequence[ReadableSpan]) -> int:
+    """Total tokens reported by the spans of a trace (traceloop, OpenInference or gen_ai conventions)."""
+    total = 0
+    for span in spans:
+        attributes = span.attributes or {}
+        span_total = _first(attributes, _TOTAL_TOKEN_KEYS)
+        if not span_total:
+            span_total = _first(attributes, _INPUT_TOKEN_KEYS) + _first(attributes, _OUTPUT_TOKEN_KEYS)
+        total += span_total
+    return total
+
+
+def trace_duration_ms(spans: Sequence[ReadableSpan]) -> float:
+    starts = [span.start_time for span in spans if span.start_time]
+    ends = [span.end_time for span in spans if span.end_time]
+    if not starts or not ends:
+        return 0.0
+    return (max(ends) - min(starts)) / 1e6
+
+
+class TailSampler:
+    """Decides whether a completed trace is exported.
+
+    Policies run in order and the first that returns a decision wins:
+    ``policies`` (custom, first), then traces with an ERROR span, traces
+    lasting at least ``min_duration_ms``, traces using at least ``min_tokens``
+    tokens, and traces whose root carries user-provided ids (as found by the
+    framework's id extractor). Everything else is kept with probability
+    ``sample_rate``, decided from the trace id so every process makes the
+    same choice for a trace.
+    """
+
+    def __init__(
+        self,
+        sample_rate: float = 1.0,
+        keep_errors: bool = True,
+        min_duration_ms: Optional[float] = None,
+        min_tokens: Optional[int] = None,
+        keep_user_run_ids: bool = True,
+        policies: Sequence[Policy] = (),
+    ):
+        if not 0.0 <= sample_rate <= 1.0:
+            raise ValueError(f"[TCC] sample_rate must be between 0 and 1, got {sample_rate}")
+        self.sample_rate = sample_rate
+        self.keep_errors = keep_errors
+        self.min_duration_ms = min_duration_ms
+        self.min_tokens = min_tokens
+        self.keep_user_run_ids = keep_user_run_ids
+        self.policies = list(policies)
+
+    def should_keep(
+        self,
+        spans: Sequence[ReadableSpan],
+        extractor: Optional[Callable[[Mapping[str, Any]], Dict[str, str]]] = None,
+    ) -> bool:
+        for policy in self.policies:
+            decision = policy(spans)
+            if decision is not None:
+                return decision
+
+        if self.keep_errors and any(span.status.status_code is StatusCode.ERROR for span in spans):
+            return True
+        if self.min_duration_ms is not None and trace_duration_ms(spans) >= self.min_duration_ms:
+            return True
+        if self.min_tokens is not None and trace_tokens(spans) >= self.min_tokens:
+            return True
+        if self.keep_user_run_ids and extractor is not None:
+            root = next((span for span in spans if is_local_root(span)), None)
+            if root is not None and extractor(root.attributes or {}).get("tcc.runId"):
+                return True
+
+        if self.sample_rate >= 1.0:
+            return True
+        trace_id = spans[0].context.trace_id & (_TRACE_ID_LIMIT - 1)
+        return trace_id < self.sample_rate * _TRACE_ID_LIMIT
@@ -0,0 +1,64 @@
+"""Process-wide, reference-counted tracer providers shared by integration instances."""
+
+import atexit
+import threading
+from typing import Callable, Dict, Hashable, List
+
+from opentelemetry.sdk.trace import TracerProvider
+
+from .._utils import _debug
+
+
+class _Entry:
+    __slots__ = ("provider", "refs")
+
+    def __init__(self, provider: TracerProvider):
+        self.provider = provider
+        self.refs = 0
+
+
+_providers: Dict[Hashable, _Entry] = {}
+_lock = threading.Lock()
+_atexit_registered = False
+
+
+def acquire_tracer_provider(key: Hashable, create: Callable[[], TracerProvider]) -> TracerProvider:
+    """Return the provider shared under ``key``, creating it on first use.
+
+    Every call must be balanced by :func:`release_tracer_provider`; the
+    provider (with its processors and worker threads) is shut down when the
+    last reference is released, or at interpreter exit.
+    """
+    global _atexit_registered
+    with _lock:
+        entry = _providers.get(key)
+        if entry is None:
+            entry = _providers[key] = _Entry(create())
+            _debug(f"Created shared tracer provider ({len(_providers)} active)")
+            if not _atexit_registered:
+                atexit.register(shutdown_tracer_providers)
+                _atexit_registered = True
+        entry.refs += 1
+        return entry.provider
+
+
+def release_tracer_provider(key: Hashable) -> None:
+    """Drop one reference to the provider under ``key``, shutting it down after the last."""
+    with _lock:
+        entry = _providers.get(key)
+        if entry is None:
+            return
+        entry.refs -= 1
+        if entry.refs > 0:
+            return
+        del _providers[key]
+    entry.provider.shutdown()
+
+
+def shutdown_tracer_providers() -> None:
+    """Shut down every shared provider, flushing their pending spans."""
+    with _lock:
+        providers: List[TracerProvider] = [entry.provider for entry in _providers.values()]
+        _providers.clear()
+    for provider in providers:
+        provider.shutdown()
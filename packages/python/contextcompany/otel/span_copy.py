@@ -1,36 +1,99 @@
 """Helpers for enriching completed OpenTelemetry spans before export."""
 
-from typing import Any, Mapping
+from collections.abc import Mapping as MappingABC
+from typing import Any, Iterator, Mapping
 
 from opentelemetry.sdk.trace import ReadableSpan
 
 
+class AttributeOverlay(MappingABC):
+    """Read-only view of ``base`` attributes with ``overlay`` values on top.
+
+    Neither mapping is copied; lookups check ``overlay`` first.
+    """
+
+    __slots__ = ("_base", "_overlay")
+
+    def __init__(self, base: Mapping[str, Any], overlay: Mapping[str, Any]):
+        self._base = base
+        self._overlay = overlay
+
+    def __getitem__(self, key: str) -> Any:
+        if key in self._overlay:
+            return self._overlay[key]
+        return self._base[key]
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._overlay or key in self._base
+
+    def __iter__(self) -> Iterator[str]:
+        yield from self._overlay
+        for key in self._base:
+            if key not in self._overlay:
+                yield key
+
+    def __len__(self) -> int:
+        return len(self._base) + sum(1 for key in self._overlay if key not in self._base)
+
+
+class OverlaySpan(ReadableSpan):
+    """Export-only view of a completed span with extra attributes.
+
+    Shares the source span's context, events, links, resource and attribute
+    container by reference; only the overlay dict is new, so enriching a
+    span allocates O(overlay) rather than O(span).
+    """
+
+    def __init__(self, span: ReadableSpan, overlay: Mapping[str, Any]):
+        # ReadableSpan.__init__ is skipped on purpose: it would build a new
+        # Resource when none is passed, and every field is copied below.
+        if isinstance(span, OverlaySpan):
+            overlay = {**span._attributes._overlay, **overlay}
+            base = span._attributes._base
+            self._source = span._source
+        else:
+            base = getattr(span, "_attributes", None) or span.attributes or {}
+            self._source = span
+
+        source = self._source
+        self._name = source.name
+        self._context = source.context
+        self._kind = source.kind
+        self._parent = source.parent
+        self._start_time = source.start_time
+        self._end_time = source.end_time
+        self._status = source.status
+        self._resource = source.resource
+        self._instrumentation_scope = source.instrumentation_scope
+        self._instrumentation_info = getattr(source, "_instrumentation_info", None)
+        self._events = getattr(source, "_events", None) or source.events
+        self._links = getattr(source, "_links", None) or source.links
+        self._attributes = AttributeOverlay(base, overlay)
+
+    @property
+    def dropped_attributes(self) -> int:
+        return self._source.dropped_attributes
+
+    @property
+    def dropped_events(self) -> int:
+        return self._source.dropped_events
+
+    @property
+    def dropped_links(self) -> int:
+        return self._source.dropped_links
+
+
 def copy_span_with_attributes(
     span: ReadableSpan,
     attributes: Mapping[str, Any],
 ) -> ReadableSpan:
-    """Return an export-only copy of ``span`` with merged attributes.
+    """Return an export-only view of ``span`` with merged attributes.
 
     OpenTelemetry 1.43 makes the SDK's attribute container immutable when a
     span ends. Exporters receive completed ``ReadableSpan`` objects, so they
-    must not mutate ``span._attributes``. Constructing a new readable span
-    keeps the recorded span untouched while allowing export-time enrichment.
+    must not mutate ``span._attributes``. The returned :class:`OverlaySpan`
+    keeps the recorded span untouched and shares its data by reference, so
+    only ``attributes`` is allocated per span.
     """
 
-    merged_attributes = dict(span.attributes or {})
-    merged_attributes.update(attributes)
-
-    return ReadableSpan(
-        name=span.name,
-        context=span.context,
-        parent=span.parent,
-        resource=span.resource,
-        attributes=merged_attributes,
-        events=span.events,
-        links=span.links,
-        kind=span.kind,
-        status=span.status,
-        start_time=span.start_time,
-        end_time=span.end_time,
-        instrumentation_scope=span.instrumentation_scope,
-    )
+    return OverlaySpan(span, dict(attributes))
@@ -1,38 +1,109 @@
 import uuid
-from typing import Optional
+from typing import Any, Callable, Dict, Mapping, Optional
 
+from opentelemetry import baggage, trace
 from opentelemetry.sdk.trace import SpanProcessor, ReadableSpan
 from opentelemetry.trace import Span
-from opentelemetry.context import Context
+from opentelemetry.context import Context, create_key, get_current, get_value, set_value
 from .._utils import _debug
+from ..tenant import TENANT_ATTRIBUTE, current_tenant
+
+RUN_ID_ATTRIBUTE = "tcc.runId"
+SESSION_ID_ATTRIBUTE = "tcc.sessionId"
+_RUN_ID_KEY = create_key("tcc.runId")
+
+
+def set_run_id(run_id: str, context: Optional[Context] = None) -> Context:
+    """Return a context carrying ``run_id`` for spans started under it.
+
+    Usage::
+
+        token = context.attach(set_run_id(run.run_id))
+        try:
+            ...
+        finally:
+            context.detach(token)
+    """
+    return set_value(_RUN_ID_KEY, run_id, context)
+
+
+def get_run_id(context: Optional[Context] = None) -> Optional[str]:
+    """Resolve the run id for spans started in ``context``.
+
+    An explicit :func:`set_run_id` value wins, then ``tcc.runId`` baggage
+    (propagated from upstream services), then the ``tcc.runId`` attribute of
+    the parent span held in the context.
+    """
+    run_id = get_value(_RUN_ID_KEY, context) or baggage.get_baggage(RUN_ID_ATTRIBUTE, context)
+    if run_id:
+        return str(run_id)
+
+    parent_attributes = getattr(trace.get_current_span(context), "attributes", None)
+    if parent_attributes:
+        return parent_attributes.get(RUN_ID_ATTRIBUTE)
+    return None
 
 
 class RunIdSpanProcessor(SpanProcessor):
-    """Generates temporary run_id and propagates to child spans."""
+    """Generates temporary run_id and propagates to child spans.
 
-    def __init__(self):
-        self.span_id_to_run_id = {}
+    The run id travels in the OpenTelemetry ``Context`` rather than a shared
+    span-id table: children read it from their parent span (or an explicit
+    context value / baggage), so lookup is O(1), safe across threads and
+    asyncio tasks, and still works for children started after their parent
+    has ended.
+
+    ``resolver`` extracts user-provided ids (``tcc.runId`` / ``tcc.sessionId``)
+    from a root span's attributes when it starts; ``context_resolver`` does
+    the same from the parent context, for instrumentations that put user
+    metadata in the context and only set attributes after the span started
+    (e.g. traceloop's association properties). The resolved ids replace the
+    generated run id on the root and are inherited by every child, so
+    exporters do not have to rewrite spans later.
+
+    Spans started inside ``use_tenant(tenant_id)`` (or under a parent that
+    was) are tagged with ``tcc.tenantId`` for tenant routing.
+    """
+
+    def __init__(
+        self,
+        resolver: Optional[Callable[[Mapping[str, Any]], Dict[str, str]]] = None,
+        context_resolver: Optional[Callable[[Context], Dict[str, str]]] = None,
+    ):
+        self.resolver = resolver
+        self.context_resolver = context_resolver
 
     def on_start(self, span: Span, parent_context: Optional[Context] = None) -> None:
-        span_id = span.context.span_id
-        parent = getattr(span, "parent", None)
-        parent_span_id = parent.span_id if parent else None
-
-        if not parent_span_id:
-            run_id = str(uuid.uuid4())
-            span.set_attribute("tcc.runId", run_id)
-            self.span_id_to_run_id[span_id] = run_id
-            _debug(f"Generated runId for root span: {run_id}")
-        else:
-            run_id = self.span_id_to_run_id.get(parent_span_id)
+        context = parent_context if parent_context is not None else get_current()
+        run_id = get_run_id(context)
+        user_ids: Dict[str, str] = {}
+
+        if not run_id:
+            if self.resolver is not None:
+                user_ids = self.resolver(getattr(span, "attributes", None) or {})
+            if not user_ids.get(RUN_ID_ATTRIBUTE) and self.context_resolver is not None:
+                user_ids = {**self.context_resolver(context), **user_ids}
+            run_id = user_ids.get(RUN_ID_ATTRIBUTE)
             if run_id:
-                span.set_attribute("tcc.runId", run_id)
-                self.span_id_to_run_id[span_id] = run_id
+                _debug(f"Resolved user runId for root span: {run_id}")
+            else:
+                run_id = str(uuid.uuid4())
+                _debug(f"Generated runId for root span: {run_id}")
+
+        span.set_attribute(RUN_ID_ATTRIBUTE, run_id)
+
+        parent_attributes = getattr(trace.get_current_span(context), "attributes", None) or {}
+
+        session_id = user_ids.get(SESSION_ID_ATTRIBUTE) or parent_attributes.get(SESSION_ID_ATTRIBUTE)
+        if session_id:
+            span.set_attribute(SESSION_ID_ATTRIBUTE, session_id)
+
+        tenant_id = current_tenant() or parent_attributes.get(TENANT_ATTRIBUTE)
+        if tenant_id:
+            span.set_attribute(TENANT_ATTRIBUTE, tenant_id)
 
     def on_end(self, span: ReadableSpan) -> None:
-        span_id = span.context.span_id
-        if span_id in self.span_id_to_run_id:
-            del self.span_id_to_run_id[span_id]
+        pass
 
     def shutdown(self) -> None:
         pass
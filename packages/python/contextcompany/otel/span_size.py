@@ -0,0 +1,37 @@
+"""Cheap size estimates for buffered spans."""
+
+from typing import Any, Mapping, Optional
+
+from opentelemetry.sdk.trace import ReadableSpan
+
+# Rough per-span cost of ids, timestamps, status and container overhead once
+# encoded; only used to keep budgets in the right order of magnitude.
+SPAN_OVERHEAD_BYTES = 128
+
+
+def _value_size(value: Any) -> int:
+    if isinstance(value, str):
+        return len(value)
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    if isinstance(value, (list, tuple)):
+        return sum(_value_size(v) for v in value)
+    return 8
+
+
+def estimate_attributes_size(attributes: Optional[Mapping[str, Any]]) -> int:
+    if not attributes:
+        return 0
+    return sum(len(key) + _value_size(value) for key, value in attributes.items())
+
+
+def estimate_span_size(span: ReadableSpan) -> int:
+    """Approximate encoded size of ``span`` in bytes.
+
+    String lengths are used as a proxy for encoded bytes, which is accurate
+    enough for budgeting without serializing anything.
+    """
+    size = SPAN_OVERHEAD_BYTES + len(span.name or "") + estimate_attributes_size(span.attributes)
+    for event in span.events:
+        size += len(event.name) + estimate_attributes_size(event.attributes)
+    return size
@@ -0,0 +1,58 @@
+"""Span exporter that writes to a local :class:`~contextcompany.local.SQLiteSink`."""
+
+from typing import Any, Dict, Optional, Sequence
+
+from opentelemetry.sdk.trace import ReadableSpan
+from opentelemetry.sdk.trace.export import SpanExporter, SpanExportResult
+
+from ..local import SQLiteSink
+from .file_exporter import span_to_dict
+from .sampling import _INPUT_TOKEN_KEYS, _OUTPUT_TOKEN_KEYS, _first
+
+_MODEL_KEYS = (
+    "gen_ai.response.model",
+    "gen_ai.request.model",
+    "llm.response.model",
+    "llm.request.model",
+    "llm.model_name",
+)
+
+
+def _model(attributes: Dict[str, Any]) -> Optional[str]:
+    for key in _MODEL_KEYS:
+        value = attributes.get(key)
+        if isinstance(value, str) and value:
+            return value
+    return None
+
+
+class SQLiteSpanExporter(SpanExporter):
+    """Writes spans to a :class:`SQLiteSink` for the ``contextcompany.local`` queries.
+
+    Model and token usage are read from the traceloop, OpenInference and
+    gen_ai conventions so LLM spans show up in the per-model and per-session
+    queries alongside custom SDK steps.
+    """
+
+    def __init__(self, sink: SQLiteSink):
+        self.sink = sink
+
+    def export(self, spans: Sequence[ReadableSpan]) -> SpanExportResult:
+        try:
+            for span in spans:
+                record = span_to_dict(span)
+                attributes = record["attributes"]
+                record["model"] = _model(attributes)
+                record["input_tokens"] = _first(attributes, _INPUT_TOKEN_KEYS) or None
+                record["output_tokens"] = _first(attributes, _OUTPUT_TOKEN_KEYS) or None
+                self.sink.write(record)
+        except Exception as e:
+            print(f"[TCC] Failed to write spans to {self.sink.path}: {e}")
+            return SpanExportResult.FAILURE
+        return SpanExportResult.SUCCESS
+
+    def shutdown(self) -> None:
+        self.sink.close()
+
+    def force_flush(self, timeout_millis: int = 30000) -> bool:
+        return self.sink.flush(timeout_millis / 1000)
@@ -0,0 +1,173 @@
+"""Fan span batches out to per-tenant exporters."""
+
+import os
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, List, Mapping, Optional, Sequence, Set
+
+from opentelemetry.sdk.trace import ReadableSpan
+from opentelemetry.sdk.trace.export import SpanExporter, SpanExportResult
+
+from .._utils import _debug
+from ..tenant import TENANT_ATTRIBUTE, api_key_for_tenant
+from .export_queue import QueuedSpanExporter
+
+
+class TenantRoutingExporter(SpanExporter):
+    """Routes spans to a separate exporter per ``tcc.tenantId``.
+
+    ``export()`` splits each batch by tenant on the caller's thread and hands
+    each part to that tenant's own :class:`QueuedSpanExporter` (bounded to
+    ``max_queue_size`` batches, with ``num_workers`` threads) wrapping the
+    exporter from ``exporter_for_tenant``, so a slow tenant only backs up
+    and drops its own spans. At most ``max_tenants`` tenant queues are kept:
+    the least recently used one is flushed and shut down in the background
+    when another tenant needs a slot, and recreated on its next span. The
+    ``tcc.tenantId`` routing attribute is removed before export.
+
+    Spans without a tenant go to ``default_exporter`` (through its own
+    queue); spans for a tenant with no exporter (``exporter_for_tenant``
+    returned ``None``, e.g. its key is not registered) are dropped.
+    """
+
+    def __init__(
+        self,
+        exporter_for_tenant: Callable[[str], Optional[SpanExporter]],
+        default_exporter: Optional[SpanExporter] = None,
+        max_queue_size: int = 256,
+        num_workers: int = 1,
+        max_tenants: int = 256,
+    ):
+        self.exporter_for_tenant = exporter_for_tenant
+        self.default_exporter = default_exporter
+        self.max_queue_size = max_queue_size
+        self.num_workers = num_workers
+        self.max_tenants = max_tenants
+        self._tenants: "OrderedDict[str, QueuedSpanExporter]" = OrderedDict()
+        self._missing: Set[str] = set()
+        self._closing: List[threading.Thread] = []
+        self._lock = threading.Lock()
+        self._default = self._queue(default_exporter, "default") if default_exporter is not None else None
+
+    def _queue(self, exporter: SpanExporter, label: str) -> QueuedSpanExporter:
+        return QueuedSpanExporter(
+            exporter,
+            max_queue_size=self.max_queue_size,
+            num_workers=self.num_workers,
+            name=f"tcc-export-{label}",
+        )
+
+    def _exporter(self, tenant_id: str) -> Optional[QueuedSpanExporter]:
+        with self._lock:
+            exporter = self._tenants.get(tenant_id)
+            if exporter is not None:
+                self._tenants.move_to_end(tenant_id)
+                return exporter
+
+            wrapped = self.exporter_for_tenant(tenant_id)
+            if wrapped is None:
+                if tenant_id not in self._missing:
+                    if len(self._missing) >= self.max_tenants:
+                        self._missing.clear()
+                    self._missing.add(tenant_id)
+                    print(f"[TCC] No API key registered for tenant {tenant_id!r}, dropping its spans")
+                return None
+            exporter = self._tenants[tenant_id] = self._queue(wrapped, f"tenant-{tenant_id}")
+            if len(self._tenants) > self.max_tenants:
+                evicted_id, evicted = self._tenants.popitem(last=False)
+                _debug(f"Evicting exporter for tenant {evicted_id!r}")
+                # Draining the evicted tenant's backlog must not hold up the caller.
+                closer = threading.Thread(target=evicted.shutdown, name="tcc-export-evict", daemon=True)
+                self._closing = [t for t in self._closing if t.is_alive()] + [closer]
+                closer.start()
+        return exporter
+
+    def export(self, spans: Sequence[ReadableSpan]) -> SpanExportResult:
+        by_tenant: Dict[Optional[str], List[ReadableSpan]] = {}
+        for span in spans:
+            tenant_id = (span.attributes or {}).get(TENANT_ATTRIBUTE)
+            by_tenant.setdefault(tenant_id, []).append(_without_tenant(span) if tenant_id else span)
+
+        result = SpanExportResult.SUCCESS
+        for tenant_id, tenant_spans in by_tenant.items():
+            exporter = self._exporter(tenant_id) if tenant_id else self._default
+            if exporter is None:
+                _debug(f"Dropping {len(tenant_spans)} spans for tenant {tenant_id!r}")
+                result = SpanExportResult.FAILURE
+            elif exporter.export(tenant_spans) is not SpanExportResult.SUCCESS:
+                result = SpanExportResult.FAILURE
+        return result
+
+    def _all(self) -> List[QueuedSpanExporter]:
+        with self._lock:
+            exporters = list(self._tenants.values())
+            closing, self._closing = self._closing, []
+        for closer in closing:
+            closer.join()
+        if self._default is not None:
+            exporters.append(self._default)
+        return exporters
+
+    def shutdown(self) -> None:
+        for exporter in self._all():
+            exporter.shutdown()
+
+    def force_flush(self, timeout_millis: int = 30000) -> bool:
+        return all([exporter.force_flush(timeout_millis) for exporter in self._all()])
+
+
+def _without_tenant(span: ReadableSpan) -> ReadableSpan:
+    """Copy of ``span`` without the routing attribute, which is not sent to TCC."""
+    attributes = {key: value for key, value in (span.attributes or {}).items() if key != TENANT_ATTRIBUTE}
+    return ReadableSpan(
+        name=span.name,
+        context=span.context,
+        parent=span.parent,
+        resource=span.resource,
+        attributes=attributes,
+        events=span.events,
+        links=span.links,
+        kind=span.kind,
+        status=span.status,
+        start_time=span.start_time,
+        end_time=span.end_time,
+        instrumentation_scope=span.instrumentation_scope,
+    )
+
+
+def otlp_exporter_for_tenant(endpoint: Optional[str] = None) -> Callable[[str], Optional[SpanExporter]]:
+    """Build OTLP exporters from keys registered with ``configure(tenant_api_keys=...)``.
+
+    ``endpoint`` defaults to each key's TCC traces URL.
+    """
+    from ..config import get_url
+    from .exporter import create_otlp_exporter
+
+    def factory(tenant_id: str) -> Optional[SpanExporter]:
+        api_key = api_key_for_tenant(tenant_id)
+        if not api_key:
+            return None
+        return create_otlp_exporter(endpoint or get_url("/v1/traces", api_key=api_key), api_key)
+
+    return factory
+
+
+def create_tenant_exporter(
+    tenant_api_keys: Mapping[str, str],
+    api_key: Optional[str] = None,
+    tcc_url: Optional[str] = None,
+) -> TenantRoutingExporter:
+    """Register ``tenant_api_keys`` and build a routing exporter for them.
+
+    Spans without a tenant are sent with ``api_key`` (falling back to
+    ``TCC_API_KEY``) or dropped when neither is set.
+    """
+    from ..config import configure, get_url
+    from .exporter import create_otlp_exporter
+
+    configure(tenant_api_keys=tenant_api_keys)
+    api_key = api_key or os.getenv("TCC_API_KEY")
+    default_exporter = None
+    if api_key:
+        default_exporter = create_otlp_exporter(tcc_url or get_url("/v1/traces", api_key=api_key), api_key)
+    return TenantRoutingExporter(otlp_exporter_for_tenant(tcc_url), default_exporter=default_exporter)
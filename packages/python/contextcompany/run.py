@@ -3,7 +3,9 @@ import uuid
 from typing import Any, Dict, Literal, Optional
 
 from ._utils import _now_iso, _SENTINEL, _debug, _send_payload
+from .config import is_enabled
 from .redaction import redact_status_message
+from .tenant import current_tenant, resolve_api_key
 
 
 class Run:
@@ -14,12 +16,15 @@ class Run:
         conversational: Optional[bool] = None,
         api_key: Optional[str] = None,
         tcc_url: Optional[str] = None,
+        enabled: Optional[bool] = None,
     ) -> None:
         self._run_id = run_id or str(uuid.uuid4())
         self._session_id = session_id
         self._conversational = conversational
-        self._api_key = api_key
+        self._api_key = resolve_api_key(api_key)
+        self._tenant_id = current_tenant()
         self._tcc_url = tcc_url
+        self._enabled = enabled
 
         self._start_time: str = _now_iso()
 
@@ -45,7 +50,14 @@ class Run:
 
     def step(self, step_id: Optional[str] = None) -> "Step":
         from .step import Step
-        return Step(run_id=self._run_id, step_id=step_id, api_key=self._api_key, tcc_url=self._tcc_url)
+        return Step(
+            run_id=self._run_id,
+            step_id=step_id,
+            api_key=self._api_key,
+            tcc_url=self._tcc_url,
+            tenant_id=self._tenant_id,
+            enabled=self._enabled,
+        )
 
     def tool_call(
         self,
@@ -53,7 +65,15 @@ class Run:
         tool_call_id: Optional[str] = None,
     ) -> "ToolCall":
         from .tool_call import ToolCall
-        return ToolCall(run_id=self._run_id, tool_call_id=tool_call_id, tool_name=tool_name, api_key=self._api_key, tcc_url=self._tcc_url)
+        return ToolCall(
+            run_id=self._run_id,
+            tool_call_id=tool_call_id,
+            tool_name=tool_name,
+            api_key=self._api_key,
+            tcc_url=self._tcc_url,
+            tenant_id=self._tenant_id,
+            enabled=self._enabled,
+        )
 
     def prompt(self, user_prompt: str, system_prompt: Optional[str] = None) -> "Run":
         prompt_obj: Dict[str, str] = {"user_prompt": user_prompt}
@@ -90,13 +110,21 @@ class Run:
         self,
         score: Optional[Literal["thumbs_up", "thumbs_down"]] = None,
         text: Optional[str] = None,
+        background: bool = False,
     ) -> bool:
+        if background:
+            from .feedback import enqueue_feedback
+            return enqueue_feedback(
+                run_id=self._run_id, score=score, text=text, api_key=self._api_key, enabled=self._enabled
+            )
+
         from .feedback import submit_feedback
         return submit_feedback(
             run_id=self._run_id,
             score=score,
             text=text,
             api_key=self._api_key,
+            enabled=self._enabled,
         )
 
     def error(self, status_message: str = "") -> None:
@@ -110,7 +138,14 @@ class Run:
         self._ended = True
 
         payload = self._build_payload()
-        _send_payload(payload, "run", api_key=self._api_key, tcc_url=self._tcc_url)
+        _send_payload(
+            payload,
+            "run",
+            api_key=self._api_key,
+            tcc_url=self._tcc_url,
+            tenant_id=self._tenant_id,
+            enabled=self._enabled,
+        )
 
     def end(self) -> None:
         if self._ended:
@@ -122,7 +157,14 @@ class Run:
         self._ended = True
 
         payload = self._build_payload()
-        _send_payload(payload, "run", api_key=self._api_key, tcc_url=self._tcc_url)
+        _send_payload(
+            payload,
+            "run",
+            api_key=self._api_key,
+            tcc_url=self._tcc_url,
+            tenant_id=self._tenant_id,
+            enabled=self._enabled,
+        )
 
     def _build_payload(self) -> Dict[str, Any]:
         end_time = _now_iso()
@@ -151,17 +193,73 @@ class Run:
         return payload
 
 
+class _NoopRun(Run):
+    """Run returned while telemetry is disabled. Every method is constant-time."""
+
+    def __init__(self) -> None:
+        pass
+
+    @property
+    def run_id(self) -> str:
+        return ""
+
+    def step(self, step_id: Optional[str] = None) -> "Step":
+        from .step import NOOP_STEP
+        return NOOP_STEP
+
+    def tool_call(
+        self,
+        tool_name: Optional[str] = None,
+        tool_call_id: Optional[str] = None,
+    ) -> "ToolCall":
+        from .tool_call import NOOP_TOOL_CALL
+        return NOOP_TOOL_CALL
+
+    def prompt(self, user_prompt: str, system_prompt: Optional[str] = None) -> "Run":
+        return self
+
+    def response(self, text: str) -> "Run":
+        return self
+
+    def status(self, code: int, message: Optional[str] = None) -> "Run":
+        return self
+
+    def metadata(self, data: Optional[Dict[str, str]] = None, **kwargs: str) -> "Run":
+        return self
+
+    def feedback(
+        self,
+        score: Optional[Literal["thumbs_up", "thumbs_down"]] = None,
+        text: Optional[str] = None,
+        background: bool = False,
+    ) -> bool:
+        return False
+
+    def error(self, status_message: str = "") -> None:
+        pass
+
+    def end(self) -> None:
+        pass
+
+
+NOOP_RUN = _NoopRun()
+
+
 def run(
     run_id: Optional[str] = None,
     session_id: Optional[str] = None,
     conversational: Optional[bool] = None,
     api_key: Optional[str] = None,
     tcc_url: Optional[str] = None,
+    enabled: Optional[bool] = None,
 ) -> Run:
+    if not is_enabled(enabled):
+        return NOOP_RUN
     return Run(
         run_id=run_id,
         session_id=session_id,
         conversational=conversational,
         api_key=api_key,
         tcc_url=tcc_url,
+        enabled=enabled,
     )
@@ -1,8 +1,12 @@
+import math
+import time
 import uuid
-from typing import Any, Dict, Optional
+from typing import Any, AsyncIterable, AsyncIterator, Callable, Dict, Iterable, Iterator, List, Optional
 
 from ._utils import _now_iso, _SENTINEL, _debug, _send_payload
+from .config import is_enabled
 from .redaction import redact_status_message
+from .tenant import current_tenant, resolve_api_key
 
 
 class Step:
@@ -12,17 +16,25 @@ class Step:
         step_id: Optional[str] = None,
         api_key: Optional[str] = None,
         tcc_url: Optional[str] = None,
+        tenant_id: Optional[str] = None,
+        enabled: Optional[bool] = None,
     ) -> None:
         self._run_id = run_id
         self._step_id = step_id or str(uuid.uuid4())
-        self._api_key = api_key
+        self._api_key = resolve_api_key(api_key)
+        self._tenant_id = tenant_id or current_tenant()
         self._tcc_url = tcc_url
+        self._enabled = enabled
 
         self._start_time: str = _now_iso()
+        self._start_perf: float = time.perf_counter()
 
         self._prompt: object = _SENTINEL
         self._response: object = _SENTINEL
 
+        self._chunks: Optional[List[str]] = None
+        self._chunk_times: Optional[List[float]] = None
+
         self._model_requested: Optional[str] = None
         self._model_used: Optional[str] = None
         self._finish_reason: Optional[str] = None
@@ -54,6 +66,53 @@ class Step:
         _debug("Step response set:", text[:200] if len(text) > 200 else text)
         return self
 
+    def stream_chunk(self, delta: str) -> "Step":
+        """Record one streamed response chunk.
+
+        Chunks are joined into the response when the step ends (unless
+        ``response()`` was called) and their arrival times are used to report
+        time-to-first-token, inter-token latency and tokens/sec.
+        """
+        now = time.perf_counter()
+        if self._chunks is None:
+            self._chunks = [delta]
+            self._chunk_times = [now]
+            _debug("Step first chunk after", f"{(now - self._start_perf) * 1000:.1f}ms")
+        else:
+            self._chunks.append(delta)
+            self._chunk_times.append(now)  # type: ignore[union-attr]
+        return self
+
+    def stream(
+        self,
+        chunks: Iterable[Any],
+        text: Optional[Callable[[Any], Optional[str]]] = None,
+    ) -> Iterator[Any]:
+        """Yield ``chunks`` unchanged while recording them with ``stream_chunk``.
+
+        Args:
+            chunks: The provider's chunk iterator.
+            text:   Extracts the text delta from a chunk. Defaults to using the
+                    chunk itself, which suits iterators of strings.
+        """
+        for chunk in chunks:
+            delta = chunk if text is None else text(chunk)
+            if delta:
+                self.stream_chunk(delta)
+            yield chunk
+
+    async def astream(
+        self,
+        chunks: AsyncIterable[Any],
+        text: Optional[Callable[[Any], Optional[str]]] = None,
+    ) -> AsyncIterator[Any]:
+        """Async counterpart of :meth:`stream`."""
+        async for chunk in chunks:
+            delta = chunk if text is None else text(chunk)
+            if delta:
+                self.stream_chunk(delta)
+            yield chunk
+
     def model(self, requested: Optional[str] = None, used: Optional[str] = None) -> "Step":
         if requested is not None:
             self._model_requested = requested
@@ -103,7 +162,15 @@ class Step:
         tool_call_id: Optional[str] = None,
     ) -> "ToolCall":
         from .tool_call import ToolCall
-        return ToolCall(run_id=self._run_id, tool_call_id=tool_call_id, tool_name=tool_name, api_key=self._api_key, tcc_url=self._tcc_url)
+        return ToolCall(
+            run_id=self._run_id,
+            tool_call_id=tool_call_id,
+            tool_name=tool_name,
+            api_key=self._api_key,
+            tcc_url=self._tcc_url,
+            tenant_id=self._tenant_id,
+            enabled=self._enabled,
+        )
 
     def status(self, code: int, message: Optional[str] = None) -> "Step":
         self._status_code = code
@@ -120,10 +187,19 @@ class Step:
         self._status_code = 2
         if status_message:
             self._status_message = redact_status_message(status_message)
+        if self._response is _SENTINEL and self._chunks is not None:
+            self._response = "".join(self._chunks)
         self._ended = True
 
         payload = self._build_payload()
-        _send_payload(payload, "step", api_key=self._api_key, tcc_url=self._tcc_url)
+        _send_payload(
+            payload,
+            "step",
+            api_key=self._api_key,
+            tcc_url=self._tcc_url,
+            tenant_id=self._tenant_id,
+            enabled=self._enabled,
+        )
 
     def end(self) -> None:
         if self._ended:
@@ -132,13 +208,26 @@ class Step:
         if self._prompt is _SENTINEL:
             raise ValueError("[TCC] Cannot end step: prompt is required. Call s.prompt(...) before s.end()")
 
+        if self._response is _SENTINEL and self._chunks is not None:
+            self._response = "".join(self._chunks)
+
         if self._response is _SENTINEL:
-            raise ValueError("[TCC] Cannot end step: response is required. Call s.response(...) before s.end()")
+            raise ValueError(
+                "[TCC] Cannot end step: response is required. "
+                "Call s.response(...) or s.stream_chunk(...) before s.end()"
+            )
 
         self._ended = True
 
         payload = self._build_payload()
-        _send_payload(payload, "step", api_key=self._api_key, tcc_url=self._tcc_url)
+        _send_payload(
+            payload,
+            "step",
+            api_key=self._api_key,
+            tcc_url=self._tcc_url,
+            tenant_id=self._tenant_id,
+            enabled=self._enabled,
+        )
 
     def _build_payload(self) -> Dict[str, Any]:
         end_time = _now_iso()
@@ -174,14 +263,114 @@ class Step:
             payload["real_total_cost"] = self._real_total_cost
         if self._tool_definitions is not None:
             payload["tool_definitions"] = self._tool_definitions
+        if self._chunk_times is not None:
+            payload.update(self._stream_metrics(self._chunk_times))
 
         return payload
 
+    def _stream_metrics(self, times: List[float]) -> Dict[str, Any]:
+        metrics: Dict[str, Any] = {
+            "stream_chunk_count": len(times),
+            "time_to_first_token_ms": round((times[0] - self._start_perf) * 1000, 3),
+        }
+
+        if len(times) > 1:
+            gaps = sorted(b - a for a, b in zip(times, times[1:]))
+            metrics["inter_token_latency_p50_ms"] = round(_percentile(gaps, 50) * 1000, 3)
+            metrics["inter_token_latency_p95_ms"] = round(_percentile(gaps, 95) * 1000, 3)
+            metrics["inter_token_latency_p99_ms"] = round(_percentile(gaps, 99) * 1000, 3)
+
+            generation_seconds = times[-1] - times[0]
+            if generation_seconds > 0:
+                tokens = self._completion_tokens if self._completion_tokens is not None else len(times)
+                metrics["tokens_per_second"] = round(tokens / generation_seconds, 3)
+
+        return metrics
+
+
+def _percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted, non-empty list."""
+    index = max(0, math.ceil(pct / 100 * len(sorted_values)) - 1)
+    return sorted_values[index]
+
+
+class _NoopStep(Step):
+    """Step returned while telemetry is disabled. Every method is constant-time."""
+
+    def __init__(self) -> None:
+        pass
+
+    def prompt(self, text: str) -> "Step":
+        return self
+
+    def response(self, text: str) -> "Step":
+        return self
+
+    def stream_chunk(self, delta: str) -> "Step":
+        return self
+
+    def stream(
+        self,
+        chunks: Iterable[Any],
+        text: Optional[Callable[[Any], Optional[str]]] = None,
+    ) -> Iterator[Any]:
+        return iter(chunks)
+
+    def astream(  # type: ignore[override]
+        self,
+        chunks: AsyncIterable[Any],
+        text: Optional[Callable[[Any], Optional[str]]] = None,
+    ) -> AsyncIterator[Any]:
+        return chunks.__aiter__()
+
+    def model(self, requested: Optional[str] = None, used: Optional[str] = None) -> "Step":
+        return self
+
+    def finish_reason(self, reason: str) -> "Step":
+        return self
+
+    def tokens(
+        self,
+        prompt_uncached: Optional[int] = None,
+        prompt_cached: Optional[int] = None,
+        completion: Optional[int] = None,
+    ) -> "Step":
+        return self
+
+    def cost(self, real_total: float) -> "Step":
+        return self
+
+    def tool_definitions(self, definitions: str) -> "Step":
+        return self
+
+    def tool_call(
+        self,
+        tool_name: Optional[str] = None,
+        tool_call_id: Optional[str] = None,
+    ) -> "ToolCall":
+        from .tool_call import NOOP_TOOL_CALL
+        return NOOP_TOOL_CALL
+
+    def status(self, code: int, message: Optional[str] = None) -> "Step":
+        return self
+
+    def error(self, status_message: str = "") -> None:
+        pass
+
+    def end(self) -> None:
+        pass
+
+
+NOOP_STEP = _NoopStep()
+
 
 def step(
     run_id: str,
     step_id: Optional[str] = None,
     api_key: Optional[str] = None,
     tcc_url: Optional[str] = None,
+    enabled: Optional[bool] = None,
 ) -> Step:
-    return Step(run_id=run_id, step_id=step_id, api_key=api_key, tcc_url=tcc_url)
+    if not is_enabled(enabled):
+        return NOOP_STEP
+    return Step(run_id=run_id, step_id=step_id, api_key=api_key, tcc_url=tcc_url, enabled=enabled)
@@ -0,0 +1,52 @@
+"""Per-tenant API keys for processes that serve many TCC customers.
+
+Register each tenant's key once, then mark the work done for a tenant::
+
+    from contextcompany import configure, use_tenant
+
+    configure(tenant_api_keys={"acme": "tcc_...", "globex": "tcc_..."})
+
+    with use_tenant("acme"):
+        r = run()                 # sent with acme's key
+        agent.invoke(...)         # spans tagged tcc.tenantId="acme"
+
+Custom SDK builders resolve the key when they are created; OTel spans are
+tagged with ``tcc.tenantId`` and routed by
+:class:`~contextcompany.otel.TenantRoutingExporter`.
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+TENANT_ATTRIBUTE = "tcc.tenantId"
+
+_current_tenant: ContextVar[Optional[str]] = ContextVar("tcc_tenant", default=None)
+
+
+@contextmanager
+def use_tenant(tenant_id: str) -> Iterator[str]:
+    """Attribute everything recorded inside the block to ``tenant_id``."""
+    token = _current_tenant.set(tenant_id)
+    try:
+        yield tenant_id
+    finally:
+        _current_tenant.reset(token)
+
+
+def current_tenant() -> Optional[str]:
+    return _current_tenant.get()
+
+
+def api_key_for_tenant(tenant_id: Optional[str]) -> Optional[str]:
+    """Return the API key registered via ``configure(tenant_api_keys=...)``."""
+    from .config import _config
+
+    if not tenant_id:
+        return None
+    return (_config.get("tenant_api_keys") or {}).get(tenant_id)
+
+
+def resolve_api_key(api_key: Optional[str] = None) -> Optional[str]:
+    """Explicit ``api_key`` first, then the current tenant's key (env fallback happens at send time)."""
+    return api_key or api_key_for_tenant(current_tenant())
@@ -3,7 +3,9 @@ import uuid
 from typing import Any, Dict, Optional, Union
 
 from ._utils import _now_iso, _debug, _send_payload
+from .config import is_enabled
 from .redaction import redact_status_message
+from .tenant import current_tenant, resolve_api_key
 
 
 class ToolCall:
@@ -14,11 +16,15 @@ class ToolCall:
         tool_name: Optional[str] = None,
         api_key: Optional[str] = None,
         tcc_url: Optional[str] = None,
+        tenant_id: Optional[str] = None,
+        enabled: Optional[bool] = None,
     ) -> None:
         self._run_id = run_id
         self._tool_call_id = tool_call_id or str(uuid.uuid4())
-        self._api_key = api_key
+        self._api_key = resolve_api_key(api_key)
+        self._tenant_id = tenant_id or current_tenant()
         self._tcc_url = tcc_url
+        self._enabled = enabled
 
         self._start_time: str = _now_iso()
 
@@ -70,7 +76,14 @@ class ToolCall:
         self._ended = True
 
         payload = self._build_payload()
-        _send_payload(payload, "tool_call", api_key=self._api_key, tcc_url=self._tcc_url)
+        _send_payload(
+            payload,
+            "tool_call",
+            api_key=self._api_key,
+            tcc_url=self._tcc_url,
+            tenant_id=self._tenant_id,
+            enabled=self._enabled,
+        )
 
     def end(self) -> None:
         if self._ended:
@@ -85,7 +98,14 @@ class ToolCall:
         self._ended = True
 
         payload = self._build_payload()
-        _send_payload(payload, "tool_call", api_key=self._api_key, tcc_url=self._tcc_url)
+        _send_payload(
+            payload,
+            "tool_call",
+            api_key=self._api_key,
+            tcc_url=self._tcc_url,
+            tenant_id=self._tenant_id,
+            enabled=self._enabled,
+        )
 
     def _build_payload(self) -> Dict[str, Any]:
         end_time = _now_iso()
@@ -110,11 +130,49 @@ class ToolCall:
         return payload
 
 
+class _NoopToolCall(ToolCall):
+    """ToolCall returned while telemetry is disabled. Every method is constant-time."""
+
+    def __init__(self) -> None:
+        pass
+
+    def name(self, tool_name: str) -> "ToolCall":
+        return self
+
+    def args(self, value: Union[str, Dict[str, Any]]) -> "ToolCall":
+        return self
+
+    def result(self, value: Union[str, Dict[str, Any]]) -> "ToolCall":
+        return self
+
+    def status(self, code: int, message: Optional[str] = None) -> "ToolCall":
+        return self
+
+    def error(self, status_message: str = "") -> None:
+        pass
+
+    def end(self) -> None:
+        pass
+
+
+NOOP_TOOL_CALL = _NoopToolCall()
+
+
 def tool_call(
     run_id: str,
     tool_call_id: Optional[str] = None,
     tool_name: Optional[str] = None,
     api_key: Optional[str] = None,
     tcc_url: Optional[str] = None,
+    enabled: Optional[bool] = None,
 ) -> ToolCall:
-    return ToolCall(run_id=run_id, tool_call_id=tool_call_id, tool_name=tool_name, api_key=api_key, tcc_url=tcc_url)
+    if not is_enabled(enabled):
+        return NOOP_TOOL_CALL
+    return ToolCall(
+        run_id=run_id,
+        tool_call_id=tool_call_id,
+        tool_name=tool_name,
+        api_key=api_key,
+        tcc_url=tcc_url,
+        enabled=enabled,
+    )
@@ -0,0 +1,139 @@
+import hashlib
+import json
+import unittest
+
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import SpanExporter, SpanExportResult
+
+from contextcompany.otel import AttributeLimits, TraceBatchSpanProcessor
+from contextcompany.otel.attribute_limits import TRUNCATION_MARKER
+from contextcompany.otel.span_size import estimate_attributes_size
+
+
+class RecordingExporter(SpanExporter):
+    def __init__(self):
+        self.spans = []
+
+    def export(self, spans):
+        self.spans.extend(spans)
+        return SpanExportResult.SUCCESS
+
+    def shutdown(self):
+        return None
+
+    def force_flush(self, timeout_millis=30000):
+        return True
+
+
+class AttributeLimitsTests(unittest.TestCase):
+    def test_small_attributes_are_left_alone(self):
+        limits = AttributeLimits(max_attribute_bytes=100, max_span_bytes=1000)
+
+        self.assertIsNone(limits.limit_attributes({"gen_ai.input.messages": "hi", "tokens": 3}))
+
+    def test_truncates_attribute_and_records_hash(self):
+        value = "x" * 500
+        limits = AttributeLimits(max_attribute_bytes=100)
+
+        limited = limits.limit_attributes({"input.value": value, "tokens": 3})
+
+        self.assertEqual(limited["input.value"], "x" * 100 + TRUNCATION_MARKER)
+        self.assertEqual(limited["input.value.sha256"], hashlib.sha256(value.encode()).hexdigest())
+        self.assertEqual(limited["input.value.length"], 500)
+        self.assertEqual(limited["tokens"], 3)
+
+    def test_span_budget_cuts_largest_values_first(self):
+        limits = AttributeLimits(max_attribute_bytes=None, max_span_bytes=2000, hash_truncated=False)
+        attributes = {
+            "gen_ai.input.messages": "i" * 3000,
+            "gen_ai.output.messages": "o" * 500,
+        }
+
+        limited = limits.limit_attributes(attributes)
+
+        self.assertLessEqual(estimate_attributes_size(limited), 2000)
+        self.assertEqual(limited["gen_ai.output.messages"], "o" * 500)
+        self.assertTrue(limited["gen_ai.input.messages"].endswith(TRUNCATION_MARKER))
+
+    def test_budgets_are_utf8_bytes(self):
+        value = "\u00e9" * 100
+        limits = AttributeLimits(max_attribute_bytes=101, hash_truncated=False)
+
+        limited = limits.limit_attributes({"input.value": value})
+
+        self.assertEqual(limited["input.value"], "\u00e9" * 50 + TRUNCATION_MARKER)
+
+    def test_span_budget_includes_hash_attributes(self):
+        limits = AttributeLimits(max_attribute_bytes=None, max_span_bytes=1000)
+
+        limited = limits.limit_attributes({"gen_ai.input.messages": "\u00e9" * 1000, "tokens": 3})
+
+        size = sum(
+            len(key.encode()) + (len(value.encode()) if isinstance(value, str) else 8)
+            for key, value in limited.items()
+        )
+        self.assertLessEqual(size, 1000)
+        self.assertGreater(size, 900)
+        self.assertEqual(limited["gen_ai.input.messages.length"], 1000)
+
+    def test_batch_processor_limits_spans_before_buffering(self):
+        exporter = RecordingExporter()
+        processor = TraceBatchSpanProcessor(
+            exporter, attribute_limits=AttributeLimits(max_attribute_bytes=10)
+        )
+        provider = TracerProvider()
+        provider.add_span_processor(processor)
+        tracer = provider.get_tracer("test")
+
+        with tracer.start_as_current_span("root"):
+            with tracer.start_as_current_span("llm", attributes={"gen_ai.input.messages": "m" * 1000}):
+                pass
+            self.assertEqual(
+                next(iter(processor.batches.values()))[0].attributes["gen_ai.input.messages"],
+                "m" * 10 + TRUNCATION_MARKER,
+            )
+
+        provider.force_flush()
+        provider.shutdown()
+
+        self.assertEqual(len(exporter.spans), 2)
+        self.assertEqual(exporter.spans[0].attributes["gen_ai.input.messages.length"], 1000)
+
+
+    def test_limit_messages_shares_budget_before_encoding(self):
+        limits = AttributeLimits(max_attribute_bytes=10)
+        messages = [
+            {"role": "system", "content": "s" * 6},
+            {"role": "user", "content": [{"type": "text", "text": "u" * 6}]},
+            {"role": "assistant", "content": "a" * 6},
+        ]
+
+        limited = limits.limit_messages(messages)
+
+        self.assertIs(limited[0], messages[0])
+        self.assertEqual(limited[1]["content"][0]["text"], "u" * 4 + TRUNCATION_MARKER)
+        self.assertEqual(limited[2], {"role": "assistant", "content": TRUNCATION_MARKER})
+        self.assertEqual(messages[2]["content"], "a" * 6)
+
+    def test_encoded_messages_fit_budget_and_survive_export_limits(self):
+        limits = AttributeLimits(max_attribute_bytes=200)
+        messages = [
+            {"role": "system", "content": "line\n" * 40},
+            {"role": "user", "content": "\"quoted\" " * 40},
+            {
+                "role": "assistant",
+                "tool_calls": [{"id": "1", "function": {"name": "f", "arguments": "{}" * 100}}],
+            },
+        ]
+
+        encoded = limits.encode_messages(messages)
+
+        self.assertLessEqual(len(encoded), 200)
+        decoded = json.loads(encoded)
+        self.assertEqual([m["role"] for m in decoded], ["system", "user", "assistant"])
+        self.assertTrue(decoded[0]["content"].endswith(TRUNCATION_MARKER))
+        self.assertIsNone(limits.limit_attributes({"gen_ai.input.messages": encoded}))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,243 @@
+import threading
+import time
+import unittest
+
+from opentelemetry.sdk.resources import Resource
+from opentelemetry.sdk.trace import ReadableSpan, TracerProvider
+from opentelemetry.sdk.trace.export import SpanExporter, SpanExportResult
+from opentelemetry import trace
+from opentelemetry.trace import NonRecordingSpan, SpanContext, TraceFlags
+
+from contextcompany.langchain.exporter import RunIdFixingExporter
+from contextcompany.otel import TraceBatchSpanProcessor
+
+
+class RecordingExporter(SpanExporter):
+    def __init__(self):
+        self.batches = []
+        self.threads = []
+        self.exported = threading.Event()
+
+    def export(self, spans):
+        self.batches.append(list(spans))
+        self.threads.append(threading.current_thread())
+        self.exported.set()
+        return SpanExportResult.SUCCESS
+
+    def shutdown(self):
+        return None
+
+    def force_flush(self, timeout_millis=30000):
+        return True
+
+
+def make_span(*, trace_id, span_id, parent=None):
+    return ReadableSpan(
+        name=f"span-{span_id}",
+        context=SpanContext(
+            trace_id=trace_id,
+            span_id=span_id,
+            is_remote=False,
+            trace_flags=TraceFlags(TraceFlags.SAMPLED),
+        ),
+        parent=parent,
+        resource=Resource.create({}),
+        start_time=1,
+        end_time=2,
+    )
+
+
+class TraceBatchSpanProcessorTests(unittest.TestCase):
+    def test_exports_trace_when_root_ends_without_a_thread_per_span(self):
+        exporter = RecordingExporter()
+        processor = TraceBatchSpanProcessor(exporter)
+        root = make_span(trace_id=1, span_id=1)
+        threads_before = threading.active_count()
+
+        for span_id in range(2, 502):
+            processor.on_end(make_span(trace_id=1, span_id=span_id, parent=root.context))
+        processor.on_end(root)
+
+        # One reaper thread plus one export worker, regardless of span count.
+        self.assertLessEqual(threading.active_count(), threads_before + 2)
+        self.assertTrue(processor.force_flush())
+        self.assertEqual(len(exporter.batches), 1)
+        self.assertEqual(len(exporter.batches[0]), 501)
+        processor.shutdown()
+
+    def test_idle_trace_is_exported_by_reaper(self):
+        exporter = RecordingExporter()
+        processor = TraceBatchSpanProcessor(exporter, timeout_seconds=0.05)
+        root = make_span(trace_id=2, span_id=1)
+
+        processor.on_end(make_span(trace_id=2, span_id=2, parent=root.context))
+        time.sleep(0.03)
+        processor.on_end(make_span(trace_id=2, span_id=3, parent=root.context))
+        self.assertEqual(exporter.batches, [])
+
+        self.assertTrue(exporter.exported.wait(2))
+        self.assertEqual([s.context.span_id for s in exporter.batches[0]], [2, 3])
+        self.assertEqual(processor.batches, {})
+        processor.shutdown()
+
+    def test_exports_run_off_the_span_ending_thread(self):
+        exporter = RecordingExporter()
+        processor = TraceBatchSpanProcessor(exporter)
+
+        processor.on_end(make_span(trace_id=4, span_id=1))
+        self.assertTrue(exporter.exported.wait(2))
+
+        self.assertIsNot(exporter.threads[0], threading.current_thread())
+        processor.shutdown()
+
+    def test_shutdown_exports_pending_traces(self):
+        exporter = RecordingExporter()
+        processor = TraceBatchSpanProcessor(exporter)
+        root = make_span(trace_id=3, span_id=1)
+        processor.on_end(make_span(trace_id=3, span_id=2, parent=root.context))
+
+        processor.shutdown()
+
+        self.assertEqual(len(exporter.batches), 1)
+
+    def test_per_trace_cap_exports_partial_chunks(self):
+        exporter = RecordingExporter()
+        processor = TraceBatchSpanProcessor(exporter, max_spans_per_trace=3)
+        root = make_span(trace_id=5, span_id=1)
+
+        for span_id in range(2, 9):
+            processor.on_end(make_span(trace_id=5, span_id=span_id, parent=root.context))
+        self.assertTrue(processor._export_queue.force_flush())
+        exported_early = [s.context.span_id for batch in exporter.batches for s in batch]
+
+        processor.on_end(root)
+        self.assertTrue(processor.force_flush())
+        exported = [s.context.span_id for batch in exporter.batches for s in batch]
+
+        self.assertEqual(exported_early, [2, 3, 4, 5, 6, 7])
+        self.assertEqual(exported, [2, 3, 4, 5, 6, 7, 8, 1])
+        self.assertEqual(processor._buffered_spans, 0)
+        processor.shutdown()
+
+    def test_global_cap_flushes_oldest_traces_first(self):
+        exporter = RecordingExporter()
+        processor = TraceBatchSpanProcessor(exporter, max_buffered_spans=4, export_linger_seconds=0)
+        roots = {trace_id: make_span(trace_id=trace_id, span_id=1) for trace_id in (6, 7, 8)}
+
+        for span_id in (2, 3):
+            for trace_id, root in roots.items():
+                processor.on_end(make_span(trace_id=trace_id, span_id=span_id, parent=root.context))
+        self.assertTrue(processor.force_flush())
+
+        flushed_traces = [batch[0].context.trace_id for batch in exporter.batches]
+        self.assertEqual(flushed_traces[0], 6)
+        self.assertLessEqual(processor._buffered_spans, 4)
+        processor.shutdown()
+
+    def test_partial_chunks_keep_user_run_id(self):
+        run_id = "33333333-3333-4333-8333-333333333333"
+        wrapped = RecordingExporter()
+        processor = TraceBatchSpanProcessor(RunIdFixingExporter(wrapped), max_spans_per_trace=2)
+        provider = TracerProvider()
+        provider.add_span_processor(processor)
+        tracer = provider.get_tracer("test")
+
+        with tracer.start_as_current_span("root", attributes={"langsmith.metadata.tcc.runId": run_id}):
+            for i in range(4):
+                with tracer.start_as_current_span(f"child-{i}"):
+                    pass
+            self.assertTrue(processor.force_flush())
+            early = [span for batch in wrapped.batches for span in batch]
+        provider.shutdown()
+
+        self.assertEqual(len(early), 4)
+        self.assertTrue(all(s.attributes["tcc.runId"] == run_id for s in early))
+
+    def test_idle_trace_keeps_user_run_id_of_running_root(self):
+        run_id = "44444444-4444-4444-8444-444444444444"
+        wrapped = RecordingExporter()
+        processor = TraceBatchSpanProcessor(RunIdFixingExporter(wrapped), timeout_seconds=0.05)
+        provider = TracerProvider()
+        provider.add_span_processor(processor)
+        tracer = provider.get_tracer("test")
+
+        with tracer.start_as_current_span("root", attributes={"langsmith.metadata.tcc.runId": run_id}):
+            with tracer.start_as_current_span("child"):
+                pass
+            self.assertTrue(wrapped.exported.wait(2))
+            expired = wrapped.batches[0]
+        provider.shutdown()
+
+        self.assertEqual([s.name for s in expired], ["child"])
+        self.assertEqual(expired[0].attributes["tcc.runId"], run_id)
+
+    def test_partial_export_forgets_ended_span_ids(self):
+        processor = TraceBatchSpanProcessor(RecordingExporter(), max_spans_per_trace=2)
+        provider = TracerProvider()
+        provider.add_span_processor(processor)
+        tracer = provider.get_tracer("test")
+
+        with tracer.start_as_current_span("root") as root:
+            for i in range(4):
+                with tracer.start_as_current_span(f"child-{i}"):
+                    pass
+            started = dict(processor._started)
+        provider.shutdown()
+
+        self.assertEqual(started, {root.get_span_context().trace_id: {root.get_span_context().span_id}})
+
+    def test_trace_whose_spans_never_end_expires(self):
+        exporter = RecordingExporter()
+        processor = TraceBatchSpanProcessor(exporter, timeout_seconds=0.05)
+        provider = TracerProvider()
+        provider.add_span_processor(processor)
+        tracer = provider.get_tracer("test")
+
+        tracer.start_span("abandoned")
+        deadline = time.monotonic() + 2
+        while processor._started and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        self.assertEqual(processor._started, {})
+        self.assertEqual(processor._local_roots, {})
+        self.assertEqual(processor.deadlines, {})
+        self.assertEqual(exporter.batches, [])
+        provider.shutdown()
+
+    def _assert_entry_span_flushes_trace(self, upstream_is_remote):
+        exporter = RecordingExporter()
+        processor = TraceBatchSpanProcessor(exporter, export_linger_seconds=0)
+        provider = TracerProvider()
+        provider.add_span_processor(processor)
+        tracer = provider.get_tracer("test")
+        upstream = trace.set_span_in_context(
+            NonRecordingSpan(
+                SpanContext(
+                    trace_id=0xABC,
+                    span_id=0xDEF,
+                    is_remote=upstream_is_remote,
+                    trace_flags=TraceFlags(TraceFlags.SAMPLED),
+                )
+            )
+        )
+
+        with tracer.start_as_current_span("entry", context=upstream):
+            with tracer.start_as_current_span("child"):
+                pass
+            self.assertEqual(processor.batches[0xABC][0].name, "child")
+
+        self.assertTrue(exporter.exported.wait(2))
+        self.assertEqual([s.name for s in exporter.batches[0]], ["child", "entry"])
+        self.assertEqual(processor.batches, {})
+        self.assertEqual(processor._started, {})
+        provider.shutdown()
+
+    def test_remote_parent_entry_span_is_a_local_root(self):
+        self._assert_entry_span_flushes_trace(upstream_is_remote=True)
+
+    def test_parent_started_elsewhere_is_a_local_root(self):
+        self._assert_entry_span_flushes_trace(upstream_is_remote=False)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,161 @@
+import gzip
+import json
+import os
+import tempfile
+import unittest
+from datetime import datetime, timezone
+from unittest import mock
+
+from contextcompany import bulk
+
+
+class FakeResponse:
+    def __init__(self, status_code=200):
+        self.status_code = status_code
+        self.ok = status_code < 400
+        self.text = ""
+
+
+def run_record(i):
+    return {
+        "type": "run",
+        "run_id": f"run-{i}",
+        "prompt": {"user_prompt": "hi"},
+        "start_time": 1700000000 + i,
+        "end_time": "2023-11-14T22:13:30Z",
+    }
+
+
+class ToIsoTests(unittest.TestCase):
+    def test_normalizes_supported_timestamp_forms(self):
+        expected = "2023-11-14T22:13:20.000Z"
+        self.assertEqual(bulk.to_iso(1700000000), expected)
+        self.assertEqual(bulk.to_iso(1700000000000), expected)
+        self.assertEqual(bulk.to_iso("2023-11-14T22:13:20Z"), expected)
+        self.assertEqual(bulk.to_iso("2023-11-14T23:13:20+01:00"), expected)
+        self.assertEqual(bulk.to_iso(datetime(2023, 11, 14, 22, 13, 20)), expected)
+        self.assertEqual(
+            bulk.to_iso(datetime(2023, 11, 14, 22, 13, 20, tzinfo=timezone.utc)),
+            expected,
+        )
+
+
+class NormalizeRecordTests(unittest.TestCase):
+    def test_derives_stable_ids_and_requires_run_id_for_children(self):
+        record = {"type": "step", "run_id": "r", "start_time": 1, "end_time": 2}
+        first = bulk.normalize_record(record)
+        second = bulk.normalize_record(record)
+        self.assertEqual(first["step_id"], second["step_id"])
+        self.assertEqual(first["status_code"], 0)
+
+        with self.assertRaisesRegex(ValueError, "run_id is required"):
+            bulk.normalize_record({"type": "tool_call", "start_time": 1, "end_time": 2})
+        with self.assertRaisesRegex(ValueError, "end_time is required"):
+            bulk.normalize_record({"type": "run", "start_time": 1})
+
+
+class ImportFileTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "logs.jsonl.gz")
+        self.checkpoint = os.path.join(self.tmp.name, "logs.ckpt")
+        with gzip.open(self.path, "wt") as f:
+            for i in range(7):
+                f.write(json.dumps(run_record(i)) + "\n")
+            f.write("\n")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _posted_batches(self, post):
+        bodies = [json.loads(call.kwargs["data"]) for call in post.call_args_list]
+        self.assertTrue(all(body["type"] == "batch" for body in bodies))
+        return [body["items"] for body in bodies]
+
+    def test_uploads_batches_and_resumes_from_checkpoint(self):
+        with mock.patch("requests.Session.post", return_value=FakeResponse()) as post:
+            result = bulk.import_file(
+                self.path,
+                api_key="key",
+                tcc_url="http://localhost/batch",
+                batch_size=3,
+                max_workers=2,
+                checkpoint_path=self.checkpoint,
+            )
+
+        self.assertEqual((result.imported, result.skipped, result.failed), (7, 0, 0))
+        batches = self._posted_batches(post)
+        self.assertEqual(sorted(len(b) for b in batches), [1, 3, 3])
+        self.assertNotIn("Content-Encoding", post.call_args.kwargs["headers"])
+
+        with mock.patch("requests.Session.post", return_value=FakeResponse()) as post:
+            result = bulk.import_file(
+                self.path,
+                api_key="key",
+                tcc_url="http://localhost/batch",
+                checkpoint_path=self.checkpoint,
+            )
+        post.assert_not_called()
+        self.assertEqual((result.imported, result.skipped), (0, 7))
+
+    def test_checkpoint_stops_at_first_failed_batch(self):
+        responses = [FakeResponse(), FakeResponse(400), FakeResponse()]
+        with mock.patch("requests.Session.post", side_effect=responses):
+            result = bulk.import_file(
+                self.path,
+                api_key="key",
+                tcc_url="http://localhost/batch",
+                batch_size=3,
+                max_workers=1,
+                checkpoint_path=self.checkpoint,
+            )
+
+        self.assertEqual(result.failed, 3)
+        with open(self.checkpoint) as f:
+            self.assertEqual(json.load(f), {"records": 3})
+
+    def test_malformed_lines_are_reported_and_skipped(self):
+        path = os.path.join(self.tmp.name, "mixed.jsonl")
+        with open(path, "w") as f:
+            f.write(json.dumps(run_record(0)) + "\n")
+            f.write("{not json\n")
+            f.write("\n")
+            f.write(json.dumps({"type": "run", "run_id": "a"}) + "\n")
+            f.write("[1, 2]\n")
+            f.write(json.dumps(run_record(1)) + "\n")
+
+        with mock.patch("requests.Session.post", return_value=FakeResponse()) as post:
+            result = bulk.import_file(path, api_key="key", checkpoint_path=self.checkpoint, compress=True)
+
+        self.assertEqual((result.imported, result.rejected), (2, 3))
+        self.assertEqual([line for line, _ in result.errors], [2, 4, 5])
+        self.assertIn("start_time is required", result.errors[1][1])
+        self.assertEqual(post.call_args.args[0], "https://api.thecontext.company/v1/custom")
+        self.assertEqual(post.call_args.kwargs["headers"]["Content-Encoding"], "gzip")
+        self.assertEqual(json.loads(gzip.decompress(post.call_args.kwargs["data"]))["type"], "batch")
+        with open(self.checkpoint) as f:
+            self.assertEqual(json.load(f), {"records": 5})
+
+
+
+class ImportRecordsTests(unittest.TestCase):
+    def test_python_values_are_encoded_and_batch_errors_are_counted(self):
+        record = dict(run_record(0), metadata={"seen_at": datetime(2026, 1, 1, tzinfo=timezone.utc)})
+
+        with mock.patch("requests.Session.post", return_value=FakeResponse()) as post:
+            result = bulk.import_records([record], api_key="key", tcc_url="http://localhost/batch")
+
+        self.assertEqual(result.imported, 1)
+        (item,) = json.loads(post.call_args.kwargs["data"])["items"]
+        self.assertEqual(item["metadata"], {"seen_at": "2026-01-01 00:00:00+00:00"})
+
+        with mock.patch("requests.Session.post", side_effect=RuntimeError("boom")), mock.patch("builtins.print"):
+            result = bulk.import_records(
+                [run_record(i) for i in range(4)], api_key="key", tcc_url="http://localhost/batch", batch_size=2
+            )
+
+        self.assertEqual((result.imported, result.failed), (0, 4))
+
+
+if __name__ == "__main__":
+    unittest.main()
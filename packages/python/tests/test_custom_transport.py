@@ -0,0 +1,154 @@
+import json
+import unittest
+from unittest import mock
+
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import SpanExporter, SpanExportResult
+from opentelemetry.trace import StatusCode
+
+import contextcompany as tcc
+from contextcompany import config
+from contextcompany.otel import OTelTransport, RunIdSpanProcessor, TraceBatchSpanProcessor, use_otel_transport
+
+
+class RecordingExporter(SpanExporter):
+    def __init__(self):
+        self.batches = []
+
+    def export(self, spans):
+        self.batches.append(list(spans))
+        return SpanExportResult.SUCCESS
+
+    def shutdown(self):
+        return None
+
+    def force_flush(self, timeout_millis=30000):
+        return True
+
+
+class OTelTransportTests(unittest.TestCase):
+    def tearDown(self):
+        config._config.clear()
+
+    def _record_run(self):
+        r = tcc.run(session_id="session").prompt("hi")
+        s = r.step().prompt("p").response("r").tokens(completion=3)
+        s.tool_call("search").args({"q": 1}).result("ok").end()
+        s.end()
+        r.response("done").error("boom")
+        return r
+
+    def test_run_is_exported_as_one_trace_without_http_requests(self):
+        exporter = RecordingExporter()
+        processor = TraceBatchSpanProcessor(exporter)
+        tcc.configure(transport=OTelTransport(processor))
+
+        with mock.patch("contextcompany._utils.requests.post") as post:
+            r = self._record_run()
+        processor.force_flush()
+        processor.shutdown()
+
+        post.assert_not_called()
+        self.assertEqual(len(exporter.batches), 1)
+        tool, step, run = exporter.batches[0]
+        self.assertIsNone(run.parent)
+        self.assertEqual(step.parent.span_id, run.context.span_id)
+        self.assertEqual(tool.parent.span_id, run.context.span_id)
+        self.assertEqual({span.context.trace_id for span in (tool, step, run)}, {run.context.trace_id})
+
+        self.assertEqual(run.name, "invoke_agent")
+        self.assertEqual(
+            dict(run.attributes),
+            {
+                "gen_ai.operation.name": "invoke_agent",
+                "tcc.runId": r.run_id,
+                "tcc.sessionId": "session",
+                "gen_ai.input.messages": '[{"role":"user","content":"hi"}]',
+                "gen_ai.output.messages": '[{"role":"assistant","content":"done"}]',
+            },
+        )
+        self.assertEqual(run.status.status_code, StatusCode.ERROR)
+        self.assertEqual(run.status.description, "boom")
+
+        self.assertEqual(step.name, "chat")
+        self.assertEqual(
+            dict(step.attributes),
+            {
+                "gen_ai.operation.name": "chat",
+                "tcc.runId": r.run_id,
+                "gen_ai.input.messages": '[{"role":"user","content":"p"}]',
+                "gen_ai.output.messages": '[{"role":"assistant","content":"r"}]',
+                "gen_ai.usage.output_tokens": 3,
+            },
+        )
+
+        self.assertEqual(tool.name, "execute_tool search")
+        self.assertEqual(
+            dict(tool.attributes),
+            {
+                "gen_ai.operation.name": "execute_tool",
+                "tcc.runId": r.run_id,
+                "gen_ai.tool.name": "search",
+                "gen_ai.tool.call.id": tool.attributes["gen_ai.tool.call.id"],
+                "gen_ai.tool.call.arguments": '{"q": 1}',
+                "gen_ai.tool.call.result": "ok",
+            },
+        )
+        self.assertLessEqual(run.start_time, run.end_time)
+
+    def test_shares_an_instrumented_provider_pipeline(self):
+        exporter = RecordingExporter()
+        provider = TracerProvider()
+        provider.add_span_processor(RunIdSpanProcessor())
+        processor = TraceBatchSpanProcessor(exporter)
+        provider.add_span_processor(processor)
+        use_otel_transport(processor)
+
+        with provider.get_tracer("test").start_as_current_span("framework"):
+            pass
+        self._record_run()
+        provider.force_flush()
+        provider.shutdown()
+
+        names = sorted(span.name for batch in exporter.batches for span in batch)
+        self.assertEqual(names, ["chat", "execute_tool search", "framework", "invoke_agent"])
+
+    def test_tenant_is_the_one_the_run_was_created_for(self):
+        exporter = RecordingExporter()
+        processor = TraceBatchSpanProcessor(exporter)
+        tcc.configure(tenant_api_keys={"acme": "acme-key"})
+        use_otel_transport(processor, tenant_api_keys={"acme": "acme-key"})
+
+        with tcc.use_tenant("acme"):
+            r = tcc.run()
+        r.prompt("hi").response("done").end()
+        processor.force_flush()
+        processor.shutdown()
+
+        (run,) = exporter.batches[0]
+        self.assertEqual(run.attributes["tcc.tenantId"], "acme")
+
+    def test_events_with_another_api_key_are_posted_directly(self):
+        exporter = RecordingExporter()
+        processor = TraceBatchSpanProcessor(exporter)
+        use_otel_transport(processor, api_key="pipeline-key")
+
+        with mock.patch("contextcompany._utils.requests.post") as post:
+            tcc.run(api_key="other-key").prompt("hi").response("done").end()
+            tcc.run(api_key="pipeline-key").prompt("hi").response("done").end()
+        processor.force_flush()
+        processor.shutdown()
+
+        post.assert_called_once()
+        self.assertEqual(post.call_args.kwargs["headers"]["Authorization"], "Bearer other-key")
+        self.assertEqual(len(exporter.batches), 1)
+
+    def test_http_restores_direct_requests(self):
+        tcc.configure(transport=OTelTransport(mock.Mock()))
+        tcc.configure(transport="http")
+
+        self.assertNotIn("transport", config._config)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+import os
+import unittest
+from unittest import mock
+
+import contextcompany as tcc
+from contextcompany import config
+from contextcompany.run import NOOP_RUN
+from contextcompany.step import NOOP_STEP
+from contextcompany.tool_call import NOOP_TOOL_CALL
+
+
+class DisabledModeTests(unittest.TestCase):
+    def tearDown(self):
+        config._config.clear()
+        os.environ.pop("TCC_ENABLED", None)
+
+    def test_configure_disables_builders_and_sending(self):
+        tcc.configure(enabled=False)
+
+        with mock.patch("contextcompany.run.uuid.uuid4") as uuid4, mock.patch(
+            "contextcompany._utils.requests.post"
+        ) as post:
+            r = tcc.run(session_id="s").prompt("hi").metadata(a="b")
+            s = r.step().prompt("p").response("r").tokens(completion=3)
+            tc = s.tool_call("search").args({"q": 1}).result("ok")
+            tc.end()
+            s.end()
+            r.end()
+
+        self.assertIs(r, NOOP_RUN)
+        self.assertIs(s, NOOP_STEP)
+        self.assertIs(tc, NOOP_TOOL_CALL)
+        self.assertIs(tcc.step("run"), NOOP_STEP)
+        self.assertIs(tcc.tool_call("run"), NOOP_TOOL_CALL)
+        self.assertFalse(r.feedback(score="thumbs_up"))
+        uuid4.assert_not_called()
+        post.assert_not_called()
+
+    def test_env_var_and_per_run_override(self):
+        os.environ["TCC_ENABLED"] = "0"
+        self.assertIs(tcc.run(), NOOP_RUN)
+        self.assertIsNot(tcc.run(enabled=True), NOOP_RUN)
+        self.assertIsNot(tcc.step("run", enabled=True), NOOP_STEP)
+        self.assertIsNot(tcc.tool_call("run", enabled=True), NOOP_TOOL_CALL)
+
+        tcc.configure(enabled=True)
+        self.assertIsNot(tcc.run(), NOOP_RUN)
+        self.assertIs(tcc.run(enabled=False), NOOP_RUN)
+
+    def test_per_run_override_sends_while_globally_disabled(self):
+        tcc.configure(enabled=False)
+
+        with mock.patch("contextcompany._utils.requests.post") as post:
+            r = tcc.run(enabled=True, api_key="key").prompt("hi")
+            s = r.step().prompt("p").response("r")
+            s.tool_call("search").result("ok").end()
+            s.end()
+            r.response("done").end()
+            tcc.step("other", enabled=True, api_key="key").prompt("p").response("r").end()
+
+        self.assertEqual(
+            [call.kwargs["json"]["type"] for call in post.call_args_list],
+            ["tool_call", "step", "run", "step"],
+        )
+
+    def test_disabled_feedback_does_not_require_api_key(self):
+        tcc.configure(enabled=False)
+        self.assertFalse(tcc.submit_feedback("run", score="thumbs_up"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,102 @@
+import threading
+import unittest
+
+from opentelemetry.sdk.resources import Resource
+from opentelemetry.sdk.trace import ReadableSpan
+from opentelemetry.sdk.trace.export import SpanExporter, SpanExportResult
+from opentelemetry.trace import SpanContext, TraceFlags
+
+from contextcompany.otel import QueuedSpanExporter
+
+
+class BlockingExporter(SpanExporter):
+    """Records export calls; the first call blocks until released."""
+
+    def __init__(self):
+        self.batches = []
+        self.release = threading.Event()
+        self.started = threading.Event()
+
+    def export(self, spans):
+        self.started.set()
+        self.release.wait(5)
+        self.batches.append([s.context.trace_id for s in spans])
+        return SpanExportResult.SUCCESS
+
+    def shutdown(self):
+        return None
+
+    def force_flush(self, timeout_millis=30000):
+        return True
+
+
+def make_trace(trace_id, spans=1, attributes=None):
+    return [
+        ReadableSpan(
+            name="span",
+            context=SpanContext(
+                trace_id=trace_id,
+                span_id=i + 1,
+                is_remote=False,
+                trace_flags=TraceFlags(TraceFlags.SAMPLED),
+            ),
+            resource=Resource.create({}),
+            attributes=attributes or {},
+        )
+        for i in range(spans)
+    ]
+
+
+class QueuedSpanExporterTests(unittest.TestCase):
+    def _blocked_exporter(self, **kwargs):
+        wrapped = BlockingExporter()
+        exporter = QueuedSpanExporter(wrapped, linger_seconds=0, **kwargs)
+        exporter.export(make_trace(0))
+        self.assertTrue(wrapped.started.wait(2))
+        return wrapped, exporter
+
+    def test_coalesces_queued_traces_into_one_export(self):
+        wrapped, exporter = self._blocked_exporter()
+        for trace_id in (1, 2, 3):
+            exporter.export(make_trace(trace_id, spans=2))
+        wrapped.release.set()
+
+        self.assertTrue(exporter.force_flush())
+        self.assertEqual(wrapped.batches, [[0], [1, 1, 2, 2, 3, 3]])
+        exporter.shutdown()
+
+    def test_span_cap_keeps_traces_whole(self):
+        wrapped, exporter = self._blocked_exporter(max_export_batch_size=4)
+        for trace_id in (1, 2, 3):
+            exporter.export(make_trace(trace_id, spans=2))
+        exporter.export(make_trace(4, spans=5))
+        wrapped.release.set()
+
+        self.assertTrue(exporter.force_flush())
+        self.assertEqual(
+            wrapped.batches,
+            [[0], [1, 1, 2, 2], [3, 3], [4, 4, 4, 4], [4]],
+        )
+        exporter.shutdown()
+
+    def test_byte_cap(self):
+        big = {"gen_ai.input.messages": "x" * 1000}
+        wrapped, exporter = self._blocked_exporter(max_export_batch_bytes=2500)
+        for trace_id in (1, 2, 3):
+            exporter.export(make_trace(trace_id, attributes=big))
+        wrapped.release.set()
+
+        self.assertTrue(exporter.force_flush())
+        self.assertEqual(wrapped.batches, [[0], [1, 2], [3]])
+        exporter.shutdown()
+
+    def test_drops_batches_when_queue_is_full(self):
+        wrapped, exporter = self._blocked_exporter(max_queue_size=1)
+        self.assertEqual(exporter.export(make_trace(1)), SpanExportResult.SUCCESS)
+        self.assertEqual(exporter.export(make_trace(2)), SpanExportResult.FAILURE)
+        wrapped.release.set()
+        exporter.shutdown()
+
+
+if __name__ == "__main__":
+    unittest.main()
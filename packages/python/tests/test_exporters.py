@@ -2,12 +2,16 @@ import json
 import unittest
 
 from opentelemetry.sdk.resources import Resource
-from opentelemetry.sdk.trace import ReadableSpan
-from opentelemetry.sdk.trace.export import SpanExporter, SpanExportResult
+from opentelemetry.sdk.trace import ReadableSpan, TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor, SpanExporter, SpanExportResult
 from opentelemetry.trace import SpanContext, TraceFlags
 
 from contextcompany.agno.exporter import MetadataFixingExporter
 from contextcompany.langchain.exporter import RunIdFixingExporter
+from contextcompany.otel.deferred import DeferredAttributesExporter, defer_attributes
+from contextcompany.otel.enrichment import EnrichingExporter
+from contextcompany.otel.id_cache import TraceIdCache
+from contextcompany.otel.span_copy import copy_span_with_attributes
 
 
 class RecordingExporter(SpanExporter):
@@ -78,6 +82,21 @@ class MetadataFixingExporterTests(unittest.TestCase):
             "11111111-1111-4111-8111-111111111111",
         )
 
+    def test_metadata_parsing_is_memoized_and_prefiltered(self):
+        from contextcompany.agno.exporter import _parse_metadata_cached, extract_user_ids
+
+        _parse_metadata_cached.cache_clear()
+        metadata = json.dumps({"tcc.runId": "user-run", "other": "x" * 1000})
+        large = json.dumps({"tcc.runId": "large-run", "other": "x" * 10000})
+
+        for _ in range(3):
+            self.assertEqual(extract_user_ids({"metadata": metadata}), {"tcc.runId": "user-run"})
+            self.assertEqual(extract_user_ids({"metadata": large}), {"tcc.runId": "large-run"})
+        self.assertEqual(extract_user_ids({"metadata": json.dumps({"user": "u"})}), {})
+
+        info = _parse_metadata_cached.cache_info()
+        self.assertEqual((info.misses, info.hits, info.currsize), (1, 2, 1))
+
     def test_promotes_openinference_session_id(self):
         root = make_span(
             trace_id=2,
@@ -115,5 +134,129 @@ class RunIdFixingExporterTests(unittest.TestCase):
         self.assertEqual(wrapped.spans[1].attributes["tcc.runId"], run_id)
 
 
+class EnrichingExporterTests(unittest.TestCase):
+    def test_custom_extractor_enriches_interleaved_traces(self):
+        wrapped = RecordingExporter()
+        exporter = EnrichingExporter(
+            wrapped,
+            lambda attrs: {"tcc.runId": attrs["my.run"]} if "my.run" in attrs else {},
+            id_cache=TraceIdCache(),
+        )
+        root_a = make_span(trace_id=1, span_id=1, attributes={"my.run": "run-a"})
+        root_b = make_span(trace_id=2, span_id=2)
+        child_a = make_span(trace_id=1, span_id=3, parent=root_a.context)
+        child_b = make_span(trace_id=2, span_id=4, parent=root_b.context)
+
+        exporter.export([child_a, child_b, root_b, root_a])
+
+        run_ids = [span.attributes.get("tcc.runId") for span in wrapped.spans]
+        self.assertEqual(run_ids, ["run-a", None, None, "run-a"])
+        self.assertIs(wrapped.spans[1], child_b)
+
+
+class TraceIdCacheTests(unittest.TestCase):
+    def test_late_children_are_fixed_from_cached_ids(self):
+        cache = TraceIdCache()
+        wrapped = RecordingExporter()
+        exporter = RunIdFixingExporter(wrapped, id_cache=cache)
+        root = make_span(
+            trace_id=7,
+            span_id=1,
+            attributes={"tcc.runId": "generated", "langsmith.metadata.tcc.runId": "user-run"},
+        )
+        late_child = make_span(
+            trace_id=7, span_id=2, parent=root.context, attributes={"tcc.runId": "generated"}
+        )
+
+        exporter.export([root])
+        exporter.export([late_child])
+
+        self.assertEqual(wrapped.spans[0].attributes["tcc.runId"], "user-run")
+
+    def test_partial_chunk_is_fixed_from_tracked_root(self):
+        wrapped = RecordingExporter()
+        exporter = MetadataFixingExporter(wrapped, id_cache=TraceIdCache())
+        root = make_span(trace_id=8, span_id=1, attributes={"session.id": "session"})
+        child = make_span(trace_id=8, span_id=2, parent=root.context)
+
+        exporter.track_trace_root(root)
+        exporter.export([child])
+
+        self.assertEqual(wrapped.spans[0].attributes["tcc.sessionId"], "session")
+
+    def test_evicts_least_recently_used_and_expired_entries(self):
+        cache = TraceIdCache(max_entries=2)
+        cache.put(1, {"tcc.runId": "a"})
+        cache.put(2, {"tcc.runId": "b"})
+        cache.get(1)
+        cache.put(3, {"tcc.runId": "c"})
+
+        self.assertIsNone(cache.get(2))
+        self.assertEqual(cache.get(1), {"tcc.runId": "a"})
+        self.assertEqual(len(cache), 2)
+
+        expired = TraceIdCache(ttl_seconds=0)
+        expired.put(1, {"tcc.runId": "a"})
+        self.assertIsNone(expired.get(1))
+
+
+class CopySpanWithAttributesTests(unittest.TestCase):
+    def test_overlay_shares_source_data_and_encodes_to_otlp(self):
+        from opentelemetry.exporter.otlp.proto.common.trace_encoder import encode_spans
+
+        span = make_span(trace_id=1, span_id=1, attributes={"tcc.runId": "generated", "big": "x" * 1000})
+
+        enriched = copy_span_with_attributes(span, {"tcc.runId": "user-run"})
+        twice = copy_span_with_attributes(enriched, {"tcc.sessionId": "session"})
+
+        self.assertIs(enriched.resource, span.resource)
+        self.assertIs(enriched._attributes._base, span._attributes)
+        self.assertIs(twice._attributes._base, span._attributes)
+        self.assertEqual(span.attributes["tcc.runId"], "generated")
+        self.assertEqual(
+            dict(twice.attributes),
+            {"tcc.runId": "user-run", "tcc.sessionId": "session", "big": "x" * 1000},
+        )
+
+        encoded = encode_spans([twice]).resource_spans[0].scope_spans[0].spans[0]
+        attributes = {kv.key: kv.value.string_value for kv in encoded.attributes}
+        self.assertEqual(attributes["tcc.runId"], "user-run")
+        self.assertEqual(attributes["tcc.sessionId"], "session")
+        self.assertEqual(len(encoded.attributes), 3)
+
+
+class DeferredAttributesExporterTests(unittest.TestCase):
+    def test_builders_run_at_export_time(self):
+        recording = RecordingExporter()
+        provider = TracerProvider()
+        provider.add_span_processor(SimpleSpanProcessor(DeferredAttributesExporter(recording)))
+        tracer = provider.get_tracer("test")
+        calls = []
+
+        def build():
+            calls.append(1)
+            return {"gen_ai.input.messages": json.dumps([{"role": "user"}])}
+
+        span = tracer.start_span("llm", attributes={"gen_ai.request.model": "m"})
+        defer_attributes(span, build)
+        self.assertEqual(calls, [])
+        span.end()
+
+        exported = recording.spans[0]
+        self.assertEqual(calls, [1])
+        self.assertEqual(exported.attributes["gen_ai.request.model"], "m")
+        self.assertEqual(json.loads(exported.attributes["gen_ai.input.messages"]), [{"role": "user"}])
+
+    def test_failing_builder_exports_span_unchanged(self):
+        recording = RecordingExporter()
+        provider = TracerProvider()
+        provider.add_span_processor(SimpleSpanProcessor(DeferredAttributesExporter(recording)))
+        span = provider.get_tracer("test").start_span("llm")
+        defer_attributes(span, lambda: 1 / 0)
+        span.end()
+
+        self.assertEqual(recording.spans[0].name, "llm")
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,95 @@
+import threading
+import time
+import unittest
+from unittest import mock
+
+from contextcompany import feedback
+
+
+class FakeResponse:
+    ok = True
+    status_code = 200
+    text = ""
+
+
+class SubmitFeedbackBatchTests(unittest.TestCase):
+    def test_chunks_and_coalesces_items_per_run(self):
+        items = [
+            {"run_id": "a", "score": "thumbs_up"},
+            {"run_id": "a", "text": "nice"},
+            {"run_id": "a", "score": "thumbs_down"},
+            {"run_id": "b", "score": "thumbs_up"},
+            {"run_id": "c", "text": "meh"},
+        ]
+
+        with mock.patch.object(feedback.requests.Session, "post", return_value=FakeResponse()) as post:
+            accepted = feedback.submit_feedback_batch(
+                items, api_key="key", tcc_url="http://localhost/fb", batch_size=4
+            )
+
+        self.assertEqual(accepted, 3)
+        self.assertEqual({call.args[0] for call in post.call_args_list}, {"http://localhost/fb"})
+        self.assertEqual(
+            [call.kwargs["json"] for call in post.call_args_list],
+            [
+                {"runId": "a", "score": "thumbs_down", "text": "nice"},
+                {"runId": "b", "score": "thumbs_up"},
+                {"runId": "c", "text": "meh"},
+            ],
+        )
+
+    def test_rejects_invalid_items(self):
+        with self.assertRaisesRegex(ValueError, "at least one"):
+            feedback.submit_feedback_batch([{"run_id": "a"}], api_key="key")
+
+
+class EnqueueFeedbackTests(unittest.TestCase):
+    def test_background_queue_coalesces_bursts(self):
+        queue = feedback._FeedbackQueue(window_seconds=60)
+
+        with mock.patch.object(feedback, "_queue", queue), mock.patch.object(
+            feedback.requests.Session, "post", return_value=FakeResponse()
+        ) as post:
+            for score in ("thumbs_up", "thumbs_down", "thumbs_up"):
+                feedback.enqueue_feedback("run", score=score, api_key="key", tcc_url="http://localhost/fb")
+            self.assertTrue(feedback.flush_feedback(timeout=5))
+
+        post.assert_called_once()
+        self.assertEqual(post.call_args.args[0], "http://localhost/fb")
+        self.assertEqual(post.call_args.kwargs["json"], {"runId": "run", "score": "thumbs_up"})
+
+
+    def test_items_enqueued_after_a_delivered_window_are_sent(self):
+        queue = feedback._FeedbackQueue(window_seconds=0.05)
+        sent = []
+        delivered = threading.Event()
+
+        def post(session, url, json, **kwargs):
+            sent.append(json["runId"])
+            delivered.set()
+            return FakeResponse()
+
+        with mock.patch.object(feedback, "_queue", queue), mock.patch.object(
+            feedback.requests.Session, "post", post
+        ):
+            feedback.enqueue_feedback("r1", score="thumbs_up", api_key="key", tcc_url="http://localhost/fb")
+            self.assertTrue(delivered.wait(2))
+            delivered.clear()
+            time.sleep(0.1)
+            feedback.enqueue_feedback("r2", score="thumbs_up", api_key="key", tcc_url="http://localhost/fb")
+            self.assertTrue(delivered.wait(2))
+
+        self.assertEqual(sent, ["r1", "r2"])
+
+    def test_submit_feedback_does_not_use_the_shared_session(self):
+        with mock.patch("contextcompany.feedback.requests.post", return_value=FakeResponse()) as post, mock.patch.object(
+            feedback.requests.Session, "post"
+        ) as session_post:
+            self.assertTrue(feedback.submit_feedback("run", score="thumbs_up", api_key="key", tcc_url="http://localhost/fb"))
+
+        post.assert_called_once()
+        session_post.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
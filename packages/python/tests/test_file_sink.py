@@ -0,0 +1,165 @@
+import gzip
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+import zlib
+from unittest import mock
+
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+
+import contextcompany as tcc
+from contextcompany import config
+from contextcompany.file_sink import PART_SUFFIX, FileSink
+from contextcompany.otel import FileSpanExporter
+
+
+def read_records(directory):
+    records = []
+    for name in sorted(os.listdir(directory)):
+        path = os.path.join(directory, name)
+        opener = gzip.open if name.endswith(".gz") else open
+        with opener(path, "rt") as f:
+            records.extend(json.loads(line) for line in f)
+    return records
+
+
+class FileSinkTests(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        config._config.clear()
+        shutil.rmtree(self.directory)
+
+    def test_custom_sdk_writes_payloads_instead_of_posting(self):
+        sink = FileSink(self.directory)
+        tcc.configure(transport=sink)
+
+        with mock.patch("contextcompany._utils.requests.post") as post:
+            r = tcc.run().prompt("hi")
+            r.step().prompt("p").response("r").end()
+            r.response("done").end()
+        sink.close()
+
+        post.assert_not_called()
+        records = read_records(self.directory)
+        self.assertEqual([record["type"] for record in records], ["step", "run"])
+        self.assertEqual(records[1]["run_id"], r.run_id)
+
+    def test_rotates_compresses_and_caps_segments(self):
+        sink = FileSink(self.directory, max_segment_bytes=1000, max_segments=3, compress=True, buffer_bytes=1)
+        for i in range(200):
+            sink.write({"i": i, "pad": "x" * 50})
+        sink.flush()
+
+        names = os.listdir(self.directory)
+        self.assertEqual(len([n for n in names if n.endswith(PART_SUFFIX)]), 1)
+        sink.close()
+
+        names = sorted(os.listdir(self.directory))
+        self.assertEqual(len(names), 3)
+        self.assertTrue(all(name.endswith(".jsonl.gz") for name in names))
+        self.assertEqual(read_records(self.directory)[-1]["i"], 199)
+
+    def test_full_buffer_is_written_by_the_background_thread(self):
+        sink = FileSink(self.directory, buffer_bytes=1, flush_interval=60)
+        flushed = threading.Event()
+        threads = []
+        real_flush = FileSink.flush
+
+        def flush(self, fsync=False):
+            threads.append(threading.current_thread())
+            real_flush(self, fsync)
+            flushed.set()
+
+        with mock.patch.object(FileSink, "flush", flush):
+            sink.write({"i": 1})
+            self.assertTrue(flushed.wait(2))
+        sink.close()
+
+        self.assertIs(threads[0], sink._thread)
+        self.assertEqual(read_records(self.directory), [{"i": 1}])
+
+    def test_rotates_idle_segments_by_age(self):
+        sink = FileSink(self.directory, max_segment_age=0.05, flush_interval=0.01)
+        sink.write({"i": 1})
+
+        deadline = time.monotonic() + 2
+        while time.monotonic() < deadline and not any(
+            name.endswith(".jsonl") for name in os.listdir(self.directory)
+        ):
+            time.sleep(0.01)
+
+        self.assertFalse(any(name.endswith(PART_SUFFIX) for name in os.listdir(self.directory)))
+        self.assertEqual(read_records(self.directory), [{"i": 1}])
+        sink.close()
+
+    def test_recovers_segments_no_running_sink_holds(self):
+        # Sinks in restarted containers often share the dead one's pid.
+        plain = os.path.join(self.directory, f"tcc-20260101T000000-{os.getpid()}-000001.jsonl" + PART_SUFFIX)
+        with open(plain, "wb") as f:
+            f.write(b'{"i":1}\n{"i":2}\n{"i":')
+        compressed = os.path.join(self.directory, "tcc-20260101T000000-4242-000002.jsonl.gz" + PART_SUFFIX)
+        compressor = zlib.compressobj(wbits=zlib.MAX_WBITS | 16)
+        with open(compressed, "wb") as f:
+            f.write(compressor.compress(b'{"i":3}\n{"i":') + compressor.flush(zlib.Z_SYNC_FLUSH))
+        live = FileSink(self.directory, flush_interval=60)
+        live.write({"i": 4})
+        live.flush()
+        (live_part,) = [name for name in os.listdir(self.directory) if name.startswith("tcc-") and live._id in name]
+
+        sink = FileSink(self.directory)
+
+        self.assertEqual(
+            sorted(os.listdir(self.directory)),
+            sorted(
+                [
+                    f"tcc-20260101T000000-{os.getpid()}-000001.jsonl",
+                    "tcc-20260101T000000-4242-000002.jsonl.gz",
+                    live_part,
+                ]
+            ),
+        )
+        self.assertTrue(live_part.endswith(PART_SUFFIX))
+        live.close()
+        sink.close()
+        self.assertEqual(read_records(self.directory), [{"i": 1}, {"i": 2}, {"i": 3}, {"i": 4}])
+
+    def test_rotation_recovers_segments_left_after_startup(self):
+        sink = FileSink(self.directory, flush_interval=60)
+        stale = os.path.join(self.directory, "tcc-20260101T000000-4242-000001.jsonl" + PART_SUFFIX)
+        with open(stale, "wb") as f:
+            f.write(b'{"i":0}\n')
+
+        sink.write({"i": 1})
+        sink.flush()
+        self.assertTrue(os.path.exists(stale))
+        sink.close()
+
+        self.assertFalse(any(name.endswith(PART_SUFFIX) for name in os.listdir(self.directory)))
+        self.assertEqual(read_records(self.directory), [{"i": 0}, {"i": 1}])
+
+    def test_span_exporter_writes_json_lines(self):
+        sink = FileSink(self.directory)
+        provider = TracerProvider()
+        provider.add_span_processor(SimpleSpanProcessor(FileSpanExporter(sink)))
+        tracer = provider.get_tracer("test")
+
+        with tracer.start_as_current_span("root", attributes={"tcc.runId": "r"}):
+            with tracer.start_as_current_span("child"):
+                pass
+        provider.shutdown()
+
+        child, root = read_records(self.directory)
+        self.assertEqual(root["attributes"], {"tcc.runId": "r"})
+        self.assertEqual(child["parent_span_id"], root["span_id"])
+        self.assertEqual(child["trace_id"], root["trace_id"])
+
+
+if __name__ == "__main__":
+    unittest.main()
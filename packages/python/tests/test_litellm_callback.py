@@ -0,0 +1,121 @@
+import asyncio
+import json
+import sys
+import types
+import unittest
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from unittest import mock
+
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+from opentelemetry.trace import StatusCode
+
+from contextcompany.otel import AttributeLimits
+
+
+class CustomLogger:
+    """Stand-in for litellm's base class, which only provides no-op hooks."""
+
+
+def load_callback():
+    """Import the callback module against a stub ``litellm`` package."""
+    custom_logger = types.ModuleType("litellm.integrations.custom_logger")
+    custom_logger.CustomLogger = CustomLogger
+    stubs = {
+        "litellm": types.ModuleType("litellm"),
+        "litellm.integrations": types.ModuleType("litellm.integrations"),
+        "litellm.integrations.custom_logger": custom_logger,
+    }
+    with mock.patch.dict(sys.modules, stubs):
+        sys.modules.pop("contextcompany.litellm.callback", None)
+        sys.modules.pop("contextcompany.litellm", None)
+        from contextcompany.litellm import callback
+    return callback
+
+
+def make_response(content="hello", tool_calls=None):
+    message = SimpleNamespace(role="assistant", content=content, tool_calls=tool_calls)
+    return SimpleNamespace(
+        model="gpt-4o-2024",
+        usage=SimpleNamespace(prompt_tokens=3, completion_tokens=5),
+        choices=[SimpleNamespace(message=message, finish_reason="stop")],
+    )
+
+
+class TCCCallbackTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.callback = load_callback()
+
+    def setUp(self):
+        self.exporter = InMemorySpanExporter()
+        self.start = datetime(2026, 1, 1)
+        self.end = self.start + timedelta(seconds=1)
+
+    def make_callback(self, **kwargs):
+        cb = self.callback.TCCCallback(exporter=self.exporter, **kwargs)
+        self.addCleanup(cb.close)
+        return cb
+
+    def finished_span(self, cb):
+        self.assertTrue(cb.force_flush())
+        (span,) = self.exporter.get_finished_spans()
+        return span
+
+    def test_success_event_exports_snapshot_of_messages(self):
+        cb = self.make_callback()
+        messages = [{"role": "user", "content": "hi"}]
+        response = make_response()
+        kwargs = {"model": "gpt-4o", "messages": messages, "litellm_params": {"metadata": {"tcc.runId": "run-1"}}}
+
+        cb.log_success_event(kwargs, response, self.start, self.end)
+        # Callers reuse both objects for the next turn before the span is exported.
+        messages.append({"role": "assistant", "content": "later"})
+        response.choices[0].message.content = "mutated"
+
+        attributes = self.finished_span(cb).attributes
+        self.assertEqual(attributes["metadata.tcc.runId"], "run-1")
+        self.assertEqual(attributes["gen_ai.request.model"], "gpt-4o")
+        self.assertEqual(attributes["gen_ai.usage.output_tokens"], 5)
+        self.assertEqual(json.loads(attributes["gen_ai.input.messages"]), [{"role": "user", "content": "hi"}])
+        self.assertEqual(
+            json.loads(attributes["gen_ai.output.messages"]), [{"role": "assistant", "content": "hello"}]
+        )
+        self.assertEqual(json.loads(attributes["gen_ai.response.finish_reasons"]), ["stop"])
+
+    def test_limited_messages_stay_valid_json(self):
+        cb = self.make_callback(attribute_limits=AttributeLimits(max_attribute_bytes=120))
+        kwargs = {"model": "gpt-4o", "messages": [{"role": "user", "content": "q\n" * 500}]}
+
+        cb.log_success_event(kwargs, make_response("a" * 500), self.start, self.end)
+
+        attributes = self.finished_span(cb).attributes
+        for key in ("gen_ai.input.messages", "gen_ai.output.messages"):
+            self.assertLessEqual(len(attributes[key]), 120)
+            self.assertEqual(json.loads(attributes[key])[0]["role"], "user" if "input" in key else "assistant")
+        self.assertNotIn("gen_ai.input.messages.sha256", attributes)
+
+    def test_async_failure_event_marks_span_as_error(self):
+        cb = self.make_callback()
+
+        asyncio.run(cb.async_log_failure_event({"model": "gpt-4o"}, "rate limited", self.start, self.end))
+
+        span = self.finished_span(cb)
+        self.assertEqual(span.status.status_code, StatusCode.ERROR)
+        self.assertEqual(span.status.description, "rate limited")
+
+    def test_callbacks_with_equal_settings_share_one_provider(self):
+        first = self.make_callback(attribute_limits=AttributeLimits(max_attribute_bytes=100))
+        second = self.make_callback(attribute_limits=AttributeLimits(max_attribute_bytes=100))
+        other = self.make_callback(attribute_limits=AttributeLimits(max_attribute_bytes=200))
+
+        self.assertIs(first.provider, second.provider)
+        self.assertIsNot(first.provider, other.provider)
+
+        first.close()
+        second.log_success_event({"model": "gpt-4o"}, make_response(), self.start, self.end)
+        self.assertEqual(self.finished_span(second).name, "litellm_request")
+
+
+if __name__ == "__main__":
+    unittest.main()
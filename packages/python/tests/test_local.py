@@ -0,0 +1,115 @@
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+from unittest import mock
+
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+
+import contextcompany as tcc
+from contextcompany import config
+from contextcompany.local import SQLiteSink, latency_by_model, slowest_tool_calls, tokens_by_session
+from contextcompany.otel import SQLiteSpanExporter
+
+
+def payload(kind, start, end, **fields):
+    return dict(type=kind, start_time=start, end_time=end, status_code=0, **fields)
+
+
+class SQLiteSinkTests(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "tcc.db")
+
+    def tearDown(self):
+        config._config.clear()
+        shutil.rmtree(self.directory)
+
+    def test_custom_sdk_payloads_are_stored_and_queryable(self):
+        sink = SQLiteSink(self.path)
+        tcc.configure(transport=sink)
+
+        with mock.patch("contextcompany._utils.requests.post") as post:
+            r = tcc.run(session_id="s1").prompt("hi")
+            s = r.step().prompt("p").response("r").model(requested="gpt-4o").tokens(prompt_uncached=5, completion=7)
+            s.tool_call("search").args({"q": 1}).result("ok").end()
+            s.end()
+            r.response("done").end()
+        sink.flush()
+
+        post.assert_not_called()
+        self.assertEqual(latency_by_model(self.path)[0]["model"], "gpt-4o")
+        self.assertEqual(
+            tokens_by_session(self.path),
+            [{"session_id": "s1", "runs": 1, "input_tokens": 5, "output_tokens": 7, "total_tokens": 12}],
+        )
+        self.assertEqual(slowest_tool_calls(self.path)[0]["tool_name"], "search")
+        sink.close()
+
+    def test_queries_aggregate_across_records(self):
+        sink = SQLiteSink(self.path, batch_size=3)
+        base = "2026-01-01T00:00:00.000Z"
+        for i in range(1, 21):
+            sink.write(payload("step", base, f"2026-01-01T00:00:{i:02d}.000Z", step_id=f"a{i}", run_id="r", model_used="a"))
+        sink.write(payload("step", base, "2026-01-01T00:00:00.500Z", step_id="b", run_id="r", model_requested="b"))
+        for i in range(5):
+            sink.write(payload("tool_call", base, f"2026-01-01T00:00:0{i}.000Z", tool_call_id=f"t{i}", run_id="r", tool_name=f"tool{i}"))
+        sink.close()
+
+        by_model = {result["model"]: result for result in latency_by_model(self.path)}
+        self.assertEqual(by_model["a"]["count"], 20)
+        self.assertEqual(by_model["a"]["p50_ms"], 10000)
+        self.assertEqual(by_model["a"]["p95_ms"], 19000)
+        self.assertEqual(by_model["b"]["p95_ms"], 500)
+        self.assertEqual([call["tool_name"] for call in slowest_tool_calls(self.path, limit=2)], ["tool4", "tool3"])
+        self.assertEqual(slowest_tool_calls(self.path, since="2027-01-01T00:00:00.000Z"), [])
+
+    def test_span_exporter_stores_llm_spans(self):
+        sink = SQLiteSink(self.path)
+        provider = TracerProvider()
+        provider.add_span_processor(SimpleSpanProcessor(SQLiteSpanExporter(sink)))
+        tracer = provider.get_tracer("test")
+
+        with tracer.start_as_current_span("agent", attributes={"tcc.runId": "r", "tcc.sessionId": "s2"}):
+            with tracer.start_as_current_span(
+                "llm",
+                attributes={
+                    "tcc.sessionId": "s2",
+                    "gen_ai.request.model": "claude",
+                    "gen_ai.usage.input_tokens": 3,
+                    "gen_ai.usage.output_tokens": 4,
+                },
+            ):
+                pass
+        provider.shutdown()
+
+        self.assertEqual([result["model"] for result in latency_by_model(self.path)], ["claude"])
+        self.assertEqual(tokens_by_session(self.path)[0]["total_tokens"], 7)
+
+    def test_invalid_records_are_skipped_without_losing_the_batch(self):
+        sink = SQLiteSink(self.path)
+        base = "2026-01-01T00:00:00.000Z"
+        with mock.patch("builtins.print") as printed:
+            sink.write(payload("step", base, base, step_id="ok-1", run_id="r"))
+            sink.write(payload("step", base, base, run_id="r"))
+            sink.write(payload("step", base, base, step_id="bad-value", run_id={"not": "bindable"}))
+            sink.write(payload("step", base, base, step_id="ok-2", run_id="r"))
+            self.assertTrue(sink.flush())
+        sink.close()
+
+        self.assertEqual(printed.call_count, 2)
+        with sqlite3.connect(self.path) as connection:
+            stored = [row[0] for row in connection.execute("SELECT step_id FROM steps ORDER BY step_id")]
+        self.assertEqual(stored, ["ok-1", "ok-2"])
+
+    def test_flush_times_out_when_the_writer_is_gone(self):
+        sink = SQLiteSink(self.path)
+        sink.close()
+        sink._queue.put({"type": "run"})
+
+        self.assertFalse(sink.flush(timeout=1))
+
+if __name__ == "__main__":
+    unittest.main()
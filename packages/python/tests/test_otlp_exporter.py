@@ -0,0 +1,76 @@
+import gzip
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+from opentelemetry.proto.collector.trace.v1.trace_service_pb2 import ExportTraceServiceRequest
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+
+from contextcompany.otel import create_otlp_exporter
+from contextcompany.otel.exporter import create_session
+
+
+class _Handler(BaseHTTPRequestHandler):
+    requests = []
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        _Handler.requests.append((self.headers, body))
+        self.send_response(200)
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+class CreateOtlpExporterTests(unittest.TestCase):
+    def setUp(self):
+        _Handler.requests = []
+        self.server = HTTPServer(("127.0.0.1", 0), _Handler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.endpoint = f"http://127.0.0.1:{self.server.server_port}/v1/traces"
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_sends_gzip_compressed_authenticated_spans(self):
+        provider = TracerProvider()
+        provider.add_span_processor(SimpleSpanProcessor(create_otlp_exporter(self.endpoint, "tcc_key")))
+        tracer = provider.get_tracer("test")
+
+        with tracer.start_as_current_span("llm", attributes={"gen_ai.input.messages": "hello " * 1000}):
+            pass
+        provider.shutdown()
+
+        headers, body = _Handler.requests[0]
+        self.assertEqual(headers["Content-Encoding"], "gzip")
+        self.assertEqual(headers["Authorization"], "Bearer tcc_key")
+        self.assertLess(len(body), 1000)
+
+        request = ExportTraceServiceRequest.FromString(gzip.decompress(body))
+        self.assertEqual(request.resource_spans[0].scope_spans[0].spans[0].name, "llm")
+
+    def test_compression_can_be_disabled(self):
+        exporter = create_otlp_exporter(self.endpoint, "tcc_key", compression=False)
+        provider = TracerProvider()
+        provider.add_span_processor(SimpleSpanProcessor(exporter))
+
+        with provider.get_tracer("test").start_as_current_span("llm"):
+            pass
+        provider.shutdown()
+
+        headers, body = _Handler.requests[0]
+        self.assertIsNone(headers["Content-Encoding"])
+        ExportTraceServiceRequest.FromString(body)
+
+    def test_session_pools_connections_and_retries_connect_errors_only(self):
+        adapter = create_session(pool_maxsize=8, connect_retries=3).get_adapter(self.endpoint)
+
+        self.assertEqual(adapter._pool_maxsize, 8)
+        self.assertEqual(adapter.max_retries.connect, 3)
+        self.assertEqual(adapter.max_retries.status, 0)
+
+if __name__ == "__main__":
+    unittest.main()
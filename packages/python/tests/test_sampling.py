@@ -0,0 +1,155 @@
+import unittest
+
+from opentelemetry.sdk.resources import Resource
+from opentelemetry import trace
+from opentelemetry.sdk.trace import ReadableSpan, TracerProvider
+from opentelemetry.sdk.trace.export import SpanExporter, SpanExportResult
+from opentelemetry.trace import NonRecordingSpan, SpanContext, Status, StatusCode, TraceFlags
+
+from contextcompany.langchain.exporter import RunIdFixingExporter, extract_user_ids
+from contextcompany.otel import TailSampler, TraceBatchSpanProcessor
+
+
+class RecordingExporter(SpanExporter):
+    def __init__(self):
+        self.spans = []
+
+    def export(self, spans):
+        self.spans.extend(spans)
+        return SpanExportResult.SUCCESS
+
+    def shutdown(self):
+        return None
+
+    def force_flush(self, timeout_millis=30000):
+        return True
+
+
+def make_span(*, trace_id, span_id, parent=None, attributes=None, status=None, duration_ms=1):
+    return ReadableSpan(
+        name=f"span-{span_id}",
+        context=SpanContext(
+            trace_id=trace_id,
+            span_id=span_id,
+            is_remote=False,
+            trace_flags=TraceFlags(TraceFlags.SAMPLED),
+        ),
+        parent=parent,
+        resource=Resource.create({}),
+        attributes=attributes or {},
+        status=status or Status(StatusCode.UNSET),
+        start_time=1,
+        end_time=1 + int(duration_ms * 1e6),
+    )
+
+
+class TailSamplerTests(unittest.TestCase):
+    def test_keep_policies_override_sample_rate(self):
+        sampler = TailSampler(sample_rate=0.0, min_duration_ms=1000, min_tokens=500)
+
+        self.assertFalse(sampler.should_keep([make_span(trace_id=1, span_id=1)]))
+        self.assertTrue(
+            sampler.should_keep([make_span(trace_id=1, span_id=1, status=Status(StatusCode.ERROR))])
+        )
+        self.assertTrue(sampler.should_keep([make_span(trace_id=1, span_id=1, duration_ms=2000)]))
+        self.assertTrue(
+            sampler.should_keep(
+                [
+                    make_span(trace_id=1, span_id=1, attributes={"gen_ai.usage.input_tokens": 300}),
+                    make_span(trace_id=1, span_id=2, attributes={"gen_ai.usage.output_tokens": 300}),
+                ]
+            )
+        )
+
+    def test_custom_policy_runs_first(self):
+        sampler = TailSampler(policies=[lambda spans: False])
+
+        self.assertFalse(
+            sampler.should_keep([make_span(trace_id=1, span_id=1, status=Status(StatusCode.ERROR))])
+        )
+
+    def test_probabilistic_decision_follows_trace_id(self):
+        sampler = TailSampler(sample_rate=0.5)
+
+        self.assertTrue(sampler.should_keep([make_span(trace_id=1, span_id=1)]))
+        self.assertFalse(sampler.should_keep([make_span(trace_id=(1 << 64) - 1, span_id=1)]))
+
+    def test_invalid_sample_rate(self):
+        with self.assertRaises(ValueError):
+            TailSampler(sample_rate=1.5)
+
+
+class TraceBatchSamplingTests(unittest.TestCase):
+    def setUp(self):
+        self.recording = RecordingExporter()
+        self.processor = TraceBatchSpanProcessor(
+            RunIdFixingExporter(self.recording),
+            sampler=TailSampler(sample_rate=0.0),
+            max_spans_per_trace=2,
+        )
+
+    def tearDown(self):
+        self.processor.shutdown()
+
+    def test_dropped_trace_is_freed_and_user_run_ids_are_kept(self):
+        dropped = make_span(trace_id=1, span_id=1)
+        kept = make_span(trace_id=2, span_id=2, attributes={"langsmith.metadata.tcc.runId": "user-run"})
+
+        self.processor.on_end(dropped)
+        self.processor.on_end(kept)
+        self.processor.force_flush()
+
+        self.assertEqual([span.context.span_id for span in self.recording.spans], [2])
+        self.assertEqual(self.processor.batches, {})
+        self.assertEqual(self.processor._buffered_spans, 0)
+
+    def test_partially_exported_trace_is_kept_whole(self):
+        root = make_span(trace_id=3, span_id=1)
+        children = [make_span(trace_id=3, span_id=i, parent=root.context) for i in (2, 3)]
+
+        for child in children:
+            self.processor.on_end(child)
+        self.processor.on_end(root)
+        self.processor.force_flush()
+
+        self.assertEqual(sorted(span.context.span_id for span in self.recording.spans), [1, 2, 3])
+
+    def test_explicit_extractor_works_behind_wrapped_exporters(self):
+        recording = RecordingExporter()
+        processor = TraceBatchSpanProcessor(
+            recording, sampler=TailSampler(sample_rate=0.0), extractor=extract_user_ids
+        )
+
+        processor.on_end(make_span(trace_id=4, span_id=1, attributes={"langsmith.metadata.tcc.runId": "user-run"}))
+        processor.force_flush()
+        processor.shutdown()
+
+        self.assertEqual([span.context.span_id for span in recording.spans], [1])
+
+    def test_first_decision_applies_to_every_local_root_of_a_trace(self):
+        recording = RecordingExporter()
+        processor = TraceBatchSpanProcessor(recording, sampler=TailSampler(sample_rate=0.0))
+        provider = TracerProvider()
+        provider.add_span_processor(processor)
+        tracer = provider.get_tracer("test")
+        upstream = trace.set_span_in_context(
+            NonRecordingSpan(
+                SpanContext(trace_id=5, span_id=50, is_remote=True, trace_flags=TraceFlags(TraceFlags.SAMPLED))
+            )
+        )
+
+        second = tracer.start_span("second-request", context=upstream)
+        with tracer.start_as_current_span("first-request", context=upstream):
+            pass
+        # Would be kept on its own, but the trace was already dropped.
+        second.set_status(Status(StatusCode.ERROR))
+        second.end()
+        processor.force_flush()
+
+        self.assertEqual(recording.spans, [])
+        self.assertEqual(processor._dropped, set())
+        provider.shutdown()
+
+
+if __name__ == "__main__":
+    unittest.main()
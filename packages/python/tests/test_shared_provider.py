@@ -0,0 +1,67 @@
+import unittest
+
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor, SpanExporter, SpanExportResult
+
+from contextcompany.otel import acquire_tracer_provider, release_tracer_provider
+from contextcompany.otel.shared_provider import shutdown_tracer_providers
+
+
+class RecordingExporter(SpanExporter):
+    def __init__(self):
+        self.spans = []
+        self.shutdowns = 0
+
+    def export(self, spans):
+        self.spans.extend(spans)
+        return SpanExportResult.SUCCESS
+
+    def shutdown(self):
+        self.shutdowns += 1
+
+
+class SharedTracerProviderTests(unittest.TestCase):
+    def tearDown(self):
+        shutdown_tracer_providers()
+
+    def _factory(self, exporter, created):
+        def create():
+            created.append(1)
+            provider = TracerProvider()
+            provider.add_span_processor(SimpleSpanProcessor(exporter))
+            return provider
+
+        return create
+
+    def test_same_key_shares_one_provider_until_last_release(self):
+        exporter, created = RecordingExporter(), []
+        first = acquire_tracer_provider(("endpoint", "key"), self._factory(exporter, created))
+        second = acquire_tracer_provider(("endpoint", "key"), self._factory(exporter, created))
+
+        self.assertIs(first, second)
+        self.assertEqual(len(created), 1)
+
+        release_tracer_provider(("endpoint", "key"))
+        first.get_tracer("test").start_span("still-open").end()
+        self.assertEqual(exporter.shutdowns, 0)
+        self.assertEqual(len(exporter.spans), 1)
+
+        release_tracer_provider(("endpoint", "key"))
+        self.assertEqual(exporter.shutdowns, 1)
+
+        third = acquire_tracer_provider(("endpoint", "key"), self._factory(exporter, created))
+        self.assertIsNot(third, first)
+        self.assertEqual(len(created), 2)
+
+    def test_different_keys_get_separate_providers(self):
+        exporter = RecordingExporter()
+        a = acquire_tracer_provider("a", self._factory(exporter, []))
+        b = acquire_tracer_provider("b", self._factory(exporter, []))
+
+        self.assertIsNot(a, b)
+        shutdown_tracer_providers()
+        self.assertEqual(exporter.shutdowns, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,162 @@
+import threading
+import unittest
+import uuid
+
+from opentelemetry import baggage, context, trace
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+from opentelemetry.instrumentation.langchain.callback_handler import TraceloopCallbackHandler
+from langsmith.run_helpers import tracing_context
+
+from contextcompany.agno.exporter import MetadataFixingExporter, extract_user_ids as extract_agno_ids
+from contextcompany.langchain.exporter import (
+    RunIdFixingExporter,
+    extract_context_user_ids as extract_langchain_context_ids,
+    extract_user_ids as extract_langchain_ids,
+)
+from contextcompany.otel import RunIdSpanProcessor, set_run_id
+
+
+class RunIdSpanProcessorTests(unittest.TestCase):
+    def setUp(self):
+        self.exporter = InMemorySpanExporter()
+        self.provider = TracerProvider()
+        self.provider.add_span_processor(RunIdSpanProcessor())
+        self.provider.add_span_processor(SimpleSpanProcessor(self.exporter))
+        self.tracer = self.provider.get_tracer("test")
+
+    def tearDown(self):
+        self.provider.shutdown()
+
+    def test_child_started_after_parent_ended_keeps_run_id(self):
+        with self.tracer.start_as_current_span("root") as root:
+            parent_context = context.get_current()
+        with self.tracer.start_as_current_span("late-child", context=parent_context) as child:
+            pass
+
+        self.assertEqual(child.attributes["tcc.runId"], root.attributes["tcc.runId"])
+
+    def test_explicit_context_and_baggage_win(self):
+        token = context.attach(set_run_id("explicit-run"))
+        try:
+            with self.tracer.start_as_current_span("root") as root:
+                pass
+        finally:
+            context.detach(token)
+
+        with self.tracer.start_as_current_span(
+            "entry", context=baggage.set_baggage("tcc.runId", "upstream-run")
+        ) as entry:
+            pass
+
+        self.assertEqual(root.attributes["tcc.runId"], "explicit-run")
+        self.assertEqual(entry.attributes["tcc.runId"], "upstream-run")
+
+    def test_concurrent_traces_do_not_lose_or_mix_run_ids(self):
+        errors = []
+
+        def worker():
+            for _ in range(100):
+                with self.tracer.start_as_current_span("root") as root:
+                    with self.tracer.start_as_current_span("child"):
+                        with self.tracer.start_as_current_span("grandchild") as grandchild:
+                            pass
+                if grandchild.attributes.get("tcc.runId") != root.attributes["tcc.runId"]:
+                    errors.append(root.attributes["tcc.runId"])
+
+        threads = [threading.Thread(target=worker) for _ in range(20)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        spans = self.exporter.get_finished_spans()
+        run_ids = {span.attributes["tcc.runId"] for span in spans}
+        self.assertEqual(errors, [])
+        self.assertEqual(len(spans), 6000)
+        self.assertEqual(len(run_ids), 2000)
+
+
+class ResolverTests(unittest.TestCase):
+    def _run(self, resolver, root_attributes):
+        exporter = InMemorySpanExporter()
+        provider = TracerProvider()
+        provider.add_span_processor(RunIdSpanProcessor(resolver=resolver))
+        provider.add_span_processor(SimpleSpanProcessor(exporter))
+        tracer = provider.get_tracer("test")
+        with tracer.start_as_current_span("root", attributes=root_attributes):
+            with tracer.start_as_current_span("child"):
+                pass
+        provider.shutdown()
+        return exporter.get_finished_spans()
+
+    def _run_langchain_chain(self, metadata=None):
+        # Drive the real traceloop callback handler: it attaches chain
+        # metadata to the context and only sets span attributes after start.
+        exporter = InMemorySpanExporter()
+        provider = TracerProvider()
+        provider.add_span_processor(
+            RunIdSpanProcessor(resolver=extract_langchain_ids, context_resolver=extract_langchain_context_ids)
+        )
+        provider.add_span_processor(SimpleSpanProcessor(exporter))
+        handler = TraceloopCallbackHandler(provider.get_tracer("test"), None, None)
+
+        root, child = uuid.uuid4(), uuid.uuid4()
+        handler.on_chain_start({"name": "agent"}, {}, run_id=root, metadata=metadata)
+        handler.on_chain_start({"name": "tool"}, {}, run_id=child, parent_run_id=root, metadata={})
+        handler.on_chain_end({}, run_id=child, parent_run_id=root)
+        handler.on_chain_end({}, run_id=root)
+        provider.shutdown()
+        return exporter.get_finished_spans()
+
+    def test_langchain_run_id_resolved_at_start_and_export_does_not_copy(self):
+        spans = self._run_langchain_chain({"tcc.runId": "user-run"})
+
+        self.assertEqual(len(spans), 2)
+        self.assertEqual([s.attributes["tcc.runId"] for s in spans], ["user-run", "user-run"])
+
+        captured = []
+
+        class Capture:
+            def export(self, batch):
+                captured.extend(batch)
+
+        RunIdFixingExporter(Capture()).export(spans)
+        self.assertEqual([id(s) for s in captured], [id(s) for s in spans])
+
+    def test_langsmith_metadata_resolved_at_start(self):
+        with tracing_context(metadata={"tcc.runId": "langsmith-run"}):
+            spans = self._run_langchain_chain()
+
+        self.assertEqual({s.attributes["tcc.runId"] for s in spans}, {"langsmith-run"})
+
+    def test_agno_metadata_resolved_at_start_and_export_does_not_copy(self):
+        spans = self._run(
+            extract_agno_ids,
+            {"metadata": '{"tcc.runId": "user-run", "tcc.sessionId": "user-session"}'},
+        )
+
+        for span in spans:
+            self.assertEqual(span.attributes["tcc.runId"], "user-run")
+            self.assertEqual(span.attributes["tcc.sessionId"], "user-session")
+
+        captured = []
+
+        class Capture:
+            def export(self, batch):
+                captured.extend(batch)
+
+        MetadataFixingExporter(Capture()).export(spans)
+        self.assertEqual([id(s) for s in captured], [id(s) for s in spans])
+
+    def test_root_without_user_ids_gets_generated_run_id(self):
+        spans = self._run(extract_langchain_ids, {})
+
+        run_ids = {s.attributes["tcc.runId"] for s in spans}
+        self.assertEqual(len(run_ids), 1)
+        self.assertNotIn(None, run_ids)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,55 @@
+import asyncio
+import unittest
+from unittest import mock
+
+from contextcompany.step import Step
+
+
+class StepStreamingTests(unittest.TestCase):
+    def test_stream_joins_chunks_and_reports_latency(self):
+        s = Step(run_id="run").prompt("hello")
+
+        passed_through = list(s.stream(["Hel", "lo", "", " world"]))
+
+        with mock.patch("contextcompany.step._send_payload") as send:
+            s.end()
+
+        payload = send.call_args[0][0]
+        self.assertEqual(passed_through, ["Hel", "lo", "", " world"])
+        self.assertEqual(payload["response"], "Hello world")
+        self.assertEqual(payload["stream_chunk_count"], 3)
+        self.assertGreaterEqual(payload["time_to_first_token_ms"], 0)
+        self.assertLessEqual(
+            payload["inter_token_latency_p50_ms"],
+            payload["inter_token_latency_p95_ms"],
+        )
+
+    def test_explicit_response_wins_and_tokens_per_second_uses_usage(self):
+        s = Step(run_id="run").prompt("hello").tokens(completion=10)
+        with mock.patch("contextcompany.step.time.perf_counter", side_effect=[1.0, 1.5]):
+            s.stream_chunk("a").stream_chunk("b")
+        s._start_perf = 0.5
+        s.response("final")
+
+        payload = s._build_payload()
+
+        self.assertEqual(payload["response"], "final")
+        self.assertEqual(payload["time_to_first_token_ms"], 500.0)
+        self.assertEqual(payload["tokens_per_second"], 20.0)
+
+    def test_astream_with_text_extractor(self):
+        async def chunks():
+            for delta in ({"delta": "a"}, {"delta": None}, {"delta": "b"}):
+                yield delta
+
+        s = Step(run_id="run").prompt("hello")
+
+        async def consume():
+            return [c async for c in s.astream(chunks(), text=lambda c: c["delta"])]
+
+        self.assertEqual(len(asyncio.run(consume())), 3)
+        self.assertEqual(s._chunks, ["a", "b"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,157 @@
+import threading
+import unittest
+from unittest import mock
+
+from opentelemetry.sdk.resources import Resource
+from opentelemetry.sdk.trace import ReadableSpan, TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor, SpanExporter, SpanExportResult
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+from opentelemetry.trace import SpanContext, TraceFlags
+
+import contextcompany as tcc
+from contextcompany import config
+from contextcompany.otel import RunIdSpanProcessor, TenantRoutingExporter
+
+
+class BlockingExporter(SpanExporter):
+    def __init__(self):
+        self.exporting = threading.Event()
+        self.release = threading.Event()
+
+    def export(self, spans):
+        self.exporting.set()
+        self.release.wait(5)
+        return SpanExportResult.SUCCESS
+
+    def shutdown(self):
+        self.release.set()
+
+    def force_flush(self, timeout_millis=30000):
+        return True
+
+
+class RecordingExporter(SpanExporter):
+    def __init__(self):
+        self.spans = []
+        self.closed = False
+
+    def export(self, spans):
+        self.spans.extend(spans)
+        return SpanExportResult.SUCCESS
+
+    def shutdown(self):
+        self.closed = True
+
+    def force_flush(self, timeout_millis=30000):
+        return True
+
+
+def make_span(span_id, tenant_id=None):
+    return ReadableSpan(
+        name=f"span-{span_id}",
+        context=SpanContext(
+            trace_id=span_id,
+            span_id=span_id,
+            is_remote=False,
+            trace_flags=TraceFlags(TraceFlags.SAMPLED),
+        ),
+        resource=Resource.create({}),
+        attributes={"tcc.tenantId": tenant_id} if tenant_id else {},
+        start_time=1,
+        end_time=2,
+    )
+
+
+class TenantRoutingTests(unittest.TestCase):
+    def tearDown(self):
+        config._config.clear()
+
+    def test_spans_are_tagged_with_current_tenant(self):
+        exporter = InMemorySpanExporter()
+        provider = TracerProvider()
+        provider.add_span_processor(RunIdSpanProcessor())
+        provider.add_span_processor(SimpleSpanProcessor(exporter))
+        tracer = provider.get_tracer("test")
+
+        with tcc.use_tenant("acme"):
+            with tracer.start_as_current_span("root"):
+                pass
+        with tracer.start_as_current_span("untagged"):
+            pass
+        provider.shutdown()
+
+        tenants = [span.attributes.get("tcc.tenantId") for span in exporter.get_finished_spans()]
+        self.assertEqual(tenants, ["acme", None])
+
+    def test_routes_batches_to_per_tenant_exporters(self):
+        exporters = {"acme": RecordingExporter(), "globex": RecordingExporter()}
+        default = RecordingExporter()
+        router = TenantRoutingExporter(exporters.get, default_exporter=default)
+
+        with mock.patch("builtins.print"):
+            router.export([make_span(1, "acme"), make_span(2, "globex"), make_span(3), make_span(4, "unknown")])
+        router.force_flush()
+
+        self.assertEqual([s.context.span_id for s in exporters["acme"].spans], [1])
+        self.assertEqual([s.context.span_id for s in exporters["globex"].spans], [2])
+        self.assertEqual([s.context.span_id for s in default.spans], [3])
+        self.assertNotIn("tcc.tenantId", exporters["acme"].spans[0].attributes)
+        router.shutdown()
+
+    def test_tenant_exporters_are_lru_evicted(self):
+        created = {}
+
+        def exporter_for_tenant(tenant_id):
+            created.setdefault(tenant_id, []).append(RecordingExporter())
+            return created[tenant_id][-1]
+
+        router = TenantRoutingExporter(exporter_for_tenant, max_tenants=2)
+        for span_id, tenant_id in enumerate(["a", "b", "a", "c", "b"], start=1):
+            router.export([make_span(span_id, tenant_id)])
+            router.force_flush()
+
+        self.assertEqual(len(created["a"]), 1)
+        self.assertEqual([e.closed for e in created["b"]], [True, False])
+        self.assertEqual(list(router._tenants), ["c", "b"])
+        router.shutdown()
+
+    def test_slow_tenant_does_not_drop_other_tenants_spans(self):
+        slow, fast = BlockingExporter(), RecordingExporter()
+        router = TenantRoutingExporter({"slow": slow, "fast": fast}.get, max_queue_size=1)
+
+        router.export([make_span(1, "slow")])
+        self.assertTrue(slow.exporting.wait(5))
+        with mock.patch("builtins.print") as log:
+            for span_id in range(1, 11):
+                router.export([make_span(span_id, "slow"), make_span(span_id + 100, "fast")])
+                router._tenants["fast"].force_flush()
+
+        self.assertEqual(len(fast.spans), 10)
+        self.assertTrue(any("queue full" in str(call) for call in log.call_args_list))
+        slow.release.set()
+        router.shutdown()
+
+    def test_custom_sdk_uses_tenant_api_key(self):
+        tcc.configure(tenant_api_keys={"acme": "tcc_acme"})
+
+        with tcc.use_tenant("acme"):
+            r = tcc.run()
+        explicit = tcc.run(api_key="tcc_explicit")
+
+        self.assertEqual(r._api_key, "tcc_acme")
+        self.assertEqual(r.step()._api_key, "tcc_acme")
+        self.assertEqual(explicit._api_key, "tcc_explicit")
+
+    def test_feedback_uses_tenant_api_key(self):
+        tcc.configure(tenant_api_keys={"acme": "tcc_acme"})
+
+        with tcc.use_tenant("acme"), mock.patch(
+            "contextcompany.feedback._post_item", return_value=True
+        ) as post:
+            tcc.submit_feedback("run", score="thumbs_up", tcc_url="http://localhost/fb")
+
+        self.assertEqual(post.call_args.args[1], "tcc_acme")
+
+
+if __name__ == "__main__":
+    unittest.main()